@@ -0,0 +1,160 @@
+import json
+import zlib
+from typing import Any, AsyncIterable, Iterable
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app import config
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder produces the same JSON values, only slower
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# sync NDJSON rows are sent (and compressed) in groups of this many lines
+NDJSON_GROUP = 500
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, like FastAPI's JSONResponse renders it."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits: let the stdlib encoder handle (or reject) it
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def pick_encoding(request: Request | None) -> str | None:
+    """"br" or "gzip" if the client accepts it (q > 0), brotli first; None for identity."""
+    if request is None or config.COMPRESS_MIN_BYTES <= 0:
+        return None
+    header = request.headers.get("accept-encoding")
+    if not header:
+        return None
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(name.strip().lower())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return zlib.compress(body, GZIP_LEVEL, wbits=31)  # wbits 31: gzip container
+
+
+class _Compressor:
+    """Incremental gzip / brotli; every chunk is flushed so streamed lines arrive as they come."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._c.finish() if self.encoding == "br" else self._c.flush()
+
+
+def coded_etag(etag: str, encoding: str | None) -> str:
+    """
+    The strong ETag of `etag`'s representation in a content-coding: "key" ->
+    "key-gzip". Identity bodies and weak tags are left as they are.
+    """
+    if encoding is None or etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _headers(headers: dict | None, encoding: str | None) -> dict:
+    out = dict(headers or {})
+    if config.COMPRESS_MIN_BYTES > 0:
+        out["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        out["Content-Encoding"] = encoding
+        for name, value in out.items():
+            if name.lower() == "etag":
+                out[name] = coded_etag(value, encoding)
+    return out
+
+
+def json_response(request: Request | None, content: Any, status_code: int = 200,
+                  headers: dict | None = None) -> Response:
+    """
+    `content` encoded with dumps() (orjson when installed), compressed when the
+    body reaches VA_COMPRESS_MIN_BYTES and the client accepts br / gzip.
+    Skips the response model: callers pass the final JSON shape.
+    """
+    body = dumps(content)
+    encoding = pick_encoding(request) if len(body) >= config.COMPRESS_MIN_BYTES else None
+    if encoding is not None:
+        body = compress(body, encoding)
+    return Response(body, status_code=status_code, media_type="application/json",
+                    headers=_headers(headers, encoding))
+
+
+def api_json(request: Request | None, data: Any, debug_timings: dict | None = None,
+             headers: dict | None = None) -> Response:
+    """An ApiResponse body through json_response()."""
+    return json_response(request, {"ok": True, "data": data, "debug_timings": debug_timings}, headers=headers)
+
+
+async def _ndjson_lines(rows: Iterable | AsyncIterable, encoding: str | None):
+    comp = _Compressor(encoding) if encoding is not None else None
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            line = dumps(row) + b"\n"
+            yield comp.chunk(line) if comp else line
+    else:
+        group: list[bytes] = []
+        for row in rows:
+            group.append(dumps(row))
+            if len(group) >= NDJSON_GROUP:
+                data = b"\n".join(group) + b"\n"
+                group = []
+                yield comp.chunk(data) if comp else data
+        if group:
+            data = b"\n".join(group) + b"\n"
+            yield comp.chunk(data) if comp else data
+    if comp is not None:
+        yield comp.finish()
+
+
+def ndjson_response(request: Request | None, rows: Iterable | AsyncIterable,
+                    headers: dict | None = None) -> StreamingResponse:
+    """
+    One JSON document per line. Async rows are sent one line at a time as
+    they are produced; sync rows in groups of NDJSON_GROUP. Compressed as a
+    stream whenever the client accepts it (the size is not known up front).
+    """
+    encoding = pick_encoding(request)
+    return StreamingResponse(_ndjson_lines(rows, encoding), media_type="application/x-ndjson",
+                             headers=_headers(headers, encoding))
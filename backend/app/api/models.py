@@ -1,17 +1,71 @@
 from pydantic import BaseModel, Field
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 class SummarizeRequest(BaseModel):
     text: Optional[str] = Field(default=None, description="Transcript text")
     youtube_url: Optional[str] = Field(default=None, description="YouTube URL (optional)")
     language: str = Field(default="en", description="en/ru/kk")
     summary_sentences: int = Field(default=7, ge=3, le=15, description="How many sentences in summary")
+    weighting: Literal["tf", "tfidf"] = Field(default="tf", description="Keyword/sentence scoring: raw counts or corpus TF-IDF")
+    outline_depth: int = Field(default=2, ge=1, le=3, description="Outline levels: chapters, sections, subsections")
+    outline_granularity: Literal["coarse", "normal", "fine"] = Field(default="normal", description="How small the finest outline segments get")
+    debug_timings: bool = Field(default=False, description="Return per-stage timings (ms)")
 
 class AnalyzeRequest(BaseModel):
     text: Optional[str] = None
     youtube_url: Optional[str] = None
     language: str = "en"
+    debug_timings: bool = False
+
+class ReportRequest(BaseModel):
+    text: Optional[str] = None
+    youtube_url: Optional[str] = None
+    language: str = "en"
+    summary_sentences: int = Field(default=7, ge=3, le=15)
+    sections: list[Literal["summary", "outline", "analysis"]] = Field(
+        default=["summary", "outline", "analysis"],
+        description="Which parts of the report to compute",
+    )
+    weighting: Literal["tf", "tfidf"] = Field(default="tf", description="Keyword/sentence scoring: raw counts or corpus TF-IDF")
+    outline_depth: int = Field(default=2, ge=1, le=3, description="Outline levels: chapters, sections, subsections")
+    outline_granularity: Literal["coarse", "normal", "fine"] = Field(default="normal", description="How small the finest outline segments get")
+    debug_timings: bool = False
+
+class BatchItem(BaseModel):
+    text: Optional[str] = None
+    youtube_url: Optional[str] = None
+    language: Optional[str] = Field(default=None, description="Overrides the batch language")
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem] = Field(..., min_length=1)
+    language: str = "en"
+    summary_sentences: int = Field(default=7, ge=3, le=15)
+    sections: list[Literal["summary", "outline", "analysis"]] = Field(
+        default=["summary", "outline", "analysis"],
+    )
+    weighting: Literal["tf", "tfidf"] = "tf"
+    stream: bool = Field(default=False, description="Return NDJSON lines as results become ready")
+
+class SessionCreateRequest(BaseModel):
+    language: str = "en"
+
+class SessionAppendRequest(BaseModel):
+    text: str = Field(..., description="New transcript lines (may include timestamps)")
+
+class TimelineBuildRequest(BaseModel):
+    text: Optional[str] = Field(default=None, description="Transcript with timestamps")
+    youtube_url: Optional[str] = None
+    language: str = "en"
+    window_sec: Optional[float] = Field(default=None, ge=1, le=3600, description="Index granularity (default VA_TIME_INDEX_WINDOW)")
+
+class SearchIndexRequest(BaseModel):
+    text: Optional[str] = Field(default=None, description="Transcript (timestamps give match times)")
+    youtube_url: Optional[str] = None
+    language: str = "en"
+    video_id: Optional[str] = Field(default=None, max_length=200, description="Required for pasted text; re-indexing an id replaces it")
+    title: Optional[str] = Field(default=None, max_length=500)
 
 class ApiResponse(BaseModel):
     ok: bool = True
     data: Any = None
+    debug_timings: Optional[dict[str, float]] = Field(default=None, description="Per-stage milliseconds, when requested")
@@ -1,54 +1,544 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.api.models import SummarizeRequest, AnalyzeRequest, ApiResponse
-from app.services.youtube import fetch_youtube_transcript
+import asyncio
+import codecs
+import json
+from typing import Callable, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app.api.encoding import api_json, coded_etag, ndjson_response
+from app.api.models import (
+    SummarizeRequest, AnalyzeRequest, ReportRequest, BatchRequest,
+    SessionCreateRequest, SessionAppendRequest, TimelineBuildRequest, SearchIndexRequest, ApiResponse,
+)
+from app.services.captions import CaptionTrack
+from app.services.youtube import _extract_video_id, fetch_youtube_transcript_async, get_transcript_cache
 from app.services.summarizer import summarize_extractive, build_outline
 from app.services.analyzer import analyze_transcript
+from app.services.document import build_document
+from app.services.report import build_report
+from app.services.result_cache import get_result_cache, result_key
+from app.services.batch import report_worker, error_result
+from app.services.pool import get_process_pool
+from app.services.stream import StreamingAnalyzer, WINDOW
+from app.services.corpus import get_idf_table, record_document
+from app.services.mapreduce import prepare_document
+from app.services.jobs import Job, QueueFull, get_job_queue, lane_for
+from app.services.neardup import REUSABLE_KINDS, get_near_duplicate_index, reusable_selection, signature
+from app.services.search import get_search_index
+from app.services.timeindex import build_time_index, open_time_index, parse_time
+from app.services.live import LiveSession, create_session, get_session, touch_session, delete_session
+from app import config
+from app.services.metrics import collect_timings, registry, stage, timings_ms
 
 router = APIRouter(prefix="/api")
 
-@router.get("/health", response_model=ApiResponse)
-def health():
-    return ApiResponse(ok=True, data={"status": "ok"})
+async def _fetch_items(url: str) -> CaptionTrack:
+    try:
+        return await fetch_youtube_transcript_async(url)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out fetching YouTube captions.")
 
-@router.get("/youtube-transcript", response_model=ApiResponse)
-def youtube_transcript(url: str = Query(...)):
-    items = fetch_youtube_transcript(url)
-    joined = "\n".join([it["text"] for it in items if it.get("text")])
-    return ApiResponse(ok=True, data={"items": items, "text": joined})
-
-@router.post("/summarize", response_model=ApiResponse)
-def summarize(req: SummarizeRequest):
+async def _load_text(text: str | None, youtube_url: str | None) -> tuple[str, CaptionTrack | None]:
     items = None
-    text = (req.text or "").strip()
+    text = (text or "").strip()
 
-    if not text and req.youtube_url:
-        items = fetch_youtube_transcript(req.youtube_url)
-        text = "\n".join([it["text"] for it in items if it.get("text")]).strip()
+    if not text and youtube_url:
+        items = await _fetch_items(youtube_url)
+        text = items.joined_text().strip()
 
     if not text:
         raise HTTPException(status_code=400, detail="Provide 'text' or 'youtube_url' with available captions.")
+    return text, items
+
+def _etag_match(request: Request | None, etag: str) -> str | None:
+    """The If-None-Match tag naming this result in any content-coding (see coded_etag), else None."""
+    if request is None:
+        return None
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    # only explicit tags: "*" means "any current representation", which a client
+    # that never received this computed result cannot mean
+    ours = {etag, coded_etag(etag, "gzip"), coded_etag(etag, "br")}
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in ours:
+            return tag
+    return None
+
+def _near_duplicate_selection(kind: str, doc, params: dict, key: str, cache, response: Response) -> list[str] | None:
+    """
+    Summary sentences of an already processed transcript that is nearly
+    identical to this one (same endpoint and parameters), when they are all
+    sentences of this one too; None otherwise. This transcript is registered
+    either way, for later lookups.
+    """
+    index = get_near_duplicate_index()
+    if index is None or kind not in REUSABLE_KINDS:
+        return None
+    with stage("near_duplicate"):
+        scope = f"{kind}\0{json.dumps(params, sort_keys=True)}"
+        sig = signature(doc)
+        match = index.query(scope, sig)
+        selected = None
+        if match is not None:
+            data = cache.get(match[0])
+            if data is None:
+                index.discard(match[0])  # its result is no longer cached
+            else:
+                selected = reusable_selection(data, doc)
+                if selected is not None:
+                    response.headers["X-Near-Duplicate-Similarity"] = f"{match[1]:.3f}"
+        index.add(scope, sig, key)
+    return selected
+
+def _cached_response(kind: str, doc, params: dict, request: Request | None, response: Response,
+                     compute: Callable[[], dict], timings: dict | None = None):
+    """
+    Serves deterministic results by content hash: 304 on a matching
+    If-None-Match, cached data when present, otherwise compute and store.
+    compute(selected) is given a near duplicate's summary selection when
+    there is a usable one. `request` is None for background jobs (no
+    conditional request).
+    """
+    key = result_key(kind, doc, params)
+    etag = f'"{key}"'
+    matched = _etag_match(request, etag)
+    if matched is not None:
+        headers = {"ETag": matched}
+        if config.COMPRESS_MIN_BYTES > 0:
+            headers["Vary"] = "Accept-Encoding"
+        return Response(status_code=304, headers=headers)
+
+    cache = get_result_cache()
+    with stage("result_cache"):
+        data = cache.get(key)
+    if data is None:
+        prepare_document(doc)  # huge transcripts: map-reduce the token passes over the process pool
+        selected = _near_duplicate_selection(kind, doc, params, key, cache, response)
+        data = compute() if selected is None else compute(selected)
+        cache.set(key, data)
+
+    response.headers["ETag"] = etag
+    return ApiResponse(ok=True, data=data, debug_timings=timings_ms(timings))
 
-    summary = summarize_extractive(text=text, language=req.language, k=req.summary_sentences, yt_items=items)
+def _send(request: Request, response: Response, result, fmt: str = "json") -> Response:
+    """
+    A _cached_response() result through the fast encoder (and compression),
+    keeping the headers set on `response`. "ndjson" sends one line per
+    top-level section of the data: {"section": name, "data": value}.
+    """
+    if not isinstance(result, ApiResponse):
+        return result  # 304
+    headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+    if fmt == "ndjson":
+        rows = [{"section": name, "data": value} for name, value in result.data.items()]
+        if result.debug_timings is not None:
+            rows.append({"section": "debug_timings", "data": result.debug_timings})
+        return ndjson_response(request, rows, headers)
+    return api_json(request, result.data, result.debug_timings, headers)
 
-    outline = build_outline(text=text, language=req.language, yt_items=items)
+def _auto_index(doc, youtube_url: str | None) -> None:
+    """With VA_SEARCH_AUTO_INDEX, YouTube transcripts join the search index the first time they are analyzed."""
+    if not config.SEARCH_AUTO_INDEX or not youtube_url or not doc.items:
+        return
+    index = get_search_index()
+    if index is None:
+        return
+    with stage("search_index"):
+        video_id = _extract_video_id(youtube_url)
+        if not index.contains(video_id):
+            index.add(doc, video_id)
 
+def _weighting_params(weighting: str) -> dict:
+    """TF-IDF results depend on the corpus snapshot too, so it is part of the cache key."""
+    if weighting == "tf":
+        return {}
+    return {"weighting": weighting, "idf_version": get_idf_table().version}
+
+def _outline_params(req) -> dict:
+    # always part of the key: results cached before the topic outline never match
+    return {"outline": [req.outline_depth, req.outline_granularity]}
+
+@router.get("/health", response_model=ApiResponse)
+def health():
     return ApiResponse(ok=True, data={
-        "summary": summary,
-        "outline": outline,
-        "source": "youtube_captions" if items else "pasted_text"
+        "status": "ok",
+        "transcript_cache": get_transcript_cache().stats(),
+        "result_cache": get_result_cache().stats(),
     })
 
+def _cache_gauges():
+    for cache_name, cache in (("transcript", get_transcript_cache()), ("result", get_result_cache())):
+        for tier, st in cache.stats().items():
+            if st is None:
+                continue
+            labels = {"cache": cache_name, "tier": tier}
+            yield "va_cache_entries", labels, st["entries"]
+            yield "va_cache_hits", labels, st["hits"]
+            yield "va_cache_misses", labels, st["misses"]
+            yield "va_cache_evictions", labels, st["evictions"]
+    jobs = get_job_queue().stats()
+    for lane, n in jobs["queued"].items():
+        yield "va_jobs_queued", {"lane": lane}, n
+    yield "va_jobs_running", {}, jobs["running"]
+
+registry.gauge_callback({
+    "va_cache_entries": "Entries per cache tier.",
+    "va_cache_hits": "Lookups answered by the cache tier.",
+    "va_cache_misses": "Lookups the cache tier could not answer.",
+    "va_cache_evictions": "Entries dropped to respect the size bound.",
+    "va_jobs_queued": "Background jobs waiting, per priority lane.",
+    "va_jobs_running": "Background jobs being processed.",
+}, _cache_gauges)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.exposition(), media_type="text/plain; version=0.0.4")
+
+@router.get("/youtube-transcript", response_model=ApiResponse)
+async def youtube_transcript(request: Request, url: str = Query(...),
+                             start: Optional[str] = Query(None, description="seconds, mm:ss or hh:mm:ss"),
+                             end: Optional[str] = Query(None, description="seconds, mm:ss or hh:mm:ss"),
+                             cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+                             limit: Optional[int] = Query(None, ge=1, le=10000),
+                             include_text: bool = Query(True, description="add the joined text of the items"),
+                             fmt: Literal["json", "ndjson"] = Query("json", alias="format")):
+    """
+    Caption items plus their joined text. `start` / `end` keep the items
+    starting in that time range; `limit` pages through them, `next_cursor`
+    (null on the last page) fetches the next page with the same range.
+    "ndjson" streams one item per line instead (no text).
+    """
+    items = await _fetch_items(url)
+    paged = start is not None or end is not None or cursor is not None or limit is not None
+    if not paged:
+        if fmt == "ndjson":
+            return ndjson_response(request, items)
+        data = {"items": items.to_list()}
+        if include_text:
+            data["text"] = items.joined_text()
+        return api_json(request, data)
+
+    try:
+        t0 = parse_time(start) if start is not None else float("-inf")
+        t1 = parse_time(end) if end is not None else float("inf")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Bad cursor.")
+    lo = int(cursor or 0)
+    if t1 < t0:
+        raise HTTPException(status_code=400, detail="'end' must not be before 'start'.")
+
+    if start is not None or end is not None:
+        items = items.between(t0, t1)
+    total = len(items)
+    hi = total if limit is None else min(total, lo + limit)
+    page = items.slice(lo, hi)
+    if fmt == "ndjson":
+        return ndjson_response(request, page)
+    data = {"items": page.to_list(), "total_items": total, "next_cursor": str(hi) if hi < total else None}
+    if include_text:
+        data["text"] = page.joined_text()
+    return api_json(request, data)
+
+@router.post("/summarize", response_model=ApiResponse)
+async def summarize(req: SummarizeRequest, request: Request, response: Response):
+    with collect_timings(req.debug_timings) as timings:
+        return _send(request, response, await _summarize(req, request, response, timings))
+
+async def _summarize(req: SummarizeRequest, request: Request, response: Response, timings: dict | None):
+    with stage("load_input"):
+        text, items = await _load_text(req.text, req.youtube_url)
+
+    def work():
+        doc = build_document(text, req.language, items)
+
+        def compute(selected=None):
+            record_document(doc)
+            summary = summarize_extractive(text=text, language=req.language, k=req.summary_sentences, doc=doc,
+                                           weighting=req.weighting, selected=selected)
+
+            outline = build_outline(text=text, language=req.language, doc=doc, weighting=req.weighting,
+                                    depth=req.outline_depth, granularity=req.outline_granularity)
+
+            return {
+                "summary": summary,
+                "outline": outline,
+                "source": "youtube_captions" if items else "pasted_text"
+            }
+
+        params = {"k": req.summary_sentences, "source": bool(items), **_weighting_params(req.weighting),
+                  **_outline_params(req)}
+        _auto_index(doc, req.youtube_url if items else None)
+        return _cached_response("summarize", doc, params, request, response, compute, timings)
+
+    # CPU-bound: keep it off the event loop
+    return await run_in_threadpool(work)
+
 @router.post("/analyze", response_model=ApiResponse)
-def analyze(req: AnalyzeRequest):
-    items = None
-    text = (req.text or "").strip()
+async def analyze(req: AnalyzeRequest, request: Request, response: Response,
+                  fmt: Literal["json", "ndjson"] = Query("json", alias="format")):
+    with collect_timings(req.debug_timings) as timings:
+        return _send(request, response, await _analyze(req, request, response, timings), fmt)
 
-    if not text and req.youtube_url:
-        items = fetch_youtube_transcript(req.youtube_url)
-        text = "\n".join([it["text"] for it in items if it.get("text")]).strip()
+async def _analyze(req: AnalyzeRequest, request: Request, response: Response, timings: dict | None):
+    with stage("load_input"):
+        text, items = await _load_text(req.text, req.youtube_url)
 
-    if not text:
-        raise HTTPException(status_code=400, detail="Provide 'text' or 'youtube_url' with available captions.")
+    def work():
+        doc = build_document(text, req.language, items)
+
+        def compute():
+            record_document(doc)
+            return analyze_transcript(text=text, language=req.language, doc=doc)
+
+        _auto_index(doc, req.youtube_url if items else None)
+        return _cached_response("analyze", doc, {}, request, response, compute, timings)
+
+    return await run_in_threadpool(work)
+
+@router.post("/analyze/stream", response_model=ApiResponse)
+async def analyze_stream(request: Request, language: str = Query("en")):
+    """
+    Raw transcript text as the request body (any size), analyzed while it uploads.
+    Same result as /api/analyze on the same text.
+    """
+    analyzer = StreamingAnalyzer(language)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending: list[str] = []
+    size = 0
+
+    async for chunk in request.stream():
+        text = decoder.decode(chunk)
+        if not text:
+            continue
+        pending.append(text)
+        size += len(text)
+        if size >= WINDOW:
+            await run_in_threadpool(analyzer.feed, "".join(pending))
+            pending, size = [], 0
 
-    result = analyze_transcript(text=text, language=req.language, yt_items=items)
+    pending.append(decoder.decode(b"", final=True))
+
+    def finish():
+        analyzer.feed("".join(pending))
+        return analyzer.finish()
+
+    result = await run_in_threadpool(finish)
+    if not result["stats"]["word_count"]:
+        raise HTTPException(status_code=400, detail="Provide transcript text in the request body.")
     return ApiResponse(ok=True, data=result)
+
+@router.post("/report", response_model=ApiResponse)
+async def report(req: ReportRequest, request: Request, response: Response):
+    with collect_timings(req.debug_timings) as timings:
+        return _send(request, response, await _report(req, request, response, timings))
+
+async def _report(req: ReportRequest, request: Request, response: Response, timings: dict | None):
+    with stage("load_input"):
+        text, items = await _load_text(req.text, req.youtube_url)
+
+    def work():
+        doc = build_document(text, req.language, items)
+
+        def compute(selected=None):
+            record_document(doc)
+            data = build_report(doc, req.sections, k=req.summary_sentences, weighting=req.weighting,
+                                outline_depth=req.outline_depth, outline_granularity=req.outline_granularity,
+                                selected=selected)
+            data["source"] = "youtube_captions" if items else "pasted_text"
+            return data
+
+        params = {"k": req.summary_sentences, "sections": sorted(set(req.sections)), "source": bool(items),
+                  **_weighting_params(req.weighting), **_outline_params(req)}
+        _auto_index(doc, req.youtube_url if items else None)
+        return _cached_response("report", doc, params, request, response, compute, timings)
+
+    return await run_in_threadpool(work)
+
+async def _batch_results(req: BatchRequest):
+    """Fetch all inputs concurrently, fan the CPU work out to the process pool, yield in order."""
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+
+    async def one(item):
+        text, items = await _load_text(item.text, item.youtube_url)
+        lang = item.language or req.language
+        return await loop.run_in_executor(pool, report_worker, text, lang, items, req.sections,
+                                          req.summary_sentences, req.weighting)
+
+    tasks = [asyncio.ensure_future(one(item)) for item in req.items]
+    try:
+        for i, task in enumerate(tasks):
+            try:
+                yield {"index": i, "ok": True, "data": await task}
+            except HTTPException as e:
+                yield {"index": i, "ok": False, "error": e.detail}
+            except Exception as e:
+                yield error_result(i, e)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@router.post("/batch")
+async def batch(req: BatchRequest, request: Request):
+    if len(req.items) > config.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {config.BATCH_MAX_ITEMS} items per batch.")
+
+    if req.stream:
+        return ndjson_response(request, _batch_results(req))
+
+    results = [res async for res in _batch_results(req)]
+    return ApiResponse(ok=True, data={"results": results})
+
+def _live_session(session_id: str) -> LiveSession:
+    session = get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session.")
+    return session
+
+@router.post("/sessions", response_model=ApiResponse)
+def session_create(req: SessionCreateRequest):
+    session = create_session(req.language)
+    return ApiResponse(ok=True, data=session.status())
+
+@router.post("/sessions/{session_id}/append", response_model=ApiResponse)
+def session_append(session_id: str, req: SessionAppendRequest):
+    session = _live_session(session_id)
+    status = session.append(req.text)
+    touch_session(session)
+    return ApiResponse(ok=True, data=status)
+
+@router.get("/sessions/{session_id}/report", response_model=ApiResponse)
+def session_report(session_id: str, summary_sentences: int = Query(7, ge=3, le=15)):
+    session = _live_session(session_id)
+    return ApiResponse(ok=True, data=session.report(k=summary_sentences))
+
+@router.delete("/sessions/{session_id}", response_model=ApiResponse)
+def session_delete(session_id: str):
+    if not delete_session(session_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired session.")
+    return ApiResponse(ok=True, data={"session_id": session_id})
+
+@router.post("/timeline", response_model=ApiResponse)
+async def timeline_build(req: TimelineBuildRequest):
+    text, items = await _load_text(req.text, req.youtube_url)
+    video_id = _extract_video_id(req.youtube_url) if items is not None else None
+
+    def work():
+        doc = build_document(text, req.language, items)
+        if not doc.items:
+            raise HTTPException(status_code=400, detail="A timeline needs timestamped captions.")
+        index_id, idx = build_time_index(doc, video_id=video_id, window=req.window_sec)
+        with idx:
+            return {"index_id": index_id, **idx.info()}
+
+    return ApiResponse(ok=True, data=await run_in_threadpool(work))
+
+@router.get("/timeline/{index_id}", response_model=ApiResponse)
+async def timeline_range(index_id: str, start: str = Query("0", description="seconds, mm:ss or hh:mm:ss"),
+                         end: Optional[str] = Query(None, description="defaults to the end of the video"),
+                         keywords: int = Query(12, ge=1, le=50), sentences: int = Query(5, ge=0, le=15)):
+    try:
+        t0 = parse_time(start)
+        t1 = parse_time(end) if end is not None else None
+        idx = open_time_index(index_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if idx is None:
+        raise HTTPException(status_code=404, detail="Unknown timeline.")
+    with idx:
+        if t1 is None:
+            t1 = idx.duration
+        if t1 < t0:
+            raise HTTPException(status_code=400, detail="'end' must not be before 'start'.")
+        data = await run_in_threadpool(idx.query, t0, t1, keywords, sentences)
+    return ApiResponse(ok=True, data=data)
+
+def _search_index():
+    index = get_search_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search is disabled (set VA_SEARCH_INDEX_PATH to enable it).")
+    return index
+
+@router.post("/search/index", response_model=ApiResponse)
+async def search_index_add(req: SearchIndexRequest):
+    index = _search_index()
+    text, items = await _load_text(req.text, req.youtube_url)
+    video_id = req.video_id
+    if not video_id and items is not None:
+        video_id = _extract_video_id(req.youtube_url)
+    if not video_id:
+        raise HTTPException(status_code=400, detail="Provide 'video_id' when indexing pasted text.")
+
+    def work():
+        doc = build_document(text, req.language, items)
+        index.add(doc, video_id, req.title)
+        return {"video_id": video_id, "timestamps": bool(doc.items), **index.stats()}
+
+    return ApiResponse(ok=True, data=await run_in_threadpool(work))
+
+@router.get("/search", response_model=ApiResponse)
+async def search(q: str = Query(..., max_length=500), language: str = Query("en"),
+                 limit: int = Query(10, ge=1, le=100), max_times: int = Query(10, ge=1, le=32)):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Provide a search query.")
+    data = await run_in_threadpool(_search_index().search, q, language, limit, max_times)
+    return ApiResponse(ok=True, data=data)
+
+async def _submit_job(kind: str, text: str | None, run) -> Response:
+    try:
+        job = await get_job_queue().submit(kind, lane_for(text), run)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    body = ApiResponse(ok=True, data=_job_info(job))
+    return Response(body.model_dump_json(), status_code=202, media_type="application/json",
+                    headers={"Location": f"{router.prefix}/jobs/{job.id}"})
+
+def _job_info(job: Job) -> dict:
+    return job.info(get_job_queue().position(job))
+
+def _job(job_id: str) -> Job:
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    return job
+
+@router.post("/jobs/summarize", response_model=ApiResponse, status_code=202)
+async def job_summarize(req: SummarizeRequest):
+    async def run():
+        return (await _summarize(req, None, Response(), None)).data
+    return await _submit_job("summarize", req.text, run)
+
+@router.post("/jobs/analyze", response_model=ApiResponse, status_code=202)
+async def job_analyze(req: AnalyzeRequest):
+    async def run():
+        return (await _analyze(req, None, Response(), None)).data
+    return await _submit_job("analyze", req.text, run)
+
+@router.get("/jobs/{job_id}", response_model=ApiResponse)
+async def job_status(job_id: str):
+    return ApiResponse(ok=True, data=_job_info(_job(job_id)))
+
+@router.get("/jobs/{job_id}/stream")
+async def job_stream(job_id: str, request: Request):
+    """NDJSON: the current status, then a line per change (and every 15s) until the job finishes."""
+    job = _job(job_id)
+
+    async def lines():
+        while True:
+            yield _job_info(job)
+            if job.finished:
+                return
+            await job.wait_change(15.0)
+
+    return ndjson_response(request, lines())
+
+@router.delete("/jobs/{job_id}", response_model=ApiResponse)
+async def job_cancel(job_id: str):
+    job = _job(job_id)
+    if not get_job_queue().cancel(job):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}; only queued jobs can be cancelled.")
+    return ApiResponse(ok=True, data=_job_info(job))
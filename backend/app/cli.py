@@ -0,0 +1,196 @@
+"""
+python -m app PATH [PATH ...] [--out results.jsonl] [--checkpoint done.txt] [--workers N]
+
+Offline bulk analysis: every transcript file found under the given files,
+directories or glob patterns gets a report (summary / outline / analysis),
+written as one JSON line per file:
+
+  {"path": "...", "ok": true, "data": {...}}
+  {"path": "...", "ok": false, "error": "..."}
+
+Lines are written as files finish, not in input order. With --checkpoint,
+successfully analyzed paths are recorded and skipped on the next run (output
+is appended); failed files are not recorded, so a rerun retries them.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Iterable, Iterator, TextIO
+
+from app import config
+from app.services.captions import CaptionTrack
+from app.services.corpus import WEIGHTINGS, record_document
+from app.services.document import build_document
+from app.services.pool import make_executor
+from app.services.report import SECTIONS, build_report
+
+DEFAULT_EXTENSIONS = (".txt", ".json")
+
+
+def iter_paths(patterns: Iterable[str], extensions: Iterable[str] = DEFAULT_EXTENSIONS) -> Iterator[str]:
+    """Files named directly, files under directories (recursive) and glob matches; each once, sorted per pattern."""
+    exts = tuple(e.lower() for e in extensions)
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = []
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                found.extend(os.path.join(root, f) for f in files if f.lower().endswith(exts))
+        elif os.path.isfile(pattern):
+            found = [pattern]
+        else:
+            found = [p for p in glob.glob(pattern, recursive=True)
+                     if os.path.isfile(p) and p.lower().endswith(exts)]
+        for p in sorted(found):
+            if p not in seen:
+                seen.add(p)
+                yield p
+
+
+def load_transcript(path: str) -> tuple[str, CaptionTrack | None]:
+    """
+    .json: caption items ([{"text","start","duration"}] or {"items": [...]},
+    e.g. a saved /api/youtube-transcript response) or {"text": ...}.
+    Anything else is read as plain transcript text.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        raw = f.read()
+    if not path.lower().endswith(".json"):
+        return raw, None
+
+    data = json.loads(raw)
+    if isinstance(data, dict) and isinstance(data.get("data"), dict):
+        data = data["data"]  # ApiResponse envelope
+    if isinstance(data, dict) and "items" in data:
+        data = data["items"]
+    if isinstance(data, list):
+        track = CaptionTrack.from_items(data)
+        return track.joined_text(), track
+    if isinstance(data, dict) and isinstance(data.get("text"), str):
+        return data["text"], None
+    raise ValueError("Unrecognized JSON transcript layout.")
+
+
+def analyze_file(path: str, language: str, sections: list[str] | None, k: int, weighting: str = "tf") -> dict:
+    """Top-level (picklable) unit of work: read, analyze, return one output record."""
+    try:
+        text, items = load_transcript(path)
+        text = text.strip()
+        if not text:
+            raise ValueError("Empty transcript.")
+        doc = build_document(text, language, items)
+        record_document(doc)
+        data = build_report(doc, sections, k=k, weighting=weighting)
+        data["source"] = "youtube_captions" if items else "pasted_text"
+        return {"path": path, "ok": True, "data": data}
+    except Exception as e:
+        return {"path": path, "ok": False, "error": str(e) or e.__class__.__name__}
+
+
+def load_checkpoint(path: str | None) -> set[str]:
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def run(paths: list[str], out: TextIO, language: str = "en", sections: list[str] | None = None,
+        k: int = 7, workers: int = 0, checkpoint: TextIO | None = None, weighting: str = "tf",
+        progress: TextIO | None = None, progress_every: float = 2.0) -> dict:
+    """
+    Analyze `paths` on `workers` processes (0 = inline), writing JSONL to `out`.
+    At most 4 files per worker are in flight, so memory stays bounded.
+    Returns counters for the final summary line.
+    """
+    executor = make_executor(workers)
+    max_inflight = max(1, workers) * 4
+    pending: dict[Future, int] = {}
+    stats = {"files": 0, "ok": 0, "errors": 0, "bytes": 0, "seconds": 0.0}
+    total = len(paths)
+    started = last_report = time.perf_counter()
+
+    def emit(record: dict, size: int) -> None:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        if checkpoint is not None and record["ok"]:
+            checkpoint.write(record["path"] + "\n")
+            checkpoint.flush()
+        stats["files"] += 1
+        stats["bytes"] += size
+        stats["ok" if record["ok"] else "errors"] += 1
+
+    def report(final: bool = False) -> None:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        line = (f"{stats['files']}/{total} files, {stats['errors']} errors, "
+                f"{stats['files'] / elapsed:.1f} files/s, {stats['bytes'] / elapsed / 1e6:.2f} MB/s")
+        if final:
+            line = f"done in {elapsed:.1f}s: " + line
+        print(line, file=progress, flush=True)
+
+    try:
+        it = iter(paths)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_inflight:
+                path = next(it, None)
+                if path is None:
+                    exhausted = True
+                    break
+                size = os.path.getsize(path) if os.path.exists(path) else 0
+                pending[executor.submit(analyze_file, path, language, sections, k, weighting)] = size
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                emit(fut.result(), pending.pop(fut))
+            if progress is not None and time.perf_counter() - last_report >= progress_every:
+                last_report = time.perf_counter()
+                report()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    if progress is not None:
+        report(final=True)
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app", description="Bulk transcript analysis to JSONL.")
+    parser.add_argument("paths", nargs="+", help="files, directories (searched recursively) or glob patterns")
+    parser.add_argument("--out", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--checkpoint", help="file of finished paths; those are skipped and --out is appended to")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--sections", nargs="+", choices=list(SECTIONS), default=list(SECTIONS))
+    parser.add_argument("--summary-sentences", type=int, default=7)
+    parser.add_argument("--weighting", choices=WEIGHTINGS, default="tf",
+                        help="tfidf scores keywords and sentences against the corpus statistics")
+    parser.add_argument("--workers", type=int, default=config.WORKER_PROCESSES,
+                        help="worker processes (0 = inline; default VA_WORKER_PROCESSES)")
+    parser.add_argument("--ext", nargs="+", default=list(DEFAULT_EXTENSIONS),
+                        help="file extensions picked up from directories and globs")
+    parser.add_argument("--quiet", action="store_true", help="no progress lines on stderr")
+    args = parser.parse_args(argv)
+
+    done = load_checkpoint(args.checkpoint)
+    paths = [p for p in iter_paths(args.paths, args.ext) if p not in done]
+    if done and not args.quiet:
+        print(f"resuming: {len(done)} files already done", file=sys.stderr)
+
+    mode = "a" if args.checkpoint else "w"
+    out = sys.stdout if args.out == "-" else open(args.out, mode, encoding="utf-8")
+    ckpt = open(args.checkpoint, "a", encoding="utf-8") if args.checkpoint else None
+    try:
+        stats = run(paths, out, language=args.language, sections=args.sections, k=args.summary_sentences,
+                    workers=args.workers, checkpoint=ckpt, weighting=args.weighting, progress=None if args.quiet else sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if ckpt is not None:
+            ckpt.close()
+    return 1 if stats["errors"] else 0
@@ -0,0 +1,80 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name, default)
+
+
+# YouTube captions cache (empty path -> memory tier only)
+TRANSCRIPT_CACHE_TTL = _env_float("VA_TRANSCRIPT_CACHE_TTL", 24 * 3600.0)
+TRANSCRIPT_CACHE_SIZE = _env_int("VA_TRANSCRIPT_CACHE_SIZE", 256)
+TRANSCRIPT_CACHE_PATH = _env_str("VA_TRANSCRIPT_CACHE_PATH", "")
+TRANSCRIPT_CACHE_DISK_SIZE = _env_int("VA_TRANSCRIPT_CACHE_DISK_SIZE", 5000)
+
+# summarize/analyze result cache (empty path -> memory only)
+RESULT_CACHE_SIZE = _env_int("VA_RESULT_CACHE_SIZE", 512)
+RESULT_CACHE_PATH = _env_str("VA_RESULT_CACHE_PATH", "")
+RESULT_CACHE_DISK_SIZE = _env_int("VA_RESULT_CACHE_DISK_SIZE", 20000)
+
+# upstream YouTube fetches from the async API path
+YOUTUBE_FETCH_CONCURRENCY = _env_int("VA_YOUTUBE_FETCH_CONCURRENCY", 4)
+YOUTUBE_FETCH_TIMEOUT = _env_float("VA_YOUTUBE_FETCH_TIMEOUT", 20.0)
+
+# CPU worker processes for batch work (0 -> run inline in the calling process)
+WORKER_PROCESSES = _env_int("VA_WORKER_PROCESSES", os.cpu_count() or 1)
+BATCH_MAX_ITEMS = _env_int("VA_BATCH_MAX_ITEMS", 500)
+
+# live (growing) transcript sessions, kept in memory
+LIVE_SESSION_MAX = _env_int("VA_LIVE_SESSION_MAX", 100)
+LIVE_SESSION_TTL = _env_float("VA_LIVE_SESSION_TTL", 6 * 3600.0)
+
+# per-stage timers and /api/metrics (0 disables collection)
+METRICS_ENABLED = _env_int("VA_METRICS", 1) != 0
+
+# extra / replacement language profiles: <code>.json files (stopwords, lexicon, action hints)
+LANGUAGE_DIR = _env_str("VA_LANGUAGE_DIR", "")
+
+# per-video time indexes (memory-mapped files) for range queries
+TIME_INDEX_DIR = _env_str("VA_TIME_INDEX_DIR", ".cache/timeindex")
+TIME_INDEX_WINDOW = _env_float("VA_TIME_INDEX_WINDOW", 30.0)
+
+# cross-transcript search index (SQLite; empty path -> /api/search disabled);
+# with SEARCH_AUTO_INDEX, YouTube transcripts are added when analyzed
+SEARCH_INDEX_PATH = _env_str("VA_SEARCH_INDEX_PATH", "")
+SEARCH_AUTO_INDEX = _env_int("VA_SEARCH_AUTO_INDEX", 0) != 0
+
+# corpus document frequencies for TF-IDF weighting (empty path -> not recorded)
+CORPUS_STATS_PATH = _env_str("VA_CORPUS_STATS_PATH", "")
+CORPUS_IDF_REFRESH = _env_float("VA_CORPUS_IDF_REFRESH", 600.0)
+
+# near-duplicate transcripts reuse a cached summary's sentence selection
+# (MinHash similarity; 0, the default, disables)
+NEARDUP_THRESHOLD = _env_float("VA_NEARDUP_THRESHOLD", 0.0)
+NEARDUP_MAX_ENTRIES = _env_int("VA_NEARDUP_MAX_ENTRIES", 10000)
+
+# background jobs (/api/jobs): in-process workers, bounded queue, finished jobs kept for a while
+JOB_WORKERS = _env_int("VA_JOB_WORKERS", 2)
+JOB_QUEUE_MAX = _env_int("VA_JOB_QUEUE_MAX", 100)
+JOB_RESULT_TTL = _env_float("VA_JOB_RESULT_TTL", 3600.0)
+JOB_SHORT_CHARS = _env_int("VA_JOB_SHORT_CHARS", 50_000)
+
+# one huge transcript is map-reduced over the worker processes above this size
+PARALLEL_MIN_CHARS = _env_int("VA_PARALLEL_MIN_CHARS", 1_000_000)
+PARALLEL_CHUNK_CHARS = _env_int("VA_PARALLEL_CHUNK_CHARS", 250_000)
+
+# responses of at least this many bytes are gzip/brotli-compressed when accepted (0 disables)
+COMPRESS_MIN_BYTES = _env_int("VA_COMPRESS_MIN_BYTES", 1024)
@@ -1,15 +1,44 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from pathlib import Path
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router as api_router
+from app.services.pool import shutdown_process_pool
+from app.services.jobs import shutdown_job_queue
+from app.services.youtube import shutdown_fetch_pool
+from app.services import metrics
+from app import config
 
 BASE_DIR = Path(__file__).resolve().parent
 
 app = FastAPI(title="Video Analyzer (No AI)")
 app.include_router(api_router)
+app.add_event_handler("shutdown", shutdown_process_pool)
+app.add_event_handler("shutdown", shutdown_job_queue)
+app.add_event_handler("shutdown", shutdown_fetch_pool)
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    if not config.METRICS_ENABLED:
+        return await call_next(request)
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.registry.inc("va_http_requests_total",
+                             {"route": path, "method": request.method, "status": status})
+        metrics.registry.observe("va_http_request_seconds", time.perf_counter() - t0, {"route": path})
+        size = request.headers.get("content-length")
+        if size and size.isdigit():
+            metrics.registry.observe("va_http_request_bytes", int(size), {"route": path})
 
 app.add_middleware(
     CORSMiddleware,
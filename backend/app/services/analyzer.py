@@ -1,138 +1,75 @@
 import re
-from collections import Counter
-from app.services.text_utils import clean_text, split_sentences, tokenize_words, top_keywords, top_bigrams
-from app.services.text_utils import parse_timestamped_transcript
+from app.services.document import TranscriptDocument, build_document
+from app.services.extractors import FORMULA_RE, ExtractorSet
+from app.services.languages import get_profile
+from app.services.metrics import timed
 
 
-_POS = {"good","great","excellent","love","like","awesome","clear","useful","helpful","amazing","success"}
-_NEG = {"bad","terrible","hate","awful","confusing","unclear","useless","wrong","fail","problem","issue"}
-
-_ACTION_HINTS_EN = ("should", "need to", "must", "let's", "we will", "do this", "make sure", "remember to")
-_ACTION_HINTS_RU = ("нужно", "надо", "следует", "давайте", "мы будем", "сделайте", "убедитесь", "помните")
-_ACTION_HINTS_KK = ("керек", "қажет", "жасайық", "біз", "ұмытпа", "есіңізде")
-
-FORMULA_RE = re.compile(r"\b(theta|λ|lambda|intensity|I0|I)\b[^.\n]{0,80}", re.IGNORECASE)
-
-def _action_hints(lang: str):
-    lang = (lang or "en").lower()
-    if lang.startswith("ru"):
-        return _ACTION_HINTS_RU
-    if lang.startswith("kk") or lang.startswith("kz"):
-        return _ACTION_HINTS_KK
-    return _ACTION_HINTS_EN
-
-def _sentiment_score(words: list[str]) -> int:
-    score = 0
-    for w in words:
-        if w in _POS:
-            score += 1
-        if w in _NEG:
-            score -= 1
-    return score
-
-def rake_phrases(text: str, language: str = "en", max_phrases: int = 12) -> list[dict]:
+@timed("rake_phrases")
+def rake_phrases(text: str, language: str = "en", max_phrases: int = 12,
+                 doc: TranscriptDocument | None = None) -> list[dict]:
     """
-    Simple RAKE-like phrase extraction:
-    - Split on stopwords/punctuation
-    - Score by word frequency/degree
+    RAKE phrase extraction (see keyphrases.RakeScanner):
+    - Split on stopwords/punctuation in one pass over the text
+    - Score by word degree/frequency
     """
-    words = tokenize_words(text, language)
-    if not words:
+    if doc is None:
+        doc = build_document(text, language)
+    if not doc.words:
         return []
+    return doc.rake.top(max_phrases)
 
-    # Build candidate phrases by splitting original text on punctuation/newlines
-    cleaned = clean_text(text.lower())
-    parts = re.split(r"[.!?,:;\n()\[\]\"“”‘’]+", cleaned)
-
-    sw = set()  # we already filtered in tokenize_words; here keep it simple
-    candidates = []
-    for p in parts:
-        toks = [t for t in re.findall(r"[a-zа-яёәғқңөұүі0-9']+", p) if t and t not in sw]
-        # keep only meaningful tokens (>=3 chars)
-        toks = [t for t in toks if len(t) >= 3 and not t.isdigit()]
-        if 2 <= len(toks) <= 6:
-            candidates.append(toks)
-
-    freq = Counter(words)
-    degree = Counter()
-    for cand in candidates:
-        deg = len(cand) - 1
-        for w in cand:
-            degree[w] += deg
-
-    scored = []
-    for cand in candidates:
-        score = 0.0
-        for w in cand:
-            score += (degree[w] + freq[w]) / max(1, freq[w])
-        phrase = " ".join(cand)
-        scored.append((phrase, score))
-
-    seen = set()
-    out = []
-    for phrase, score in sorted(scored, key=lambda x: x[1], reverse=True):
-        if phrase in seen:
-            continue
-        seen.add(phrase)
-        out.append({"phrase": phrase, "score": round(score, 2)})
-        if len(out) >= max_phrases:
-            break
-    return out
-
-def analyze_transcript(text: str, language: str = "en", yt_items: list[dict] | None = None) -> dict:
-    text = clean_text(text)
-    sents = split_sentences(text)
-    words = tokenize_words(text, language)
+# detector output with its own place in the analysis; the rest goes after it
+_CORE_DETECTORS = ("questions", "action_items", "numeric_mentions")
 
-    word_count = len(re.findall(r"\S+", text))
-    sentence_count = len(sents)
-    reading_time_min = round(max(1, word_count) / 180.0, 2)  # ~180 wpm conservative
+def extra_detections(found: dict[str, list[str]]) -> dict[str, list[str]]:
+    """urls, dates, definitions and any detector registered later."""
+    return {k: v for k, v in found.items() if k not in _CORE_DETECTORS}
 
-    kws = [{"word": w, "count": c} for (w, c) in top_keywords(text, language, k=12)]
-    bigrams = [{"bigram": b, "count": c} for (b, c) in top_bigrams(text, language, k=10)]
-    phrases = rake_phrases(text, language, max_phrases=12)
+def _sentiment_label(score: int) -> str:
+    if score >= 3:
+        return "positive"
+    if score <= -3:
+        return "negative"
+    return "neutral"
 
-    questions = [s for s in sents if s.endswith("?")][:12]
-
-    hints = _action_hints(language)
-    action_items = []
-    for s in sents:
-        low = s.lower()
-        if any(h in low for h in hints):
-            action_items.append(s)
-        if len(action_items) >= 12:
-            break
-
-    nums = re.findall(r"\b\d+(?:\.\d+)?\b", text)
-    nums = nums[:20]
+def transcript_stats(doc: TranscriptDocument) -> dict:
+    word_count = len(re.findall(r"\S+", doc.text))
+    return {
+        "word_count": word_count,
+        "sentence_count": len(doc.sentences),
+        "reading_time_min": round(max(1, word_count) / 180.0, 2),  # ~180 wpm conservative
+        "has_timestamps": bool(doc.items),
+    }
 
-    sentiment = _sentiment_score(words)
-    sentiment_label = "neutral"
-    if sentiment >= 3:
-        sentiment_label = "positive"
-    elif sentiment <= -3:
-        sentiment_label = "negative"
+@timed("analyze")
+def analyze_transcript(text: str, language: str = "en", yt_items: list[dict] | None = None,
+                       doc: TranscriptDocument | None = None) -> dict:
+    if doc is None:
+        doc = build_document(text, language, yt_items)
+    text = doc.text
 
-    if yt_items is None:
-        yt_items = parse_timestamped_transcript(text)
+    kws = [{"word": w, "count": c} for (w, c) in doc.top_keywords(12)]
+    bigrams = [{"bigram": b, "count": c} for (b, c) in doc.top_bigrams(10)]
+    phrases = rake_phrases(text, language, max_phrases=12, doc=doc)
 
-    has_timestamps = bool(yt_items)
+    # questions, action items, numbers, ... in one pass over the sentence parts
+    found = ExtractorSet(language).run(doc.parts).results()
 
+    profile = get_profile(language)
+    sentiment = profile.sentiment_score(doc.words)
+    sentiment_label = _sentiment_label(sentiment)
 
     return {
-        "stats": {
-            "word_count": word_count,
-            "sentence_count": sentence_count,
-            "reading_time_min": reading_time_min,
-            "has_timestamps": has_timestamps
-        },
+        "stats": transcript_stats(doc),
         "formula_snippets": extract_formula_snippets(text),
         "keywords": kws,
         "bigrams": bigrams,
         "keyphrases": phrases,
-        "questions": questions,
-        "action_items": action_items,
-        "numeric_mentions": nums,
+        "questions": found["questions"],
+        "action_items": found["action_items"],
+        "numeric_mentions": found["numeric_mentions"],
+        **extra_detections(found),
         "sentiment": {
             "score": sentiment,
             "label": sentiment_label
@@ -141,9 +78,11 @@ def analyze_transcript(text: str, language: str = "en", yt_items: list[dict] | N
 
 def extract_formula_snippets(text: str, limit: int = 12) -> list[str]:
     hits = []
+    seen = set()
     for m in FORMULA_RE.finditer(text):
         s = m.group(0).strip()
-        if len(s) >= 12 and s not in hits:
+        if len(s) >= 12 and s not in seen:
+            seen.add(s)
             hits.append(s)
         if len(hits) >= limit:
             break
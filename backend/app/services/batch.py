@@ -0,0 +1,88 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+from app import config
+from app.services.captions import CaptionTrack
+from app.services.corpus import record_document
+from app.services.document import build_document
+from app.services.pool import get_process_pool, make_executor
+from app.services.report import build_report
+from app.services.youtube import fetch_youtube_transcript
+
+
+def resolve_input(item: dict) -> tuple[str, CaptionTrack | None]:
+    """
+    {"text": ...} or {"youtube_url": ...} -> (text, caption items or None).
+    Raises ValueError when there is nothing to analyze.
+    """
+    items = None
+    text = (item.get("text") or "").strip()
+
+    if not text and item.get("youtube_url"):
+        items = fetch_youtube_transcript(item["youtube_url"])
+        text = items.joined_text().strip()
+
+    if not text:
+        raise ValueError("Provide 'text' or 'youtube_url' with available captions.")
+    return text, items
+
+
+def report_worker(text: str, language: str, items: CaptionTrack | None,
+                  sections: list[str] | None, k: int, weighting: str = "tf") -> dict:
+    """Top-level (picklable) unit of CPU work for the process pool."""
+    doc = build_document(text, language, items)
+    record_document(doc)
+    data = build_report(doc, sections, k=k, weighting=weighting)
+    data["source"] = "youtube_captions" if items else "pasted_text"
+    return data
+
+
+def error_result(index: int, e: BaseException) -> dict:
+    return {"index": index, "ok": False, "error": str(e) or e.__class__.__name__}
+
+
+def _iter_on(executor: Executor, inputs: list[dict], sections: list[str] | None, k: int,
+             language: str, weighting: str) -> Iterator[dict]:
+    def start(item: dict) -> Future:
+        # fetch thread: resolve the input, then hand the CPU work to the executor
+        text, items = resolve_input(item)
+        lang = item.get("language") or language
+        return executor.submit(report_worker, text, lang, items, sections, k, weighting)
+
+    # inputs resolve concurrently (YouTube fetches overlap), results still come out in input order
+    fetchers = ThreadPoolExecutor(max(1, min(len(inputs), config.YOUTUBE_FETCH_CONCURRENCY)),
+                                  thread_name_prefix="batch-fetch")
+    try:
+        started = [fetchers.submit(start, item) for item in inputs]
+        for i, fut in enumerate(started):
+            try:
+                yield {"index": i, "ok": True, "data": fut.result().result()}
+            except Exception as e:
+                yield error_result(i, e)
+    finally:
+        fetchers.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_batch(inputs: Iterable[dict], sections: list[str] | None = None, k: int = 7,
+               language: str = "en", workers: int | None = None, weighting: str = "tf") -> Iterator[dict]:
+    """
+    Report for many transcripts, CPU work spread over a process pool.
+    Inputs are resolved (YouTube fetches) concurrently. Yields {"index", "ok",
+    "data" | "error"} in input order, each as soon as it and the ones before it are ready.
+    `workers` uses a private pool of that size instead of the shared one (0 = inline).
+    """
+    inputs = list(inputs)
+    if workers is None:
+        yield from _iter_on(get_process_pool(), inputs, sections, k, language, weighting)
+        return
+    executor = make_executor(workers)
+    try:
+        yield from _iter_on(executor, inputs, sections, k, language, weighting)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def analyze_batch(inputs: Iterable[dict], sections: list[str] | None = None, k: int = 7,
+                  language: str = "en", workers: int | None = None, weighting: str = "tf") -> list[dict]:
+    return list(iter_batch(inputs, sections=sections, k=k, language=language, workers=workers,
+                           weighting=weighting))
@@ -0,0 +1,229 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU with optional TTL (seconds, None = no expiry).
+    on_evict(key, value) is called, outside the lock, for every value the
+    cache drops by itself: LRU eviction, TTL expiry, replacement or clear().
+    Values removed with pop() are the caller's.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float | None = None,
+                 on_evict: Callable[[str, Any], None] | None = None):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _dropped(self, dropped: list[tuple[str, Any]]) -> None:
+        if self.on_evict is not None:
+            for key, value in dropped:
+                self.on_evict(key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            stored_at, value = entry
+            expired = self.ttl is not None and time.time() - stored_at > self.ttl
+            if expired:
+                del self._data[key]
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if expired:
+            self._dropped([(key, value)])
+            return default
+        return value
+
+    def set(self, key: str, value: Any, stored_at: float | None = None) -> None:
+        if self.max_entries == 0:
+            return
+        dropped = []
+        with self._lock:
+            old = self._data.get(key)
+            if old is not None and old[1] is not value:
+                dropped.append((key, old[1]))
+            self._data[key] = (time.time() if stored_at is None else stored_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                k, (_, v) = self._data.popitem(last=False)
+                dropped.append((k, v))
+                self.evictions += 1
+        self._dropped(dropped)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            dropped = [(k, v) for k, (_, v) in self._data.items()]
+            self._data.clear()
+        self._dropped(dropped)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SqliteCache:
+    """
+    On-disk key -> JSON value store with TTL and a bound on row count
+    (least recently used rows are dropped first).
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, ttl: float | None = None):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_used_at ON cache(used_at)")
+
+    def get_entry(self, key: str) -> tuple[float, Any] | None:
+        """Returns (stored_at, value) or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, stored_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, stored_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return stored_at, json.loads(value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            extra = count - self.max_entries
+            if extra > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used_at LIMIT ?)",
+                    (extra,),
+                )
+                self.evictions += extra
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        return count
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional SqliteCache.
+    Disk hits are promoted into memory (keeping their original timestamp, so TTL holds).
+    `encode` / `decode` convert values to / from JSON-able form for the disk tier.
+    """
+
+    def __init__(self, memory: LRUCache, disk: SqliteCache | None = None,
+                 encode: Callable[[Any], Any] | None = None, decode: Callable[[Any], Any] | None = None):
+        self.memory = memory
+        self.disk = disk
+        self.encode = encode
+        self.decode = decode
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        return self.get_from_disk(key, default)
+
+    def get_from_disk(self, key: str, default: Any = None) -> Any:
+        """
+        The disk half of get(): a blocking SQLite read, so async callers check
+        `memory` on the loop and run this in a thread.
+        """
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.decode is not None:
+                    value = self.decode(value)
+                self.memory.set(key, value, stored_at=stored_at)
+                return value
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value if self.encode is None else self.encode(value))
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
@@ -0,0 +1,114 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator
+
+
+class CaptionTrack:
+    """
+    Caption items stored column-wise: start / duration as array('d') and all
+    texts in one string with an offset table, instead of one dict per line.
+
+    Iterating or indexing yields {"text", "start", "duration"} dicts, and
+    to_list() gives the JSON the API has always returned. When starts are
+    non-decreasing (the normal case) time ranges are found by binary search.
+    """
+
+    __slots__ = ("starts", "durations", "_text", "_offsets", "monotonic")
+
+    def __init__(self, starts: array, durations: array, text: str, offsets: array):
+        self.starts = starts
+        self.durations = durations
+        self._text = text
+        self._offsets = offsets  # len(starts) + 1 entries
+        self.monotonic = all(starts[i] <= starts[i + 1] for i in range(len(starts) - 1))
+
+    @classmethod
+    def from_columns(cls, starts: Iterable[float], durations: Iterable[float], texts: Iterable[str]) -> "CaptionTrack":
+        offsets = array("q", [0])
+        parts: list[str] = []
+        pos = 0
+        for t in texts:
+            parts.append(t)
+            pos += len(t)
+            offsets.append(pos)
+        return cls(array("d", starts), array("d", durations), "".join(parts), offsets)
+
+    @classmethod
+    def from_items(cls, items: Iterable[dict]) -> "CaptionTrack":
+        starts: list[float] = []
+        durations: list[float] = []
+        texts: list[str] = []
+        for it in items:
+            starts.append(float(it.get("start", 0.0)))
+            durations.append(float(it.get("duration", 0.0)))
+            texts.append(it.get("text") or "")
+        return cls.from_columns(starts, durations, texts)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __repr__(self) -> str:
+        return f"CaptionTrack({len(self)} items)"
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    def text(self, i: int) -> str:
+        return self._text[self._offsets[i]:self._offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("caption index out of range")
+        return {"text": self.text(i), "start": self.starts[i], "duration": self.durations[i]}
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield {"text": self.text(i), "start": self.starts[i], "duration": self.durations[i]}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CaptionTrack):
+            return (self.starts == other.starts and self.durations == other.durations
+                    and self._offsets == other._offsets and self._text == other._text)
+        return NotImplemented
+
+    def texts(self) -> Iterator[str]:
+        off, text = self._offsets, self._text
+        for i in range(len(self)):
+            yield text[off[i]:off[i + 1]]
+
+    def joined_text(self) -> str:
+        """Non-empty caption lines joined by newlines."""
+        return "\n".join(t for t in self.texts() if t)
+
+    def to_list(self) -> list[dict]:
+        return list(self)
+
+    def index_after(self, t: float, lo: int = 0) -> int:
+        """First index >= lo whose start is > t (starts must be monotonic)."""
+        return bisect_right(self.starts, t, lo)
+
+    def index_range(self, t0: float, t1: float) -> tuple[int, int]:
+        """[lo, hi) of the items with t0 <= start <= t1 (starts must be monotonic)."""
+        return bisect_left(self.starts, t0), bisect_right(self.starts, t1)
+
+    def slice(self, lo: int, hi: int) -> "CaptionTrack":
+        lo, hi, _ = slice(lo, hi).indices(len(self))
+        hi = max(lo, hi)
+        base = self._offsets[lo]
+        offsets = array("q", (o - base for o in self._offsets[lo:hi + 1]))
+        return CaptionTrack(self.starts[lo:hi], self.durations[lo:hi],
+                            self._text[base:self._offsets[hi]], offsets)
+
+    def between(self, t0: float, t1: float) -> "CaptionTrack":
+        """Items starting within [t0, t1] seconds."""
+        if not self.monotonic:
+            return CaptionTrack.from_items(it for it in self if t0 <= it["start"] <= t1)
+        return self.slice(*self.index_range(t0, t1))
+
+
+def as_track(items: "CaptionTrack | Iterable[dict] | None") -> CaptionTrack | None:
+    if items is None or isinstance(items, CaptionTrack):
+        return items
+    return CaptionTrack.from_items(items)
@@ -0,0 +1,206 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Iterable
+
+from app import config
+from app.services.topk import top_k
+
+WEIGHTINGS = ("tf", "tfidf")
+
+_stats: "CorpusStats | None" = None
+_stats_pid = 0
+_table: "IdfTable | None" = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+class IdfTable:
+    """
+    Immutable snapshot of corpus document frequencies.
+
+    idf(t) = ln((1 + N) / (1 + df(t))) + 1, so an empty corpus weighs every
+    term 1.0 and TF-IDF ranking falls back to plain counts. Bigrams use the
+    mean idf of their two words (only single-word frequencies are stored).
+    """
+
+    __slots__ = ("n_docs", "_df", "_idf")
+
+    def __init__(self, n_docs: int, df: dict[str, int]):
+        self.n_docs = n_docs
+        self._df = df
+        self._idf: dict[str, float] = {}
+
+    @property
+    def version(self) -> int:
+        # frequencies only grow with the document count, so it identifies the snapshot
+        return self.n_docs
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def df(self, term: str) -> int:
+        return self._df.get(term, 0)
+
+    def idf(self, term: str) -> float:
+        v = self._idf.get(term)
+        if v is None:
+            v = math.log((1 + self.n_docs) / (1 + self._df.get(term, 0))) + 1.0
+            if len(self._idf) < 200_000:
+                self._idf[term] = v
+        return v
+
+    def bigram_idf(self, bigram: str) -> float:
+        a, _, b = bigram.partition(" ")
+        return (self.idf(a) + self.idf(b)) / 2 if b else self.idf(a)
+
+    def weigh(self, counts: Counter, bigrams: bool = False) -> dict[str, float]:
+        idf = self.bigram_idf if bigrams else self.idf
+        return {t: c * idf(t) for t, c in counts.items()}
+
+    def rank(self, counts: Counter, k: int, bigrams: bool = False) -> list[tuple[str, float]]:
+        """Top k by tf * idf; ties keep first-occurrence order, like most_common."""
+        best = top_k(self.weigh(counts, bigrams).items(), k, key=lambda x: x[1])
+        return [(t, round(s, 4)) for t, s in best]
+
+
+class CorpusStats:
+    """
+    Document frequencies over every transcript processed, in SQLite.
+
+    Each transcript counts once (keyed by a hash of language + text); the
+    update is a single IMMEDIATE transaction, so any number of threads and
+    worker processes can record into the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS df (term TEXT PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    @staticmethod
+    def doc_key(language: str, text: str) -> bytes:
+        h = hashlib.sha256()
+        h.update((language or "").encode())
+        h.update(b"\0")
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.digest()[:16]
+
+    def record(self, language: str, text: str, terms: Iterable[str]) -> bool:
+        """Count one transcript's distinct terms; False if it was already counted."""
+        key = self.doc_key(language, text)
+        rows = [(t,) for t in set(terms)]
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,))
+                if cur.rowcount == 0:
+                    cur.execute("COMMIT")
+                    return False
+                cur.executemany("INSERT INTO df (term, n) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET n = n + 1", rows)
+                cur.execute("INSERT INTO meta (key, value) VALUES ('docs', 1) "
+                            "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+        return True
+
+    def record_document(self, doc) -> bool:
+        return self.record(doc.language, doc.text, doc.freq)
+
+    def n_docs(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'docs'").fetchone()
+        return row[0] if row else 0
+
+    def snapshot(self) -> IdfTable:
+        with self._lock:
+            # one read transaction: the count and the frequencies agree
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                row = cur.execute("SELECT value FROM meta WHERE key = 'docs'").fetchone()
+                df = dict(cur.execute("SELECT term, n FROM df"))
+            finally:
+                cur.execute("COMMIT")
+        return IdfTable(row[0] if row else 0, df)
+
+
+def get_corpus_stats() -> "CorpusStats | None":
+    """
+    None when VA_CORPUS_STATS_PATH is empty (recording disabled).
+    Forked worker processes open their own connection.
+    """
+    global _stats, _stats_pid
+    if (_stats is None or _stats_pid != os.getpid()) and config.CORPUS_STATS_PATH:
+        with _lock:
+            if _stats is None or _stats_pid != os.getpid():
+                _stats = CorpusStats(config.CORPUS_STATS_PATH)
+                _stats_pid = os.getpid()
+    return _stats
+
+
+def set_corpus_stats(stats: "CorpusStats | None") -> None:
+    global _stats, _stats_pid, _table
+    _stats = stats
+    _stats_pid = os.getpid()
+    _table = None
+
+
+def record_document(doc) -> bool:
+    stats = get_corpus_stats()
+    return stats.record_document(doc) if stats is not None else False
+
+
+def get_idf_table() -> IdfTable:
+    """
+    Process-wide read-only snapshot, loaded on first use and then reused by
+    every request; re-read after VA_CORPUS_IDF_REFRESH seconds (0 = never).
+    Worker processes forked after it is loaded share the parent's copy.
+    """
+    global _table, _loaded_at
+    table = _table
+    refresh = config.CORPUS_IDF_REFRESH
+    if table is not None and (refresh <= 0 or time.monotonic() - _loaded_at < refresh):
+        return table
+    stats = get_corpus_stats()
+    with _lock:
+        if _table is None or _table is table:
+            _table = stats.snapshot() if stats is not None else IdfTable(0, {})
+            _loaded_at = time.monotonic()
+        return _table
+
+
+def preload() -> None:
+    """Load the snapshot now if there is a stats file (before forking workers)."""
+    if config.CORPUS_STATS_PATH and os.path.exists(config.CORPUS_STATS_PATH):
+        get_idf_table()
+
+
+def set_idf_table(table: IdfTable | None) -> None:
+    """Install a snapshot (or None to re-read on next use)."""
+    global _table, _loaded_at
+    _table = table
+    _loaded_at = time.monotonic()
+
+
+def idf_for(weighting: str) -> IdfTable | None:
+    """None for plain counts ("tf"), the shared snapshot for "tfidf"."""
+    if weighting == "tf":
+        return None
+    if weighting == "tfidf":
+        return get_idf_table()
+    raise ValueError(f"Unknown weighting {weighting!r} (expected one of {', '.join(WEIGHTINGS)}).")
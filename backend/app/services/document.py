@@ -0,0 +1,144 @@
+from bisect import bisect_left
+from collections import Counter
+from functools import cached_property
+
+from app.services.captions import CaptionTrack, as_track
+from app.services.corpus import IdfTable
+from app.services.keyphrases import RakeScanner
+from app.services.text_utils import (
+    clean_text,
+    sentence_spans,
+    tokenize_with_offsets,
+    tokenize_words,
+    parse_timestamped_transcript,
+    caption_chunks,
+)
+from app.services.metrics import observe_size, stage
+from app.services.topk import most_common
+
+
+class TranscriptDocument:
+    """
+    One transcript, cleaned and tokenized once per request.
+
+    Everything beyond the normalized text is computed lazily on first access
+    and then reused, so summarizer / analyzer / outline can share the work.
+    """
+
+    def __init__(self, text: str, language: str = "en", yt_items: CaptionTrack | list[dict] | None = None):
+        self.raw = text or ""
+        self.language = language
+        # set by mapreduce.prepare_document: sentence scoring may fan out to it
+        self.executor = None
+        observe_size("va_transcript_chars", len(self.raw))
+        with stage("clean_text"):
+            self.text = clean_text(self.raw)
+        # if user pasted timestamps, parse them
+        if yt_items is None:
+            with stage("parse_timestamps"):
+                yt_items = parse_timestamped_transcript(self.raw)
+        self.items = as_track(yt_items)
+
+    @cached_property
+    def _tokens(self) -> tuple[list[int], list[str]]:
+        with stage("tokenize"):
+            return tokenize_with_offsets(self.text, self.language)
+
+    @property
+    def words(self) -> list[str]:
+        return self._tokens[1]
+
+    @cached_property
+    def freq(self) -> Counter:
+        return Counter(self.words)
+
+    @cached_property
+    def bigram_freq(self) -> Counter:
+        w = self.words
+        return Counter(f"{w[i]} {w[i+1]}" for i in range(len(w) - 1))
+
+    @cached_property
+    def rake(self) -> RakeScanner:
+        """RAKE run statistics over the whole text (closed; call top())."""
+        scanner = RakeScanner(self.language)
+        scanner.feed(self.text)
+        scanner.close()
+        return scanner
+
+    @cached_property
+    def part_spans(self) -> list[tuple[int, int, str]]:
+        """All sentence parts, before the >= 40 chars filter."""
+        with stage("split_sentences"):
+            return sentence_spans(self.text, min_chars=0)
+
+    @cached_property
+    def spans(self) -> list[tuple[int, int, str]]:
+        return [sp for sp in self.part_spans if len(sp[2]) >= 40]
+
+    @property
+    def parts(self) -> list[str]:
+        return [s for (_, _, s) in self.part_spans]
+
+    @property
+    def sentences(self) -> list[str]:
+        return [s for (_, _, s) in self.spans]
+
+    @cached_property
+    def sentence_tokens(self) -> list[list[str]]:
+        # tokens never straddle a sentence boundary (boundaries are whitespace),
+        # so slicing the global token stream by offset == tokenizing each sentence
+        offsets, words = self._tokens
+        out = []
+        for start, end, _ in self.spans:
+            lo = bisect_left(offsets, start)
+            hi = bisect_left(offsets, end, lo)
+            out.append(words[lo:hi])
+        return out
+
+    @cached_property
+    def item_tokens(self) -> list[list[str]]:
+        return [tokenize_words(t, self.language) for t in self.items.texts()] if self.items else []
+
+    @cached_property
+    def sentence_counts(self) -> list[Counter]:
+        """Per-sentence token counts, merged by the outline instead of re-counting tokens."""
+        return [Counter(toks) for toks in self.sentence_tokens]
+
+    @cached_property
+    def item_counts(self) -> list[Counter]:
+        return [Counter(toks) for toks in self.item_tokens]
+
+    @cached_property
+    def caption_chunks(self) -> list[tuple[float, float, str]]:
+        """Caption sentences with (start, end) seconds."""
+        with stage("captions_to_sentences"):
+            return caption_chunks(self.items) if self.items else []
+
+    @cached_property
+    def caption_sentences(self) -> list[str]:
+        return [s for (_, _, s) in self.caption_chunks]
+
+    @cached_property
+    def caption_sentence_tokens(self) -> list[list[str]]:
+        return [tokenize_words(s, self.language) for s in self.caption_sentences]
+
+    @property
+    def units(self) -> list[str]:
+        """Sentences used for extractive summary: caption chunks when timed, else text sentences."""
+        return self.caption_sentences if self.items else self.sentences
+
+    @property
+    def unit_tokens(self) -> list[list[str]]:
+        return self.caption_sentence_tokens if self.items else self.sentence_tokens
+
+    def top_keywords(self, k: int = 12, idf: IdfTable | None = None) -> list[tuple[str, float]]:
+        """Counts, or tf * idf scores when an IDF table is given."""
+        return most_common(self.freq, k) if idf is None else idf.rank(self.freq, k)
+
+    def top_bigrams(self, k: int = 10, idf: IdfTable | None = None) -> list[tuple[str, float]]:
+        return most_common(self.bigram_freq, k) if idf is None else idf.rank(self.bigram_freq, k, bigrams=True)
+
+
+def build_document(text: str, language: str = "en",
+                   yt_items: CaptionTrack | list[dict] | None = None) -> TranscriptDocument:
+    return TranscriptDocument(text, language=language, yt_items=yt_items)
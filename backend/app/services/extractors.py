@@ -0,0 +1,242 @@
+import copy
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+
+from app.services.languages import LanguageProfile, get_profile
+
+FORMULA_RE = re.compile(r"\b(theta|λ|lambda|intensity|I0|I)\b[^.\n]{0,80}", re.IGNORECASE)
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+URL_RE = re.compile(r"\b(?:https?://|www\.)[^\s<>\"'()\[\]]+[^\s<>\"'()\[\].,;:!?]", re.IGNORECASE)
+
+_MONTHS = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+           r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+DATE_RE = re.compile(
+    r"\b(?:\d{4}-\d{2}-\d{2}"                                  # 2024-03-05
+    r"|\d{1,2}[./]\d{1,2}[./](?:\d{4}|\d{2})"                  # 05.03.2024, 3/5/24
+    rf"|{_MONTHS}\.? \d{{1,2}}(?:st|nd|rd|th)?(?:,? \d{{4}})?"  # March 5th, 2024
+    rf"|\d{{1,2}} {_MONTHS}(?: \d{{4}})?)\b",                   # 5 March 2024
+    re.IGNORECASE,
+)
+
+
+class FormulaScanner:
+    """
+    FORMULA_RE over normalized text fed in pieces, with the same hits as one
+    finditer() over the whole text (snippets may run across line and caption
+    boundaries, so this can't be a per-part Detector).
+
+    A match touching the end of the buffer may still grow; it is kept, along
+    with a short tail that may hold the start of a keyword, until more text
+    or close() settles it.
+    """
+
+    _TAIL = 9  # longest keyword ("intensity")
+
+    def __init__(self, limit: int = 12):
+        self.limit = limit
+        self.hits: list[str] = []
+        self._seen: set[str] = set()
+        self._buf = ""
+        self._pos = 0
+
+    @property
+    def done(self) -> bool:
+        return len(self.hits) >= self.limit
+
+    def feed(self, piece: str) -> None:
+        if piece and not self.done:
+            self._buf += piece
+            self._scan(final=False)
+
+    def close(self) -> None:
+        if not self.done:
+            self._scan(final=True)
+        self._buf = ""
+        self._pos = 0
+
+    def _scan(self, final: bool) -> None:
+        buf, pos, end = self._buf, self._pos, len(self._buf)
+        for m in FORMULA_RE.finditer(buf, pos):
+            if not final and m.end() >= end:
+                pos = m.start()
+                break
+            pos = m.end()
+            s = m.group(0).strip()
+            if len(s) >= 12 and s not in self._seen:
+                self._seen.add(s)
+                self.hits.append(s)
+                if self.done:
+                    break
+        else:
+            pos = max(pos, end - self._TAIL)
+        cut = max(pos - 1, 0)  # one char of context for the leading \b
+        self._buf = buf[cut:]
+        self._pos = pos - cut
+
+    def copy(self) -> "FormulaScanner":
+        other = copy.copy(self)
+        other.hits = list(self.hits)
+        other._seen = set(self._seen)
+        return other
+
+
+class Detector(ABC):
+    """
+    One kind of hit looked for in every sentence part.
+
+    - name: key in the analysis output
+    - limit: the extractor stops calling find() once this many hits are kept
+    - min_len: shorter parts are skipped (sentence-level detectors use 40,
+      the same cut as split_sentences)
+    - dedupe: drop repeated hits (set lookup)
+    - needs_lower: find() also wants the lowercased part
+    """
+
+    name = ""
+    limit = 12
+    min_len = 0
+    dedupe = False
+    needs_lower = False
+
+    @abstractmethod
+    def find(self, part: str, lower: str | None) -> Iterable[str]:
+        """Hits in `part` (`lower` is its lowercase form when needs_lower is set, else None)."""
+
+
+class RegexDetector(Detector):
+    def __init__(self, name: str, pattern: re.Pattern, limit: int = 12, min_hit_len: int = 0,
+                 dedupe: bool = False, strip: bool = False):
+        self.name = name
+        self.pattern = pattern
+        self.limit = limit
+        self.min_hit_len = min_hit_len
+        self.dedupe = dedupe
+        self.strip = strip
+
+    def find(self, part: str, lower: str | None) -> Iterable[str]:
+        for m in self.pattern.finditer(part):
+            s = m.group(0).strip() if self.strip else m.group(0)
+            if len(s) >= self.min_hit_len:
+                yield s
+
+
+class QuestionDetector(Detector):
+    name = "questions"
+    min_len = 40
+
+    def find(self, part: str, lower: str | None) -> Iterable[str]:
+        return (part,) if part.endswith("?") else ()
+
+
+class ActionItemDetector(Detector):
+    name = "action_items"
+    min_len = 40
+    needs_lower = True
+
+    def __init__(self, profile: LanguageProfile):
+        self.profile = profile
+
+    def find(self, part: str, lower: str | None) -> Iterable[str]:
+        return (part,) if self.profile.has_action_hint(lower) else ()
+
+
+class DefinitionDetector(Detector):
+    name = "definitions"
+    min_len = 40
+    dedupe = True
+    needs_lower = True
+
+    def __init__(self, profile: LanguageProfile):
+        self.profile = profile
+
+    def find(self, part: str, lower: str | None) -> Iterable[str]:
+        return (part,) if self.profile.has_definition_cue(lower) else ()
+
+
+# name -> factory(profile); output keys follow registration order
+_REGISTRY: dict[str, Callable[[LanguageProfile], Detector]] = {}
+
+
+def register_detector(name: str, factory: Callable[[LanguageProfile], Detector]) -> None:
+    """Add (or replace) a detector; every ExtractorSet created afterwards runs it."""
+    _REGISTRY[name] = factory
+
+
+def detector_names() -> list[str]:
+    return list(_REGISTRY)
+
+
+register_detector("questions", lambda p: QuestionDetector())
+register_detector("action_items", ActionItemDetector)
+register_detector("numeric_mentions", lambda p: RegexDetector("numeric_mentions", NUMBER_RE, limit=20))
+register_detector("urls", lambda p: RegexDetector("urls", URL_RE, dedupe=True))
+register_detector("dates", lambda p: RegexDetector("dates", DATE_RE, dedupe=True))
+register_detector("definitions", DefinitionDetector)
+
+
+class ExtractorSet:
+    """
+    Runs every registered detector in one pass over a stream of sentence parts
+    (split_sentences output before the length filter).
+
+    A detector drops out once it reaches its limit, and feed() is a no-op once
+    all of them have, so long transcripts usually stop being scanned early.
+    """
+
+    def __init__(self, language: str = "en", names: Iterable[str] | None = None):
+        profile = get_profile(language)
+        self.detectors = [_REGISTRY[n](profile) for n in (names if names is not None else _REGISTRY)]
+        self.hits: dict[str, list[str]] = {d.name: [] for d in self.detectors}
+        self._seen: dict[str, set[str]] = {d.name: set() for d in self.detectors if d.dedupe}
+        self._active = [d for d in self.detectors if d.limit > 0]
+
+    @property
+    def done(self) -> bool:
+        return not self._active
+
+    def feed(self, part: str) -> None:
+        active = self._active
+        if not active:
+            return
+        n = len(part)
+        lower = part.lower() if any(d.needs_lower and n >= d.min_len for d in active) else None
+        finished = False
+        for d in active:
+            if n < d.min_len:
+                continue
+            out = self.hits[d.name]
+            seen = self._seen.get(d.name)
+            for hit in d.find(part, lower):
+                if seen is not None:
+                    if hit in seen:
+                        continue
+                    seen.add(hit)
+                out.append(hit)
+                if len(out) >= d.limit:
+                    finished = True
+                    break
+        if finished:
+            self._active = [d for d in active if len(self.hits[d.name]) < d.limit]
+
+    def run(self, parts: Iterable[str]) -> "ExtractorSet":
+        for part in parts:
+            if not self._active:
+                break
+            self.feed(part)
+        return self
+
+    def copy(self) -> "ExtractorSet":
+        other = ExtractorSet.__new__(ExtractorSet)
+        other.detectors = self.detectors
+        other.hits = {k: list(v) for k, v in self.hits.items()}
+        other._seen = {k: set(v) for k, v in self._seen.items()}
+        other._active = list(self._active)
+        return other
+
+    def results(self) -> dict[str, list[str]]:
+        return {k: list(v) for k, v in self.hits.items()}
+
+
+def extract(parts: Iterable[str], language: str = "en") -> dict[str, list[str]]:
+    return ExtractorSet(language).run(parts).results()
@@ -0,0 +1,238 @@
+import asyncio
+import math
+import time
+import uuid
+from collections import deque
+from typing import Awaitable, Callable
+
+from app import config
+from app.services.cache import LRUCache
+from app.services.metrics import registry
+
+# lanes, highest priority first: pasted text up to VA_JOB_SHORT_CHARS, then
+# YouTube URLs (length unknown until fetched), then longer pasted text
+LANES = ("short", "url", "long")
+# every FAIRNESS-th dispatch takes the oldest queued job regardless of lane,
+# so a steady stream of short jobs cannot starve the long ones
+FAIRNESS = 5
+
+_queue: "JobQueue | None" = None
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full; retry in {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class Job:
+    def __init__(self, kind: str, lane: str, run: Callable[[], Awaitable[dict]]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.lane = lane
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result: dict | None = None
+        self.error: str | None = None
+        self._run = run
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def _set(self, status: str) -> None:
+        self.status = status
+        # wake everyone waiting on this change; later waiters get a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_change(self, timeout: float) -> bool:
+        """True if the job changed within `timeout` seconds."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def info(self, position: int | None = None) -> dict:
+        out = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "lane": self.lane,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if position is not None:
+            out["position"] = position
+        if self.status == "done":
+            out["result"] = self.result
+        elif self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class JobQueue:
+    """
+    In-process job queue: `workers` asyncio tasks take jobs from per-lane
+    FIFOs (see LANES / FAIRNESS) and await them; the CPU-heavy part of a job
+    runs in the threadpool like any request. At most `max_queued` jobs wait;
+    submit() raises QueueFull beyond that. Finished jobs stay readable for
+    `ttl` seconds after finished_at; queued and running ones never expire.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 100, ttl: float = 3600.0, max_jobs: int = 1000):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self._lanes: dict[str, deque[Job]] = {lane: deque() for lane in LANES}
+        self._active: dict[str, Job] = {}  # queued or running
+        self._jobs = LRUCache(max_jobs, ttl=ttl)  # finished, timed from finished_at
+        self._ready: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._dispatched = 0
+        self._running = 0
+        self._avg_seconds = 1.0  # moving average of job run time, for Retry-After
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._lanes.values())
+
+    def _start(self) -> None:
+        # workers are created lazily, on the loop that serves requests
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._ready = asyncio.Condition()
+            self._tasks = []
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def retry_after(self) -> int:
+        waiting = self.queued + self._running
+        return max(1, min(300, math.ceil(self._avg_seconds * waiting / self.workers)))
+
+    async def submit(self, kind: str, lane: str, run: Callable[[], Awaitable[dict]]) -> Job:
+        self._start()
+        if self.queued >= self.max_queued:
+            if config.METRICS_ENABLED:
+                registry.inc("va_jobs_rejected_total", {"kind": kind})
+            raise QueueFull(self.retry_after())
+        job = Job(kind, lane, run)
+        self._active[job.id] = job
+        async with self._ready:
+            self._lanes[lane].append(job)
+            self._ready.notify()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        job = self._active.get(job_id)
+        return job if job is not None else self._jobs.get(job_id)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.finished_at = time.time()
+        self._active.pop(job.id, None)
+        self._jobs.set(job.id, job, stored_at=job.finished_at)
+        job._set(status)
+
+    def position(self, job: Job) -> int | None:
+        """Jobs ahead of this one in its lane (None unless queued)."""
+        if job.status != "queued":
+            return None
+        for i, other in enumerate(self._lanes[job.lane]):
+            if other is job:
+                return i
+        return None
+
+    def cancel(self, job: Job) -> bool:
+        """Only queued jobs can be cancelled."""
+        if job.status != "queued":
+            return False
+        try:
+            self._lanes[job.lane].remove(job)
+        except ValueError:
+            return False
+        self._finish(job, "cancelled")
+        return True
+
+    def _next(self) -> Job:
+        self._dispatched += 1
+        lanes = [q for q in self._lanes.values() if q]
+        if self._dispatched % FAIRNESS == 0:
+            return min(lanes, key=lambda q: q[0].created_at).popleft()
+        return lanes[0].popleft()
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._ready:
+                await self._ready.wait_for(lambda: self.queued > 0)
+                job = self._next()
+            await self._execute(job)
+
+    async def _execute(self, job: Job) -> None:
+        self._running += 1
+        job.started_at = time.time()
+        job._set("running")
+        try:
+            job.result = await job._run()
+            status = "done"
+        except asyncio.CancelledError:
+            job.error = "Server shutting down."
+            status = "failed"
+            raise
+        except Exception as e:
+            job.error = str(getattr(e, "detail", "") or e) or e.__class__.__name__
+            status = "failed"
+        finally:
+            self._running -= 1
+            job._run = None  # drop the request (and its text) once finished
+            self._finish(job, status)
+            elapsed = job.finished_at - job.started_at
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+            if config.METRICS_ENABLED:
+                registry.inc("va_jobs_total", {"kind": job.kind, "status": status})
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queued": {lane: len(q) for lane, q in self._lanes.items()},
+            "max_queued": self.max_queued,
+        }
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def lane_for(text: str | None) -> str:
+    text = (text or "").strip()
+    if not text:
+        return "url"
+    return "short" if len(text) <= config.JOB_SHORT_CHARS else "long"
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(config.JOB_WORKERS, config.JOB_QUEUE_MAX, ttl=config.JOB_RESULT_TTL)
+    return _queue
+
+
+def set_job_queue(queue: JobQueue | None) -> None:
+    global _queue
+    _queue = queue
+
+
+async def shutdown_job_queue() -> None:
+    global _queue
+    if _queue is not None:
+        await _queue.shutdown()
+        _queue = None
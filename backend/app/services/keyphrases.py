@@ -0,0 +1,100 @@
+import re
+from collections import Counter
+
+from app.services.languages import get_stopwords
+from app.services.topk import top_k
+
+# one scan: group 1 = word token, otherwise a phrase-boundary punctuation char
+_SCAN_RE = re.compile(r"([A-Za-zА-Яа-яЁёӘәҒғҚқҢңӨөҰұҮүІі0-9']+)|[.!?,:;\n()\[\]\"“”‘’]")
+
+MIN_WORDS = 2
+MAX_WORDS = 6
+
+
+class RakeScanner:
+    """
+    RAKE keyphrase extraction in a single linear pass.
+
+    Candidate phrases are maximal runs of content words; stopwords, digits,
+    tokens shorter than 3 chars and punctuation end a run. Word frequency and
+    degree (summed length of the runs a word occurs in) are updated as each run
+    closes. Runs of MIN_WORDS..MAX_WORDS words are kept as phrases.
+
+    feed() can be called repeatedly with consecutive pieces of text (a run may
+    continue into the next piece), as long as pieces do not split a word.
+    """
+
+    def __init__(self, language: str = "en"):
+        self._sw = get_stopwords(language)
+        self.freq = Counter()
+        self.degree = Counter()
+        self.phrases: dict[str, tuple[str, ...]] = {}
+        self._run: list[str] = []
+
+    def feed(self, text: str) -> None:
+        sw = self._sw
+        run = self._run
+        for m in _SCAN_RE.finditer(text):
+            w = m.group(1)
+            if w is not None:
+                w = w.lower()
+                if len(w) >= 3 and not w.isdigit() and w not in sw:
+                    run.append(w)
+                    continue
+            if run:
+                self._close_run(run)
+                run = self._run = []
+
+    def _close_run(self, run: list[str]) -> None:
+        n = len(run)
+        for w in run:
+            self.freq[w] += 1
+            self.degree[w] += n
+        if MIN_WORDS <= n <= MAX_WORDS:
+            phrase = " ".join(run)
+            if phrase not in self.phrases:
+                self.phrases[phrase] = tuple(run)
+
+    def close(self) -> None:
+        """End of input: the last run becomes a candidate."""
+        if self._run:
+            self._close_run(self._run)
+            self._run = []
+
+    def top(self, n: int = 12) -> list[dict]:
+        """Best `n` phrases by sum of degree/frequency; heap selection, ties keep first-seen order."""
+        degree, freq = self.degree, self.freq
+        scored = ((phrase, sum(degree[w] / freq[w] for w in words)) for phrase, words in self.phrases.items())
+        best = top_k(scored, n, key=lambda x: x[1])
+        return [{"phrase": phrase, "score": round(score, 2)} for phrase, score in best]
+
+    def peek_top(self, n: int = 12) -> list[dict]:
+        """top() as if the input ended now, leaving the open run in place."""
+        run = list(self._run)
+        if not run:
+            return self.top(n)
+        added = None
+        for w in run:
+            self.freq[w] += 1
+            self.degree[w] += len(run)
+        phrase = " ".join(run)
+        if MIN_WORDS <= len(run) <= MAX_WORDS and phrase not in self.phrases:
+            self.phrases[phrase] = tuple(run)
+            added = phrase
+        try:
+            return self.top(n)
+        finally:
+            for w in run:
+                self.freq[w] -= 1
+                self.degree[w] -= len(run)
+                if not self.freq[w]:
+                    del self.freq[w], self.degree[w]
+            if added is not None:
+                del self.phrases[added]
+
+
+def extract_keyphrases(text: str, language: str = "en", max_phrases: int = 12) -> list[dict]:
+    scanner = RakeScanner(language)
+    scanner.feed(text)
+    scanner.close()
+    return scanner.top(max_phrases)
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import sys
+import threading
+
+from app import config
+from app.services import stopwords
+
+
+def _alternation(phrases: tuple[str, ...]) -> re.Pattern | None:
+    # longest first so overlapping phrases prefer the most specific one
+    alts = sorted(set(p.lower() for p in phrases if p), key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, alts))) if alts else None
+
+
+class LanguageProfile:
+    """
+    Per-language tables used by tokenization and analysis:
+    stopwords, sentiment lexicon, action-item hints and definition cues (each
+    phrase list compiled into one alternation regex, so a sentence is checked
+    in a single scan).
+    """
+
+    __slots__ = ("code", "stopwords", "positive", "negative", "action_hints", "definition_cues",
+                 "_hint_re", "_def_re")
+
+    def __init__(self, code: str, stopwords: set[str], positive: set[str], negative: set[str],
+                 action_hints: tuple[str, ...], definition_cues: tuple[str, ...] = ()):
+        self.code = code
+        self.stopwords = frozenset(sys.intern(w) for w in stopwords)
+        self.positive = frozenset(sys.intern(w) for w in positive)
+        self.negative = frozenset(sys.intern(w) for w in negative)
+        self.action_hints = tuple(action_hints)
+        self.definition_cues = tuple(definition_cues)
+        self._hint_re = _alternation(self.action_hints)
+        self._def_re = _alternation(self.definition_cues)
+
+    def has_action_hint(self, text_lower: str) -> bool:
+        """Substring match of any hint (text must already be lowercased)."""
+        return self._hint_re is not None and self._hint_re.search(text_lower) is not None
+
+    def has_definition_cue(self, text_lower: str) -> bool:
+        return self._def_re is not None and self._def_re.search(text_lower) is not None
+
+    def sentiment_score(self, words: list[str]) -> int:
+        pos, neg = self.positive, self.negative
+        return sum(1 for w in words if w in pos) - sum(1 for w in words if w in neg)
+
+
+# built-in languages: built on first use
+_POS_EN = {"good","great","excellent","love","like","awesome","clear","useful","helpful","amazing","success"}
+_NEG_EN = {"bad","terrible","hate","awful","confusing","unclear","useless","wrong","fail","problem","issue"}
+
+_POS_RU = {"хорошо","хороший","отлично","отличный","люблю","нравится","понятно","понятный","полезно","полезный","успех"}
+_NEG_RU = {"плохо","плохой","ужасно","ненавижу","непонятно","непонятный","бесполезно","неправильно","ошибка","проблема"}
+
+_POS_KK = {"жақсы","керемет","тамаша","ұнайды","түсінікті","пайдалы","сәтті","табыс"}
+_NEG_KK = {"жаман","нашар","түсініксіз","пайдасыз","қате","мәселе","проблема"}
+
+_BUILTIN = {
+    "en": lambda: LanguageProfile(
+        "en", stopwords.EN, _POS_EN, _NEG_EN,
+        ("should", "need to", "must", "let's", "we will", "do this", "make sure", "remember to"),
+        (" is defined as ", " are defined as ", " refers to ", " is called ", " are called ", " stands for ")),
+    "ru": lambda: LanguageProfile(
+        "ru", stopwords.RU, _POS_RU, _NEG_RU,
+        ("нужно", "надо", "следует", "давайте", "мы будем", "сделайте", "убедитесь", "помните"),
+        (" называется ", " называют ", " называются ", " определяется как ", " означает ")),
+    "kk": lambda: LanguageProfile(
+        "kk", stopwords.KK, _POS_KK, _NEG_KK,
+        ("керек", "қажет", "жасайық", "біз", "ұмытпа", "есіңізде"),
+        (" деп аталады", " дегеніміз ", " деген не")),
+}
+
+_profiles: dict[str, LanguageProfile] = {}
+_resolved: dict[str, LanguageProfile] = {}
+_files: dict[str, str] | None = None
+_lock = threading.Lock()
+
+
+def _data_files() -> dict[str, str]:
+    """code -> path for every <code>.json in VA_LANGUAGE_DIR (listed once)."""
+    global _files
+    if _files is None:
+        files = {}
+        folder = config.LANGUAGE_DIR
+        if folder and os.path.isdir(folder):
+            for name in sorted(os.listdir(folder)):
+                code, ext = os.path.splitext(name)
+                if ext == ".json":
+                    files[code.lower()] = os.path.join(folder, name)
+        _files = files
+    return _files
+
+
+def _load_file(code: str, path: str) -> LanguageProfile:
+    """
+    Data file format (every key optional):
+    {"stopwords": [...], "positive": [...], "negative": [...],
+     "action_hints": [...], "definition_cues": [...]}
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return LanguageProfile(
+        code,
+        set(data.get("stopwords", ())),
+        set(data.get("positive", ())),
+        set(data.get("negative", ())),
+        tuple(data.get("action_hints", ())),
+        tuple(data.get("definition_cues", ())),
+    )
+
+
+def _profile(code: str) -> LanguageProfile | None:
+    prof = _profiles.get(code)
+    if prof is not None:
+        return prof
+    path = _data_files().get(code)
+    if path is None and code not in _BUILTIN:
+        return None
+    with _lock:
+        prof = _profiles.get(code)
+        if prof is None:
+            # a data file with a built-in code replaces the built-in tables
+            prof = _load_file(code, path) if path is not None else _BUILTIN[code]()
+            _profiles[code] = prof
+    return prof
+
+
+def _resolve(lang: str) -> LanguageProfile:
+    # exact code, then base code ("en-US" -> "en"), then the historical prefixes
+    code = lang.replace("_", "-")
+    for candidate in (code, code.split("-", 1)[0]):
+        prof = _profile(candidate)
+        if prof is not None:
+            return prof
+    if code.startswith("ru"):
+        return _profile("ru")
+    if code.startswith("kk") or code.startswith("kz"):
+        return _profile("kk")
+    return _profile("en")
+
+
+def get_profile(lang: str | None) -> LanguageProfile:
+    """Profile for a language code; unknown codes fall back to English."""
+    key = (lang or "en").lower()
+    prof = _resolved.get(key)
+    if prof is None:
+        prof = _resolve(key)
+        if len(_resolved) < 1024:  # request-supplied codes: keep the memo bounded
+            _resolved[key] = prof
+    return prof
+
+
+def get_stopwords(lang: str | None) -> frozenset[str]:
+    return get_profile(lang).stopwords
+
+
+def available_languages() -> list[str]:
+    return sorted(set(_BUILTIN) | set(_data_files()))
+
+
+def reset_profiles() -> None:
+    """Forget loaded profiles and the data-file listing (after changing VA_LANGUAGE_DIR)."""
+    global _files
+    with _lock:
+        _profiles.clear()
+        _resolved.clear()
+        _files = None
@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from collections import Counter
+
+from app import config
+from app.services.cache import LRUCache
+from app.services.stream import StreamingAnalyzer
+from app.services.segmenter import topic_outline
+from app.services.summarizer import _select_sentences, _sentence_outline, _summary_result
+from app.services.text_utils import caption_chunks, tokenize_words
+from app.services.topk import most_common
+
+_sessions: LRUCache | None = None
+
+
+class LiveSession:
+    """
+    A transcript that keeps growing (live streams).
+
+    append() costs time proportional to the appended text: keyword / bigram /
+    RAKE / sentiment counters, the sentence list and the timestamped caption
+    lines are updated in place. report() reads the counters; only summary
+    scoring walks all sentences (and, for timestamped text, regroups the
+    caption lines into chunks first), so it matches /api/summarize on the
+    text appended so far.
+    """
+
+    def __init__(self, language: str = "en"):
+        self.id = uuid.uuid4().hex
+        self.language = language
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.chunks = 0
+        self.sentences: list[str] = []
+        self.sentence_tokens: list[list[str]] = []
+        self.sentence_counts: list[Counter] = []
+        self.item_counts: list[Counter] = []
+        self._analyzer = StreamingAnalyzer(language, keep_items=True)
+        self._lock = threading.Lock()
+
+    def _add_sentences(self, parts: list[str]) -> None:
+        for p in parts:
+            if len(p) >= 40:
+                self.sentences.append(p)
+                toks = tokenize_words(p, self.language)
+                self.sentence_tokens.append(toks)
+                self.sentence_counts.append(Counter(toks))
+
+    def _add_items(self, items: list[dict]) -> None:
+        for it in items:
+            self.item_counts.append(Counter(tokenize_words(it["text"], self.language)))
+
+    def append(self, text: str) -> dict:
+        """Each chunk is taken as whole lines (a missing trailing newline is added)."""
+        if not text.endswith("\n"):
+            text += "\n"
+        with self._lock:
+            seen = len(self._analyzer.items)
+            self._add_sentences(self._analyzer.feed(text))
+            self._add_items(self._analyzer.items[seen:])
+            self.chunks += 1
+            self.updated_at = time.time()
+        return self.status()
+
+    def status(self) -> dict:
+        return {
+            "session_id": self.id,
+            "language": self.language,
+            "chunks": self.chunks,
+            "sentences": len(self.sentences),
+            "words": self._analyzer.acc.word_count,
+            "updated_at": self.updated_at,
+        }
+
+    def report(self, k: int = 7) -> dict:
+        """
+        Summary and outline as /api/summarize gives them for the text so far:
+        with at least three timestamped lines, caption chunks are the summary
+        units and the outline has time ranges; otherwise sentences are.
+        """
+        with self._lock:
+            analysis = self._analyzer.snapshot()
+            keywords = [w for (w, c) in most_common(self._analyzer.acc.freq, 12)]
+            items = self._analyzer.items
+            if len(items) >= 3:  # parse_timestamped_transcript's minimum
+                chunks = caption_chunks(items)
+                sents = [s for (_, _, s) in chunks]
+                toks = [tokenize_words(s, self.language) for s in sents]
+                starts = [it["start"] for it in items]
+                item_counts = self.item_counts[:]
+            else:
+                pending = [p for p in self._analyzer.pending_parts() if len(p) >= 40]
+                sents = self.sentences + pending
+                pending_toks = [tokenize_words(p, self.language) for p in pending]
+                toks = self.sentence_tokens + pending_toks
+                counts = self.sentence_counts + [Counter(t) for t in pending_toks]
+                starts = None
+
+        if sents:
+            summary = _summary_result(_select_sentences(sents, toks, k), keywords)
+        else:
+            summary = {"summary_text": "", "selected_sentences": [], "keywords": []}
+
+        if starts is not None and any(item_counts):
+            # timestamped lines have no duration: a line ends where it starts
+            outline = {"mode": "timestamp_topics", "segments": topic_outline(item_counts, starts, starts)}
+        elif starts is not None:
+            outline = _sentence_outline([])
+        else:
+            outline = _sentence_outline(counts)
+
+        return {
+            "summary": summary,
+            "outline": outline,
+            "analysis": analysis,
+            "session": self.status(),
+        }
+
+
+def _store() -> LRUCache:
+    global _sessions
+    if _sessions is None:
+        _sessions = LRUCache(config.LIVE_SESSION_MAX, ttl=config.LIVE_SESSION_TTL)
+    return _sessions
+
+
+def create_session(language: str = "en") -> LiveSession:
+    session = LiveSession(language)
+    _store().set(session.id, session)
+    return session
+
+
+def get_session(session_id: str) -> LiveSession | None:
+    return _store().get(session_id)
+
+
+def touch_session(session: LiveSession) -> None:
+    """Restart the session's TTL."""
+    _store().set(session.id, session)
+
+
+def delete_session(session_id: str) -> bool:
+    return _store().pop(session_id) is not None
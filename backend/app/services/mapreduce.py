@@ -0,0 +1,103 @@
+from collections import Counter
+from concurrent.futures import Executor
+
+from app import config
+from app.services.document import TranscriptDocument
+from app.services.keyphrases import RakeScanner
+from app.services.metrics import stage
+from app.services.pool import get_process_pool
+from app.services.text_utils import _SENT_SPLIT_RE, tokenize_with_offsets
+from app.services.topk import merge_counts
+
+
+def split_chunks(text: str, target: int) -> list[tuple[int, int]]:
+    """
+    [start, end) ranges of about `target` chars, each ending right after a
+    sentence boundary ([.!?] + whitespace). Tokens and RAKE runs never cross
+    such a boundary, so every chunk can be scanned on its own. Text without
+    a boundary past `target` stays in one chunk.
+    """
+    bounds = []
+    pos = 0
+    n = len(text)
+    while pos < n:
+        m = _SENT_SPLIT_RE.search(text, min(n, pos + target)) if n - pos > target else None
+        end = m.end() if m is not None else n
+        bounds.append((pos, end))
+        pos = end
+    return bounds
+
+
+def _map_chunk(chunk: str, language: str, offset: int) -> tuple:
+    """
+    Process-pool side: tokens (offsets shifted to the whole text), word and
+    in-chunk bigram counts, and RAKE statistics of one chunk.
+    """
+    offsets, words = tokenize_with_offsets(chunk, language)
+    if offset:
+        offsets = [o + offset for o in offsets]
+    bigrams = Counter(f"{words[i]} {words[i+1]}" for i in range(len(words) - 1))
+    rake = RakeScanner(language)
+    rake.feed(chunk)
+    rake.close()
+    return offsets, words, Counter(words), bigrams, rake.freq, rake.degree, rake.phrases
+
+
+def _reduce(parts: list[tuple], language: str) -> tuple:
+    offsets: list[int] = []
+    words: list[str] = []
+    freq = Counter()
+    bigrams = Counter()
+    rake = RakeScanner(language)
+    last = None
+    for c_offsets, c_words, c_freq, c_bigrams, r_freq, r_degree, r_phrases in parts:
+        offsets += c_offsets
+        words += c_words
+        merge_counts((c_freq,), freq)
+        if c_words:
+            # the one bigram spanning the boundary comes between the two chunks' own
+            if last is not None:
+                bigrams[f"{last} {c_words[0]}"] += 1
+            last = c_words[-1]
+        merge_counts((c_bigrams,), bigrams)
+        merge_counts((r_freq,), rake.freq)
+        merge_counts((r_degree,), rake.degree)
+        for phrase, run in r_phrases.items():
+            rake.phrases.setdefault(phrase, run)
+    return offsets, words, freq, bigrams, rake
+
+
+def prepare_document(doc: TranscriptDocument, executor: Executor | None = None) -> bool:
+    """
+    Map-reduce the whole-text passes of a huge document (tokenization, word
+    and bigram counts, RAKE tables) over sentence-aligned chunks, and store the
+    merged results in the document's caches; summary scoring then fans out to
+    the same executor. Exactly the serial results, in the same order.
+
+    Serial (returns False) below VA_PARALLEL_MIN_CHARS, with fewer than two
+    worker processes, or once the document's tokens were already computed.
+    """
+    if len(doc.text) < config.PARALLEL_MIN_CHARS or "_tokens" in doc.__dict__:
+        return False
+    if executor is None:
+        if config.WORKER_PROCESSES < 2:
+            return False
+        executor = get_process_pool()
+
+    text = doc.text
+    bounds = split_chunks(text, max(1, config.PARALLEL_CHUNK_CHARS))
+    if len(bounds) < 2:
+        return False
+    with stage("map_chunks"):
+        futures = [executor.submit(_map_chunk, text[a:b], doc.language, a) for a, b in bounds]
+        parts = [f.result() for f in futures]
+    with stage("reduce_chunks"):
+        offsets, words, freq, bigrams, rake = _reduce(parts, doc.language)
+
+    cache = doc.__dict__  # cached_property values live in the instance dict
+    cache["_tokens"] = (offsets, words)
+    cache["freq"] = freq
+    cache["bigram_freq"] = bigrams
+    cache["rake"] = rake
+    doc.executor = executor
+    return True
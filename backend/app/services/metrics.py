@@ -0,0 +1,189 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Iterator
+
+from app import config
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB .. 64 MiB
+
+# per-request {stage: seconds}, set only while a caller asked for debug timings
+_timings: contextvars.ContextVar[dict | None] = contextvars.ContextVar("va_timings", default=None)
+_NOOP = nullcontext()
+
+
+def _fmt_num(v: float) -> str:
+    v = float(v)
+    return str(int(v)) if v.is_integer() else repr(v)
+
+
+def _labels_key(labels: dict | None) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _fmt_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Registry:
+    """Counters, histograms and callback gauges with Prometheus text exposition."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: dict[str, tuple[str, str]] = {}
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._hists: dict[str, tuple[tuple, dict[tuple, list]]] = {}
+        self._gauges: list[Callable[[], Iterator[tuple[str, dict, float]]]] = []
+
+    def counter(self, name: str, help: str) -> None:
+        self._help.setdefault(name, ("counter", help))
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self._help.setdefault(name, ("histogram", help))
+        self._hists.setdefault(name, (buckets, {}))
+
+    def gauge_callback(self, helps: dict[str, str], fn: Callable[[], Iterator[tuple[str, dict, float]]]) -> None:
+        """fn yields (name, labels, value) at exposition time; helps: name -> help text."""
+        for name, help in helps.items():
+            self._help.setdefault(name, ("gauge", help))
+        self._gauges.append(fn)
+
+    def inc(self, name: str, labels: dict | None = None, value: float = 1.0) -> None:
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: dict | None = None) -> None:
+        buckets, series = self._hists[name]
+        key = _labels_key(labels)
+        idx = bisect_left(buckets, value)
+        with self._lock:
+            h = series.get(key)
+            if h is None:
+                # [count per bucket..., +Inf count, sum]
+                h = series[key] = [0] * (len(buckets) + 1) + [0.0]
+            h[idx] += 1
+            h[-1] += value
+
+    def snapshot(self, name: str, labels: dict | None = None):
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name].get(_labels_key(labels), 0.0)
+            h = self._hists[name][1].get(_labels_key(labels))
+            return None if h is None else list(h)
+
+    def exposition(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help[name][1]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, v in series.items():
+                    lines.append(f"{name}{_fmt_labels(key)} {_fmt_num(v)}")
+            for name, (buckets, series) in self._hists.items():
+                lines.append(f"# HELP {name} {self._help[name][1]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in series.items():
+                    cum = 0
+                    for b, n in zip(buckets, h):
+                        cum += n
+                        lines.append(f"{name}_bucket{_fmt_labels(key, (('le', _fmt_num(b)),))} {cum}")
+                    cum += h[len(buckets)]
+                    lines.append(f"{name}_bucket{_fmt_labels(key, (('le', '+Inf'),))} {cum}")
+                    lines.append(f"{name}_sum{_fmt_labels(key)} {_fmt_num(h[-1])}")
+                    lines.append(f"{name}_count{_fmt_labels(key)} {cum}")
+        # samples of one metric must be contiguous
+        gauges: dict[str, list[str]] = {}
+        for fn in self._gauges:
+            for name, labels, value in fn():
+                gauges.setdefault(name, []).append(f"{name}{_fmt_labels(_labels_key(labels))} {_fmt_num(value)}")
+        for name, samples in gauges.items():
+            lines.append(f"# HELP {name} {self._help.get(name, ('gauge', ''))[1]}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+registry.counter("va_http_requests_total", "HTTP requests by route, method and status.")
+registry.histogram("va_http_request_seconds", "HTTP request latency by route.")
+registry.histogram("va_http_request_bytes", "HTTP request body size (Content-Length).", SIZE_BUCKETS)
+registry.histogram("va_transcript_chars", "Transcript length in characters per analyzed document.", SIZE_BUCKETS)
+registry.histogram("va_stage_seconds", "Time spent per processing stage.")
+registry.counter("va_jobs_total", "Background jobs finished, by kind and status.")
+registry.counter("va_jobs_rejected_total", "Background jobs refused because the queue was full.")
+
+
+def stage(name: str):
+    """
+    Context manager timing one processing stage.
+    With metrics disabled and no debug collector active it is a shared no-op.
+    """
+    if not config.METRICS_ENABLED and _timings.get() is None:
+        return _NOOP
+    return _timed_stage(name)
+
+
+@contextmanager
+def _timed_stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        if config.METRICS_ENABLED:
+            registry.observe("va_stage_seconds", dt, {"stage": name})
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + dt
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not config.METRICS_ENABLED and _timings.get() is None:
+                return fn(*args, **kwargs)
+            with _timed_stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+@contextmanager
+def collect_timings(active: bool = True):
+    """
+    Collect {stage: seconds} for the current request (and threads it starts
+    through run_in_threadpool, which copies the context). Yields None if inactive.
+    """
+    if not active:
+        yield None
+        return
+    timings: dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def timings_ms(timings: dict | None) -> dict | None:
+    if timings is None:
+        return None
+    return {k: round(v * 1000.0, 3) for k, v in timings.items()}
+
+
+def observe_size(name: str, value: float) -> None:
+    if config.METRICS_ENABLED:
+        registry.observe(name, value)
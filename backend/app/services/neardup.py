@@ -0,0 +1,170 @@
+import random
+import threading
+import zlib
+from collections import OrderedDict
+
+from app import config
+from app.services.document import TranscriptDocument
+from app.services.text_utils import _WORD_RE
+
+try:
+    import numpy as np
+except ImportError:  # optional: signatures are computed in pure Python instead
+    np = None
+
+SHINGLE = 5          # words per shingle
+NUM_PERM = 128       # signature length
+BANDS = 16           # LSH bands of NUM_PERM // BANDS rows: candidates from ~0.7 similarity
+MIN_WORDS = 50       # shorter transcripts are never matched
+# endpoints whose result has a summary; only its sentence selection is ever reused
+REUSABLE_KINDS = ("summarize", "report")
+
+_P = (1 << 61) - 1
+# fixed seed: signatures must agree across processes and restarts
+_rng = random.Random(0x5EED)
+_A = [_rng.randrange(1, 1 << 31) for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, 1 << 31) for _ in range(NUM_PERM)]
+
+_index: "NearDuplicateIndex | None" = None
+
+
+def shingle_hashes(words: list[str]) -> set[int]:
+    """crc32 of every SHINGLE-word window (one shingle for shorter inputs)."""
+    if not words:
+        return set()
+    n = max(1, len(words) - SHINGLE + 1)
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE]).encode("utf-8")) for i in range(n)}
+
+
+def minhash(words: list[str]) -> tuple[int, ...]:
+    """
+    NUM_PERM minimums of (a * x + b) mod (2^61 - 1) over the shingle hashes.
+    a, b < 2^31 and x < 2^32 keep every product below 2^64, so the NumPy
+    path (uint64) and the pure-Python one give the same signature.
+    """
+    hashes = shingle_hashes(words)
+    if not hashes:
+        return ()
+    if np is not None:
+        x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        return tuple(int(((np.uint64(a) * x + np.uint64(b)) % np.uint64(_P)).min()) for a, b in zip(_A, _B))
+    return tuple(min((a * x + b) % _P for x in hashes) for a, b in zip(_A, _B))
+
+
+def similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures in an LSH table: a signature is cut into BANDS bands
+    and a transcript is a candidate when any band matches exactly, so a
+    lookup touches BANDS buckets rather than every stored transcript.
+    Candidates are confirmed by their estimated similarity.
+
+    Entries are scoped (endpoint kind + parameters) and point at a result
+    cache key; the oldest entries are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 10000, threshold: float = 0.9):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._rows = NUM_PERM // BANDS
+        self._entries: OrderedDict[str, tuple[str, tuple[int, ...]]] = OrderedDict()  # key -> (scope, signature)
+        self._buckets: dict[tuple, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _bands(self, scope: str, sig: tuple[int, ...]):
+        r = self._rows
+        for i in range(BANDS):
+            yield (scope, i, hash(sig[i * r:(i + 1) * r]))
+
+    def add(self, scope: str, sig: tuple[int, ...], key: str) -> None:
+        if not sig or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (scope, sig)
+            for band in self._bands(scope, sig):
+                self._buckets.setdefault(band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old, (old_scope, old_sig) = self._entries.popitem(last=False)
+                self._drop(old, old_scope, old_sig)
+
+    def _drop(self, key: str, scope: str, sig: tuple[int, ...]) -> None:
+        for band in self._bands(scope, sig):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._drop(key, *entry)
+
+    def query(self, scope: str, sig: tuple[int, ...]) -> tuple[str, float] | None:
+        """(key, similarity) of the most similar stored transcript at or above the threshold."""
+        if not sig:
+            return None
+        with self._lock:
+            candidates = set()
+            for band in self._bands(scope, sig):
+                candidates.update(self._buckets.get(band, ()))
+            best = None
+            for key in sorted(candidates):
+                sim = similarity(sig, self._entries[key][1])
+                if sim >= self.threshold and (best is None or sim > best[1]):
+                    best = (key, sim)
+        return best
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def signature(doc: TranscriptDocument) -> tuple[int, ...]:
+    """
+    MinHash of the normalized text's words, numbers and stopwords included,
+    so transcripts that differ only in figures or dates do not look alike;
+    empty (never matched) below MIN_WORDS.
+    """
+    words = _WORD_RE.findall(doc.text.lower())
+    return minhash(words) if len(words) >= MIN_WORDS else ()
+
+
+def reusable_selection(data: dict, doc: TranscriptDocument) -> list[str] | None:
+    """
+    The summary sentences a near duplicate's result selected, if every one of
+    them is also a summary unit of `doc` (so nothing of the other transcript
+    leaks in), in `doc`'s order; None otherwise. Everything else in the
+    result is computed for `doc` itself.
+    """
+    selected = (data.get("summary") or {}).get("selected_sentences")
+    if not selected:
+        return None
+    position: dict[str, int] = {}
+    for i, s in enumerate(doc.units):
+        position.setdefault(s, i)
+    if any(s not in position for s in selected):
+        return None
+    return sorted(selected, key=position.__getitem__)
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex | None:
+    """None when VA_NEARDUP_THRESHOLD is 0 (detection off)."""
+    global _index
+    if _index is None and config.NEARDUP_THRESHOLD > 0:
+        _index = NearDuplicateIndex(config.NEARDUP_MAX_ENTRIES, config.NEARDUP_THRESHOLD)
+    return _index
+
+
+def set_near_duplicate_index(index: NearDuplicateIndex | None) -> None:
+    global _index
+    _index = index
@@ -0,0 +1,45 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable
+
+from app import config
+from app.services import corpus
+
+_pool: ProcessPoolExecutor | None = None
+
+
+class InlineExecutor(Executor):
+    """Executor that runs the call immediately; used when no worker processes are configured."""
+
+    def submit(self, fn: Callable, /, *args: Any, **kwargs: Any) -> Future:
+        fut: Future = Future()
+        try:
+            fut.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            fut.set_exception(e)
+        return fut
+
+
+def make_executor(workers: int) -> Executor:
+    """New executor owned by the caller (shut it down when done); 0 runs inline."""
+    if workers <= 0:
+        return InlineExecutor()
+    corpus.preload()  # forked workers inherit the IDF snapshot instead of each reading it
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def get_process_pool() -> Executor:
+    """Shared process pool (VA_WORKER_PROCESSES workers) for CPU-bound work, created on first use."""
+    global _pool
+    if config.WORKER_PROCESSES <= 0:
+        return InlineExecutor()
+    if _pool is None:
+        corpus.preload()
+        _pool = ProcessPoolExecutor(max_workers=config.WORKER_PROCESSES)
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
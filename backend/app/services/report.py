@@ -0,0 +1,28 @@
+from app.services.document import TranscriptDocument
+from app.services.summarizer import summarize_extractive, build_outline
+from app.services.analyzer import analyze_transcript
+
+SECTIONS = ("summary", "outline", "analysis")
+
+
+def build_report(doc: TranscriptDocument, sections: list[str] | None = None, k: int = 7,
+                 weighting: str = "tf", outline_depth: int = 2, outline_granularity: str = "normal",
+                 selected: list[str] | None = None) -> dict:
+    """
+    Summary / outline / analysis over one shared document.
+    Only the requested sections are computed; intermediate results
+    (tokens, sentences, counters) are reused between them.
+    `weighting` applies to the summary and outline keywords; `selected`
+    is passed on to summarize_extractive().
+    """
+    wanted = set(SECTIONS if sections is None else sections)
+    out = {}
+    if "summary" in wanted:
+        out["summary"] = summarize_extractive(doc.raw, doc.language, k=k, doc=doc, weighting=weighting,
+                                              selected=selected)
+    if "outline" in wanted:
+        out["outline"] = build_outline(doc.raw, doc.language, doc=doc, weighting=weighting,
+                                       depth=outline_depth, granularity=outline_granularity)
+    if "analysis" in wanted:
+        out["analysis"] = analyze_transcript(doc.raw, doc.language, doc=doc)
+    return out
@@ -0,0 +1,44 @@
+import hashlib
+import json
+
+from app import config
+from app.services.cache import LRUCache, SqliteCache, TieredCache
+from app.services.document import TranscriptDocument
+
+_cache: TieredCache | None = None
+
+
+def result_key(kind: str, doc: TranscriptDocument, params: dict | None = None) -> str:
+    """
+    Content address of a result: endpoint kind + language + parameters +
+    normalized text + caption timings (they change sentence grouping/outline).
+    """
+    h = hashlib.sha256()
+    h.update(kind.encode())
+    h.update(b"\0")
+    h.update((doc.language or "").encode())
+    h.update(b"\0")
+    h.update(json.dumps(params or {}, sort_keys=True).encode())
+    h.update(b"\0")
+    h.update(doc.text.encode("utf-8", "surrogatepass"))
+    if doc.items:
+        for start, duration, text in zip(doc.items.starts, doc.items.durations, doc.items.texts()):
+            h.update(b"\0")
+            h.update(f"{start!r}/{duration!r}/".encode())
+            h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def get_result_cache() -> TieredCache:
+    global _cache
+    if _cache is None:
+        disk = None
+        if config.RESULT_CACHE_PATH:
+            disk = SqliteCache(config.RESULT_CACHE_PATH, max_entries=config.RESULT_CACHE_DISK_SIZE)
+        _cache = TieredCache(LRUCache(config.RESULT_CACHE_SIZE), disk)
+    return _cache
+
+
+def set_result_cache(cache: TieredCache | None) -> None:
+    global _cache
+    _cache = cache
@@ -0,0 +1,333 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from app import config
+from app.services.document import TranscriptDocument
+from app.services.text_utils import fmt_mmss, tokenize_words
+from app.services.topk import top_k
+
+# timestamps kept per (term, transcript); tf still counts every occurrence
+MAX_TIMES = 32
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_index: "SearchIndex | None" = None
+
+
+def encode_varint(n: int, out: bytearray) -> None:
+    """LEB128: 7 bits per byte, high bit set on every byte but the last."""
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def decode_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    """(value, next position)"""
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def encode_posting(tf: int, times: list[int]) -> bytes:
+    """
+    tf, byte length of the times block, then the (sorted) times in deciseconds
+    as deltas; scoring skips the times block without decoding it.
+    """
+    block = bytearray()
+    prev = 0
+    for t in times:
+        encode_varint(t - prev, block)
+        prev = t
+    out = bytearray()
+    encode_varint(tf, out)
+    encode_varint(len(block), out)
+    return bytes(out + block)
+
+
+def decode_times(buf: bytes, pos: int, end: int) -> list[int]:
+    times = []
+    t = 0
+    while pos < end:
+        d, pos = decode_varint(buf, pos)
+        t += d
+        times.append(t)
+    return times
+
+
+class SearchIndex:
+    """
+    Inverted index over transcripts, one posting per (term, transcript):
+    term frequency plus the caption start times where the term occurs.
+
+    SQLite holds one row per posting. In memory every term's postings are a
+    single bytearray of varint records with delta-encoded transcript ids,
+    decoded only for the terms of a query. New transcripts append to those
+    arrays (ids only grow), so adding never rebuilds the index.
+
+    Several processes may share the file: writes hold SQLite's write lock
+    from the catch-up read to the commit, and reads catch up first.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " doc_id INTEGER PRIMARY KEY AUTOINCREMENT, video_id TEXT UNIQUE NOT NULL, title TEXT,"
+            " language TEXT, length INTEGER NOT NULL, added_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL, doc_id INTEGER NOT NULL, data BLOB NOT NULL,"
+            " PRIMARY KEY (term, doc_id)) WITHOUT ROWID"
+        )
+        self._loaded = False
+        self._version = None  # PRAGMA data_version at the last load
+        self._ids: dict[int, float] = {}  # doc_id -> added_at of every live transcript held
+        self._docs: dict[int, tuple[str, str | None, int]] = {}  # doc_id -> (video_id, title, length)
+        self._by_video: dict[str, int] = {}
+        self._postings: dict[str, bytearray] = {}
+        self._last: dict[str, int] = {}  # term -> last doc_id appended (delta base)
+        self._df = Counter()
+        self._dead: set[int] = set()
+        self._total_len = 0
+        self._max_id = 0  # highest id appended to the arrays, dead or alive
+
+    # --- loading / appending -------------------------------------------------
+
+    def _append(self, term: str, doc_id: int, data: bytes) -> None:
+        buf = self._postings.get(term)
+        if buf is None:
+            buf = self._postings[term] = bytearray()
+        encode_varint(doc_id - self._last.get(term, 0), buf)
+        buf += data
+        self._last[term] = doc_id
+        self._df[term] += 1
+
+    def _reset(self) -> None:
+        self._loaded = False
+        self._ids.clear()
+        self._docs.clear()
+        self._by_video.clear()
+        self._postings.clear()
+        self._last.clear()
+        self._df.clear()
+        self._dead.clear()
+        self._total_len = 0
+        self._max_id = 0
+
+    def _load(self) -> None:
+        """
+        Bring memory up to date with the file. Skipped while no other
+        connection has committed (PRAGMA data_version); otherwise reads, in
+        one snapshot, the transcripts whose ids are not held yet. If a held
+        transcript was removed or replaced, or a new id is not above every id
+        in the arrays (delta encoding needs growing ids), everything is re-read.
+        """
+        (version,) = self._conn.execute("PRAGMA data_version").fetchone()
+        if self._loaded and version == self._version:
+            return
+        own = not self._conn.in_transaction  # add() calls this inside its write transaction
+        if own:
+            self._conn.execute("BEGIN")
+        try:
+            (self._version,) = self._conn.execute("PRAGMA data_version").fetchone()
+            self._catch_up()
+        finally:
+            if own:
+                self._conn.execute("COMMIT")
+
+    def _catch_up(self) -> None:
+        rows = self._conn.execute(
+            "SELECT doc_id, video_id, title, length, added_at FROM docs ORDER BY doc_id").fetchall()
+        if self._loaded:
+            current = {doc_id: added_at for doc_id, _, _, _, added_at in rows}
+            new = [r for r in rows if r[0] not in self._ids]
+            if any(current.get(d) != at for d, at in self._ids.items()) or (new and new[0][0] <= self._max_id):
+                self._reset()
+                return self._catch_up()
+            order = "doc_id, term"
+        else:
+            new = rows
+            order = "term, doc_id"
+        since = self._max_id
+        for doc_id, video_id, title, length, added_at in new:
+            self._ids[doc_id] = added_at
+            self._docs[doc_id] = (video_id, title, length)
+            self._by_video[video_id] = doc_id
+            self._total_len += length
+            self._max_id = max(self._max_id, doc_id)
+        if new:
+            for term, doc_id, data in self._conn.execute(
+                    f"SELECT term, doc_id, data FROM postings WHERE doc_id > ? ORDER BY {order}", (since,)):
+                self._append(term, doc_id, data)
+        self._loaded = True
+
+    def add(self, doc: TranscriptDocument, video_id: str, title: str | None = None) -> int:
+        """
+        Index one transcript under `video_id` (re-adding replaces the old version).
+        Caption start times are kept when the document has timestamps.
+        """
+        postings: dict[str, tuple[int, list[int]]] = {}
+        if doc.items:
+            for start, toks in zip(doc.items.starts, doc.item_tokens):
+                ds = max(0, int(round(start * 10)))
+                for w in toks:
+                    tf, times = postings.get(w, (0, None))
+                    if times is None:
+                        times = []
+                    if len(times) < MAX_TIMES and (not times or times[-1] != ds):
+                        times.append(ds)
+                    postings[w] = (tf + 1, times)
+            length = sum(len(t) for t in doc.item_tokens)
+        else:
+            for w, tf in doc.freq.items():
+                postings[w] = (tf, [])
+            length = len(doc.words)
+
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            old_terms: list[str] = []
+            try:
+                self._load()  # under the write lock: nobody can commit in between
+                old = self._by_video.get(video_id)
+                if old is not None:
+                    old_terms = [t for (t,) in cur.execute("SELECT term FROM postings WHERE doc_id = ?", (old,))]
+                    cur.execute("DELETE FROM postings WHERE doc_id = ?", (old,))
+                    cur.execute("DELETE FROM docs WHERE doc_id = ?", (old,))
+                added_at = time.time()
+                cur.execute(
+                    "INSERT INTO docs (video_id, title, language, length, added_at) VALUES (?, ?, ?, ?, ?)",
+                    (video_id, title, doc.language, length, added_at),
+                )
+                doc_id = cur.lastrowid
+                rows = [(w, doc_id, encode_posting(tf, sorted(times))) for w, (tf, times) in postings.items()]
+                cur.executemany("INSERT INTO postings (term, doc_id, data) VALUES (?, ?, ?)", rows)
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+
+            if old is not None:
+                self._forget(old, old_terms)
+            if doc_id <= self._max_id:  # a file made without AUTOINCREMENT reused an id
+                self._reset()
+                return doc_id
+            self._ids[doc_id] = added_at
+            self._docs[doc_id] = (video_id, title, length)
+            self._max_id = max(self._max_id, doc_id)
+            self._by_video[video_id] = doc_id
+            self._total_len += length
+            for w, _, data in rows:
+                self._append(w, doc_id, data)
+        return doc_id
+
+    def contains(self, video_id: str) -> bool:
+        with self._lock:
+            self._load()
+            return video_id in self._by_video
+
+    def _forget(self, doc_id: int, terms: list[str]) -> None:
+        # its bytes stay in the in-memory arrays until the next load; decoding skips it
+        del self._ids[doc_id]
+        video_id, _, length = self._docs.pop(doc_id)
+        self._by_video.pop(video_id, None)
+        self._total_len -= length
+        self._dead.add(doc_id)
+        for term in terms:
+            self._df[term] -= 1
+
+    # --- querying --------------------------------------------------------------
+
+    @staticmethod
+    def _decode(buf: bytes):
+        """(doc_id, tf, times block start, end) for every posting of one term."""
+        pos = 0
+        doc_id = 0
+        end = len(buf)
+        while pos < end:
+            gap, pos = decode_varint(buf, pos)
+            doc_id += gap
+            tf, pos = decode_varint(buf, pos)
+            nbytes, pos = decode_varint(buf, pos)
+            yield doc_id, tf, pos, pos + nbytes
+            pos += nbytes
+
+    def search(self, query: str, language: str = "en", limit: int = 10, max_times: int = 10) -> dict:
+        """BM25 over the query terms; every hit lists where each term occurs."""
+        terms = list(dict.fromkeys(tokenize_words(query, language)))
+        with self._lock:
+            self._load()
+            n_docs = len(self._docs)
+            avgdl = self._total_len / n_docs if n_docs else 0.0
+            scores: dict[int, float] = {}
+            where: dict[int, dict[str, list[int]]] = {}
+            for term in terms:
+                buf = self._postings.get(term)
+                df = self._df.get(term, 0)
+                if not buf or df <= 0:
+                    continue
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf, t_lo, t_hi in self._decode(buf):
+                    if doc_id in self._dead:
+                        continue
+                    dl = self._docs[doc_id][2]
+                    norm = 1.0 - BM25_B + BM25_B * (dl / avgdl if avgdl else 0.0)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+                    where.setdefault(doc_id, {})[term] = (buf, t_lo, t_hi)
+            best = top_k(sorted(scores.items()), limit, key=lambda x: x[1])
+            docs = {d: self._docs[d] for d, _ in best}
+            found = {d: {term: decode_times(*loc) for term, loc in where[d].items()} for d, _ in best}
+
+        hits = []
+        for doc_id, score in best:
+            video_id, title, _ = docs[doc_id]
+            hits.append({
+                "video_id": video_id,
+                "title": title,
+                "score": round(score, 4),
+                "matches": {
+                    term: [{"start": t / 10, "at": fmt_mmss(t / 10)} for t in times[:max_times]]
+                    for term, times in found[doc_id].items()
+                },
+            })
+        return {"query_terms": terms, "total_documents": n_docs, "hits": hits}
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load()
+            return {
+                "path": self.path,
+                "documents": len(self._docs),
+                "terms": sum(1 for c in self._df.values() if c > 0),
+                "posting_bytes": sum(len(b) for b in self._postings.values()),
+            }
+
+
+def get_search_index() -> SearchIndex | None:
+    """None when VA_SEARCH_INDEX_PATH is empty (search disabled)."""
+    global _index
+    if _index is None and config.SEARCH_INDEX_PATH:
+        _index = SearchIndex(config.SEARCH_INDEX_PATH)
+    return _index
+
+
+def set_search_index(index: SearchIndex | None) -> None:
+    global _index
+    _index = index
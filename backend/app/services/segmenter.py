@@ -0,0 +1,246 @@
+import math
+from bisect import bisect_left, insort
+from collections import Counter
+
+from app.services.corpus import IdfTable
+from app.services.text_utils import fmt_mmss
+from app.services.topk import merge_counts, most_common
+
+# sentences / caption lines are grouped into pseudo-sentences of at least this many tokens
+UNIT_TOKENS = 20
+# fewest pseudo-sentences per comparison block, and so per segment
+MIN_BLOCK = 6
+# comparison blocks across the whole transcript: larger blocks only see broader topic shifts
+GRANULARITY = {"coarse": 24, "normal": 60, "fine": 150}
+MAX_DEPTH = 3
+KEYWORDS = 6
+# a boundary heads a coarser level only at least this deep relative to the deepest one
+# (and at mean + stdev of the positive depths)
+PROMOTE_RATIO = 0.5
+
+
+def pseudo_sentences(counts: list[Counter]) -> tuple[list[list[tuple[int, int]]], list[int], int]:
+    """
+    Consecutive count tables merged until each holds UNIT_TOKENS tokens (the
+    last one may hold fewer), as (term id, count) rows; also the index of
+    each group's first table and the number of term ids.
+    """
+    ids: dict[str, int] = {}
+    rows: list[list[tuple[int, int]]] = []
+    firsts: list[int] = []
+    cur: dict[int, int] | None = None
+    size = 0
+    for i, c in enumerate(counts):
+        if cur is None:
+            cur = {}
+            firsts.append(i)
+        for t, k in c.items():
+            j = ids.get(t)
+            if j is None:
+                j = ids[t] = len(ids)
+            cur[j] = cur.get(j, 0) + k
+            size += k
+        if size >= UNIT_TOKENS:
+            rows.append(list(cur.items()))
+            cur, size = None, 0
+    if cur is not None:
+        rows.append(list(cur.items()))
+    return rows, firsts, len(ids)
+
+
+def gap_scores(rows: list[list[tuple[int, int]]], n_terms: int, block: int) -> list[float]:
+    """
+    Cosine similarity of the `block` units before and after every gap
+    (score i: between units i and i + 1). The two windows slide one unit per
+    gap; their dot product and squared norms are updated from the counts of
+    the units that cross, leave and enter, so the pass is linear in the
+    number of tokens whatever the block size. Integer counts keep it exact.
+    """
+    n = len(rows)
+    left = [0] * n_terms
+    right = [0] * n_terms
+    dot = nl = nr = 0
+    for row in rows[:block]:
+        for t, c in row:
+            r = right[t]
+            nr += c * (2 * r + c)
+            right[t] = r + c
+    scores = []
+    for g in range(n - 1):
+        for t, c in rows[g]:  # unit g crosses from the right window to the left one
+            l, r = left[t], right[t]
+            dot += c * (r - l) - c * c
+            nl += c * (2 * l + c)
+            nr -= c * (2 * r - c)
+            left[t], right[t] = l + c, r - c
+        if g >= block:
+            for t, c in rows[g - block]:
+                l = left[t]
+                dot -= c * right[t]
+                nl -= c * (2 * l - c)
+                left[t] = l - c
+        if g + block < n:
+            for t, c in rows[g + block]:
+                r = right[t]
+                dot += c * left[t]
+                nr += c * (2 * r + c)
+                right[t] = r + c
+        scores.append(dot / math.sqrt(nl * nr) if nl and nr else 0.0)
+    return scores
+
+
+def _smooth(scores: list[float]) -> list[float]:
+    """Moving average over three gaps."""
+    n = len(scores)
+    if n < 3:
+        return scores
+    out = [(scores[0] + scores[1]) / 2]
+    out += [(scores[i - 1] + scores[i] + scores[i + 1]) / 3 for i in range(1, n - 1)]
+    out.append((scores[-2] + scores[-1]) / 2)
+    return out
+
+
+def depth_scores(scores: list[float]) -> list[float]:
+    """
+    TextTiling depth: how far the similarity climbs on both sides of a gap
+    before it drops again. A gap's left peak is its left neighbour's (when
+    that is at least as high) or its own score, so both passes are linear.
+    """
+    n = len(scores)
+    lp = scores[:]
+    for i in range(1, n):
+        if scores[i - 1] >= scores[i]:
+            lp[i] = lp[i - 1]
+    rp = scores[:]
+    for i in range(n - 2, -1, -1):
+        if scores[i + 1] >= scores[i]:
+            rp[i] = rp[i + 1]
+    return [lp[i] + rp[i] - 2 * s for i, s in enumerate(scores)]
+
+
+def boundaries(rows: list[list[tuple[int, int]]], n_terms: int, block: int) -> tuple[list[int], int]:
+    """
+    Segment starts (unit indices), deepest gap first, and how many of them
+    (a prefix) are deep enough to open a coarser-level segment. Gaps deeper
+    than mean - stdev / 2 of the positive depths qualify; a gap is kept
+    unless it would leave a segment shorter than `block` units. Promotion
+    takes mean + stdev and PROMOTE_RATIO of the deepest gap.
+    """
+    n = len(rows)
+    if n < 2 * block:
+        return [], 0
+    depths = depth_scores(_smooth(gap_scores(rows, n_terms, block)))
+    positive = [d for d in depths if d > 0]
+    if not positive:
+        return [], 0
+    mean = sum(positive) / len(positive)
+    sd = math.sqrt(sum((d - mean) ** 2 for d in positive) / len(positive))
+    cutoff = max(0.0, mean - sd / 2)
+    candidates = sorted((i for i, d in enumerate(depths) if d > cutoff), key=lambda i: -depths[i])
+
+    taken = [0, n]  # sorted segment starts, plus the end
+    order = []
+    strong = 0
+    bar = max(mean + sd, PROMOTE_RATIO * max(positive))
+    for i in candidates:
+        start = i + 1  # gap i opens a segment at unit i + 1
+        j = bisect_left(taken, start)
+        if start - taken[j - 1] >= block and taken[j] - start >= block:
+            insort(taken, start)
+            order.append(start)
+            strong += depths[i] >= bar
+    return order, strong
+
+
+def level_cuts(order: list[int], strong: int, depth: int) -> list[list[int]]:
+    """
+    Sorted segment starts per level, coarsest first. The finest level keeps
+    all B boundaries; coarser level j of `depth` keeps the (B + 1) ** (j / depth) - 1
+    deepest, so each splits its parent into about as many parts, but no more
+    than the `strong` ones: noise in a long topic is not promoted to a chapter
+    just because the count allows one. `order` is deepest first, so every
+    level nests in the next.
+    """
+    b = len(order)
+    cuts = []
+    for j in range(1, depth + 1):
+        m = b if j == depth else min(b, strong, round((b + 1) ** (j / depth)) - 1)
+        cuts.append(sorted(order[:m]))
+    return cuts
+
+
+class _Node:
+    __slots__ = ("lo", "hi", "counts", "children")
+
+    def __init__(self, lo: int, hi: int, counts: Counter, children: list["_Node"]):
+        self.lo, self.hi, self.counts, self.children = lo, hi, counts, children
+
+
+def _split(tables: list[Counter], firsts: list[int], cuts: list[list[int]], lo: int, hi: int,
+           level: int) -> list[_Node]:
+    """Nodes of units [lo, hi) at `level`; a range that level does not split goes to the next one."""
+    if level == len(cuts):
+        return []
+    here = cuts[level]
+    inner = here[bisect_left(here, lo + 1):bisect_left(here, hi)]
+    if not inner:
+        return _split(tables, firsts, cuts, lo, hi, level + 1)
+    edges = [lo, *inner, hi]
+    nodes = []
+    for a, b in zip(edges, edges[1:]):
+        children = _split(tables, firsts, cuts, a, b, level + 1)
+        if children:
+            counts = merge_counts(c.counts for c in children)
+        else:
+            counts = merge_counts(tables[firsts[a]:_end(tables, firsts, b)])
+        nodes.append(_Node(a, b, counts, children))
+    return nodes
+
+
+def _end(tables: list[Counter], firsts: list[int], unit: int) -> int:
+    """Table index where unit `unit` starts (the table count past the last unit)."""
+    return firsts[unit] if unit < len(firsts) else len(tables)
+
+
+def segment(counts: list[Counter], depth: int = 2, granularity: str = "normal") -> tuple[list[int], list[_Node]]:
+    """
+    Topic segments of a sequence of count tables (sentences or caption
+    lines) as a tree `depth` levels deep. Returns the first table index of
+    every pseudo-sentence and the top-level nodes, whose lo / hi are
+    pseudo-sentence indices.
+    """
+    if granularity not in GRANULARITY:
+        raise ValueError(f"Unknown granularity {granularity!r} (expected one of {', '.join(GRANULARITY)}).")
+    depth = max(1, min(MAX_DEPTH, depth))
+    rows, firsts, n_terms = pseudo_sentences(counts)
+    if not rows:
+        return firsts, []
+    n = len(rows)
+    block = max(MIN_BLOCK, n // GRANULARITY[granularity])
+    nodes = _split(counts, firsts, level_cuts(*boundaries(rows, n_terms, block), depth), 0, n, 0)
+    return firsts, nodes or [_Node(0, n, merge_counts(counts), [])]
+
+
+def topic_outline(counts: list[Counter], starts: list[float] | None = None, ends: list[float] | None = None,
+                  idf: IdfTable | None = None, depth: int = 2, granularity: str = "normal") -> list[dict]:
+    """
+    Outline segments with their top keywords and nested "sections". With
+    `starts` / `ends` (seconds per table) ranges are mm:ss spans, otherwise
+    "Part 1", "Part 1.2", ... with the [first, end) table indices.
+    """
+    firsts, nodes = segment(counts, depth, granularity)
+
+    def render(node: _Node, label: str) -> dict:
+        a, b = firsts[node.lo], _end(counts, firsts, node.hi)
+        ranked = most_common(node.counts, KEYWORDS) if idf is None else idf.rank(node.counts, KEYWORDS)
+        if starts is not None:
+            start, end = starts[a], max(ends[a:b])
+            out = {"range": f"{fmt_mmss(start)}–{fmt_mmss(end)}", "start": start, "end": end}
+        else:
+            out = {"range": f"Part {label}", "sentences": [a, b]}
+        out["keywords"] = [w for (w, _) in ranked]
+        if node.children:
+            out["sections"] = [render(c, f"{label}.{i}") for i, c in enumerate(node.children, 1)]
+        return out
+
+    return [render(node, str(i)) for i, node in enumerate(nodes, 1)]
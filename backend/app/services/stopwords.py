@@ -18,11 +18,3 @@ KK = {
     "және","мен","сен","сіз","біз","ол","олар","бұл","сол","осы","бір","үшін","сияқты","жоқ","иә","өте","да","де", 
     "туралы","ішінде","үстінде","астында", "енді","сонда","міне","жалпы","өте","сұрақ"
 }
-
-def get_stopwords(lang: str) -> set[str]:
-    lang = (lang or "en").lower()
-    if lang.startswith("ru"):
-        return RU
-    if lang.startswith("kk") or lang.startswith("kz"):
-        return KK
-    return EN
@@ -0,0 +1,410 @@
+import copy
+import re
+from collections import Counter
+from typing import Iterable, Iterator
+
+from app.services.analyzer import _sentiment_label, extra_detections
+from app.services.extractors import ExtractorSet, FormulaScanner
+from app.services.keyphrases import RakeScanner
+from app.services.languages import get_profile
+from app.services.text_utils import (
+    _SENT_SPLIT_RE,
+    _TS_ONLY_RE,
+    _TS_PREFIX_RE,
+    _ts_to_seconds,
+    tokenize_words,
+)
+
+# longest stretch of text held while waiting for a line / sentence boundary
+WINDOW = 64 * 1024
+
+_SPACES_RE = re.compile(r"[ \t]+")
+_NON_SPACE_RE = re.compile(r"\S+")
+
+
+class LineSplitter:
+    """
+    Chunks -> (line, continued) pairs, same line breaks as str.split after
+    \r\n / \r normalization. Lines longer than `max_line` are cut at the last
+    space or tab (continued=True on the following parts).
+    """
+
+    def __init__(self, max_line: int = WINDOW):
+        self.max_line = max_line
+        self._buf = ""
+        self._cont = False
+
+    def feed(self, chunk: str) -> list[tuple[str, bool]]:
+        buf = self._buf + chunk
+        # a trailing \r may be the first half of \r\n
+        hold = ""
+        if buf.endswith("\r"):
+            buf, hold = buf[:-1], "\r"
+        buf = buf.replace("\r\n", "\n").replace("\r", "\n")
+
+        out = []
+        lines = buf.split("\n")
+        for line in lines[:-1]:
+            out.append((line, self._cont))
+            self._cont = False
+
+        tail = lines[-1]
+        while len(tail) > self.max_line:
+            cut = max(tail.rfind(" ", 0, self.max_line), tail.rfind("\t", 0, self.max_line))
+            if cut <= 0:
+                cut = self.max_line
+            out.append((tail[:cut], self._cont))
+            self._cont = True
+            tail = tail[cut:]
+        self._buf = tail + hold
+        return out
+
+    def flush(self) -> list[tuple[str, bool]]:
+        out = [(line, self._cont) for line in self._buf.replace("\r", "\n").split("\n")]
+        # a final newline leaves an empty last line; it carries no text either way
+        self._buf = ""
+        self._cont = False
+        return out
+
+
+class Normalizer:
+    """
+    Streaming counterpart of parse_timestamped_transcript + _normalize_transcript:
+    one line in, at most one piece of normalized text and one caption item out.
+    Concatenated pieces equal clean_text() of the whole input.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._para_open = False
+        self._current_start: int | None = None
+
+    def push(self, line: str, continued: bool = False) -> tuple[str | None, dict | None]:
+        raw = line.strip()
+        if not raw:
+            if not continued and self._para_open:
+                self._para_open = False  # blank line -> paragraph break
+            return None, None
+
+        item = None
+        if not continued:
+            m = _TS_ONLY_RE.match(raw)
+            if m:
+                c = int(m.group(3)) if m.group(3) else None
+                self._current_start = _ts_to_seconds(int(m.group(1)), int(m.group(2)), c)
+                return None, None
+
+            m2 = _TS_PREFIX_RE.match(raw)
+            if m2:
+                c = int(m2.group(3)) if m2.group(3) else None
+                self._current_start = _ts_to_seconds(int(m2.group(1)), int(m2.group(2)), c)
+                raw = _TS_PREFIX_RE.sub("", raw).strip()
+
+        if self._current_start is not None:
+            item = {"text": raw, "start": float(self._current_start), "duration": 0.0}
+
+        s = _SPACES_RE.sub(" ", raw.replace("λ", "lambda").strip())
+        if not s:
+            return None, item
+        if not self._started:
+            sep = ""
+        elif self._para_open:
+            sep = " "
+        else:
+            sep = "\n\n"
+        self._started = True
+        self._para_open = True
+        return sep + s, item
+
+
+class SentenceSplitter:
+    """
+    Streaming split_sentences (without the >= 40 chars filter, see iter_sentences).
+
+    The batch version falls back to ~22-word chunks when the whole text has fewer
+    than 3 punctuation sentences. Here that decision is made once 3 sentences are
+    seen, or - to keep memory bounded - once `window` chars arrived without them.
+    A single unpunctuated run longer than `window` is cut at whitespace.
+    """
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self._mode = "undecided"  # -> "punct" | "chunk"
+        self._buf = ""
+        self._scan_from = 0
+        self._held: list[str] = []
+        self._held_text = ""
+        self._words: list[str] = []
+
+    def feed(self, piece: str) -> list[str]:
+        if self._mode == "chunk":
+            return self._feed_chunk(piece)
+
+        if self._mode == "undecided":
+            self._held_text += piece
+        if not self._buf:
+            piece = piece.lstrip()
+        self._buf += piece
+
+        out = []
+        pos = 0
+        for m in _SENT_SPLIT_RE.finditer(self._buf, self._scan_from):
+            if m.start() > pos:
+                out.append(self._buf[pos:m.start()])
+            pos = m.end()
+        self._buf = self._buf[pos:]
+        self._scan_from = len(self._buf)
+
+        if self._mode == "undecided":
+            self._held.extend(out)
+            if len(self._held) >= 3:
+                self._mode = "punct"
+                out, self._held, self._held_text = self._held, [], ""
+            elif len(self._held_text) > self.window:
+                text, self._held, self._held_text, self._buf = self._held_text, [], "", ""
+                self._mode = "chunk"
+                return self._feed_chunk(text)
+            else:
+                return []
+
+        if len(self._buf) > self.window:
+            cut = self._buf.rfind(" ", 0, self.window)
+            if cut <= 0:
+                cut = self.window
+            out.append(self._buf[:cut])
+            self._buf = self._buf[cut:].lstrip()
+            self._scan_from = len(self._buf)
+        return out
+
+    def _feed_chunk(self, piece: str) -> list[str]:
+        self._buf += piece
+        # the last word may continue in the next piece
+        cut = len(self._buf)
+        if self._buf and not self._buf[-1].isspace():
+            m = re.search(r"\s\S*\Z", self._buf)
+            cut = m.start() if m else 0
+        self._words.extend(self._buf[:cut].split())
+        self._buf = self._buf[cut:]
+
+        out = []
+        target = 22
+        while len(self._words) >= target:
+            out.append(" ".join(self._words[:target]))
+            del self._words[:target]
+        return out
+
+    def pending(self) -> list[str]:
+        """What flush() would return, without consuming it (snapshots of live input)."""
+        tail = self._buf.strip()
+        if self._mode == "punct":
+            return [tail] if tail else []
+        if self._mode == "undecided":
+            parts = self._held + ([tail] if tail else [])
+            if len(parts) >= 3:
+                return parts
+            words = self._held_text.split()
+        else:
+            words = self._words + self._buf.split()
+        return [" ".join(words[i:i + 22]) for i in range(0, len(words), 22)]
+
+    def flush(self) -> list[str]:
+        out = self.pending()
+        self.__init__(self.window)
+        return out
+
+
+class TranscriptAccumulator:
+    """
+    Running analyze_transcript state over normalized pieces and sentence parts.
+    Memory is bounded by vocabulary / phrase counts, not by transcript length.
+    """
+
+    def __init__(self, language: str = "en"):
+        self.language = language
+        self._profile = get_profile(language)
+
+        self.word_count = 0
+        self.freq = Counter()
+        self.bigram_freq = Counter()
+        self._last_word: str | None = None
+        self.sentiment = 0
+
+        self.sentence_count = 0
+        self.extractors = ExtractorSet(language)
+        self.formulas = FormulaScanner()
+
+        self.rake = RakeScanner(language)
+        self.item_count = 0
+
+    def add_piece(self, piece: str) -> None:
+        """A piece of normalized text (see Normalizer)."""
+        self.word_count += len(_NON_SPACE_RE.findall(piece))
+        self.rake.feed(piece)
+        self.formulas.feed(piece)
+
+        words = tokenize_words(piece, self.language)
+        if not words:
+            return
+        self.freq.update(words)
+        prev = self._last_word
+        if prev is not None:
+            self.bigram_freq[f"{prev} {words[0]}"] += 1
+        self.bigram_freq.update(f"{words[i]} {words[i+1]}" for i in range(len(words) - 1))
+        self._last_word = words[-1]
+        self.sentiment += self._profile.sentiment_score(words)
+
+    def add_part(self, part: str) -> None:
+        """A sentence part as produced by SentenceSplitter (short ones included)."""
+        self.extractors.feed(part)
+        if len(part) >= 40:
+            self.sentence_count += 1
+
+    def close(self) -> None:
+        """End of input: the last RAKE run and formula match become candidates."""
+        self.rake.close()
+        self.formulas.close()
+
+    def snapshot(self, pending_parts: list[str]) -> dict:
+        """
+        result() as if the input ended now, without consuming buffered text.
+        Only the small per-tail state is copied, so this stays cheap on long inputs.
+        """
+        view = copy.copy(self)
+        view.extractors = self.extractors.copy()
+        view.formulas = self.formulas.copy()
+        view.formulas.close()
+        for p in pending_parts:
+            view.add_part(p)
+
+        out = view.result()
+        if self.freq:
+            out["keyphrases"] = self.rake.peek_top(12)
+        return out
+
+    def result(self) -> dict:
+        """Same shape as analyze_transcript()."""
+        reading_time_min = round(max(1, self.word_count) / 180.0, 2)
+        found = self.extractors.results()
+        return {
+            "stats": {
+                "word_count": self.word_count,
+                "sentence_count": self.sentence_count,
+                "reading_time_min": reading_time_min,
+                "has_timestamps": self.item_count >= 3,
+            },
+            "formula_snippets": list(self.formulas.hits),
+            "keywords": [{"word": w, "count": c} for (w, c) in self.freq.most_common(12)],
+            "bigrams": [{"bigram": b, "count": c} for (b, c) in self.bigram_freq.most_common(10)],
+            "keyphrases": self.rake.top(12) if self.freq else [],
+            "questions": found["questions"],
+            "action_items": found["action_items"],
+            "numeric_mentions": found["numeric_mentions"],
+            **extra_detections(found),
+            "sentiment": {
+                "score": self.sentiment,
+                "label": _sentiment_label(self.sentiment),
+            },
+        }
+
+
+class StreamingAnalyzer:
+    """
+    Push chunks of raw transcript text, get analyze_transcript() output at the end.
+    Peak memory is bounded by WINDOW plus the counters (and the caption items
+    when `keep_items` is set).
+    """
+
+    def __init__(self, language: str = "en", window: int = WINDOW, keep_items: bool = False):
+        self.language = language
+        self._lines = LineSplitter(window)
+        self._norm = Normalizer()
+        self._sents = SentenceSplitter(window)
+        self.acc = TranscriptAccumulator(language)
+        self.items: list[dict] | None = [] if keep_items else None
+
+    def _push_lines(self, lines: list[tuple[str, bool]]) -> list[str]:
+        parts = []
+        for line, cont in lines:
+            piece, item = self._norm.push(line, cont)
+            if item is not None:
+                self.acc.item_count += 1
+                if self.items is not None:
+                    self.items.append(item)
+            if piece:
+                self.acc.add_piece(piece)
+                parts.extend(self._sents.feed(piece))
+        for p in parts:
+            self.acc.add_part(p)
+        return parts
+
+    def feed(self, chunk: str) -> list[str]:
+        """Returns the sentence parts completed by this chunk."""
+        return self._push_lines(self._lines.feed(chunk))
+
+    def pending_parts(self) -> list[str]:
+        """Sentence parts still buffered (the unfinished last sentence, mostly)."""
+        return self._sents.pending()
+
+    def snapshot(self) -> dict:
+        """Analysis of everything fed so far; unfinished lines are not included."""
+        return self.acc.snapshot(self.pending_parts())
+
+    def finish(self) -> dict:
+        self._push_lines(self._lines.flush())
+        for p in self._sents.flush():
+            self.acc.add_part(p)
+        self.acc.close()
+        return self.acc.result()
+
+
+def iter_file_chunks(path: str, chunk_size: int = WINDOW, encoding: str = "utf-8") -> Iterator[str]:
+    with open(path, "r", encoding=encoding, errors="replace", newline="") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _iter_lines(chunks: Iterable[str]) -> Iterator[tuple[str, bool]]:
+    splitter = LineSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.flush()
+
+
+def iter_caption_items(chunks: Iterable[str]) -> Iterator[dict]:
+    """Incremental parse_timestamped_transcript (no minimum item count)."""
+    norm = Normalizer()
+    for line, cont in _iter_lines(chunks):
+        _, item = norm.push(line, cont)
+        if item is not None:
+            yield item
+
+
+def iter_normalized(chunks: Iterable[str]) -> Iterator[str]:
+    """Pieces of clean_text() output, one per input line."""
+    norm = Normalizer()
+    for line, cont in _iter_lines(chunks):
+        piece, _ = norm.push(line, cont)
+        if piece:
+            yield piece
+
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Incremental split_sentences."""
+    splitter = SentenceSplitter()
+    for piece in iter_normalized(chunks):
+        for s in splitter.feed(piece):
+            if len(s) >= 40:
+                yield s
+    for s in splitter.flush():
+        if len(s) >= 40:
+            yield s
+
+
+def analyze_stream(chunks: Iterable[str], language: str = "en") -> dict:
+    analyzer = StreamingAnalyzer(language)
+    for chunk in chunks:
+        analyzer.feed(chunk)
+    return analyzer.finish()
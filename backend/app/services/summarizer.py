@@ -1,27 +1,42 @@
 from collections import Counter
-from app.services.text_utils import split_sentences, tokenize_words, top_keywords, fmt_mmss, parse_timestamped_transcript, captions_to_sentences
-
-
-def _sentence_scores(sentences: list[str], language: str) -> list[float]:
-    all_words = []
-    for s in sentences:
-        all_words.extend(tokenize_words(s, language))
-    freq = Counter(all_words)
-    if not freq:
-        return [0.0] * len(sentences)
-
-    maxf = max(freq.values())
+from concurrent.futures import Executor
+from app import config
+from app.services.corpus import IdfTable, idf_for
+from app.services.document import TranscriptDocument, build_document
+from app.services.metrics import timed
+from app.services.segmenter import topic_outline
+from app.services.topk import iter_ranked, merge_counts
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python scoring is used instead
+    np = None
+
+# below this many sentences the NumPy setup cost outweighs the gain
+NUMPY_MIN_SENTENCES = 400
+# sentence scoring only fans out to a process pool from this many sentences
+PARALLEL_MIN_SENTENCES = 20000
+
+
+def _count_tokens(sentence_tokens: list[list[str]]) -> Counter:
+    freq = Counter()
+    for words in sentence_tokens:
+        freq.update(words)
+    return freq
+
+def _score_slice(sentence_tokens: list[list[str]], freq: dict, maxf: float, lo: int, n: int) -> list[float]:
+    """Scores of sentences lo, lo+1, ... out of n (document-wide freq / maxf)."""
     scores = []
-    for idx, s in enumerate(sentences):
-        words = tokenize_words(s, language)
+    for idx, words in enumerate(sentence_tokens, lo):
         if not words:
             scores.append(0.0)
             continue
 
-        base = sum((freq[w] / maxf) for w in words) / (len(words) ** 0.65)
+        # integer total, then one division: keeps the NumPy engine bit-identical
+        base = (sum(freq[w] for w in words) / maxf) / (len(words) ** 0.65)
 
         # mild preference for earlier sentences
-        pos_bonus = 1.0 + (0.12 * (1.0 - idx / max(1, len(sentences) - 1)))
+        pos_bonus = 1.0 + (0.12 * (1.0 - idx / max(1, n - 1)))
 
         # prefer slightly longer / more informative sentences
         len_bonus = 1.0 + min(len(words), 35) / 120.0
@@ -30,6 +45,33 @@ def _sentence_scores(sentences: list[str], language: str) -> list[float]:
 
     return scores
 
+def _sentence_scores(sentence_tokens: list[list[str]], idf: IdfTable | None = None,
+                     executor: Executor | None = None) -> list[float]:
+    """
+    With an IDF table, a word's in-document count is scaled by its corpus idf.
+    With an executor (and at least PARALLEL_MIN_SENTENCES sentences), counting
+    and scoring are split into contiguous slices; the merged counts and the
+    per-sentence arithmetic are the same, so are the scores.
+    """
+    n = len(sentence_tokens)
+    bounds = None
+    if executor is not None and n >= PARALLEL_MIN_SENTENCES:
+        step = -(-n // max(1, config.WORKER_PROCESSES))
+        bounds = [(lo, min(n, lo + step)) for lo in range(0, n, step)]
+        freq = merge_counts(executor.map(_count_tokens, [sentence_tokens[a:b] for a, b in bounds]))
+    else:
+        freq = _count_tokens(sentence_tokens)
+    if not freq:
+        return [0.0] * n
+    if idf is not None:
+        freq = idf.weigh(freq)
+
+    maxf = max(freq.values())
+    if bounds is None:
+        return _score_slice(sentence_tokens, freq, maxf, 0, n)
+    futures = [executor.submit(_score_slice, sentence_tokens[a:b], freq, maxf, a, n) for a, b in bounds]
+    return [score for fut in futures for score in fut.result()]
+
 def _jaccard(a: set[str], b: set[str]) -> float:
     if not a or not b:
         return 0.0
@@ -37,24 +79,16 @@ def _jaccard(a: set[str], b: set[str]) -> float:
     union = len(a | b)
     return inter / union if union else 0.0
 
-def summarize_extractive(text: str, language: str = "en", k: int = 7, yt_items: list[dict] | None = None) -> dict:
-    if yt_items is None:
-        yt_items = parse_timestamped_transcript(text)
-    sents = captions_to_sentences(yt_items) if yt_items else split_sentences(text)
-
-    if not sents:
-        return {"summary_text": "", "selected_sentences": [], "keywords": []}
-
-    scores = _sentence_scores(sents, language)
-
-    # candidates by score desc
-    cand_idx = sorted(range(len(sents)), key=lambda i: scores[i], reverse=True)
+def _select_sentences_py(sents: list[str], sent_tokens: list[list[str]], k: int,
+                         idf: IdfTable | None = None, executor: Executor | None = None) -> list[str]:
+    scores = _sentence_scores(sent_tokens, idf, executor)
 
     selected_idx = []
     selected_sets: list[set[str]] = []
 
-    for i in cand_idx:
-        toks = set(tokenize_words(sents[i], language))
+    # candidates by score desc; the heap is only drained as far as the loop needs
+    for i in iter_ranked(scores):
+        toks = set(sent_tokens[i])
         # redundancy filter: skip if too similar to already selected
         if any(_jaccard(toks, prev) > 0.75 for prev in selected_sets):
             continue
@@ -64,62 +98,144 @@ def summarize_extractive(text: str, language: str = "en", k: int = 7, yt_items:
             break
 
     selected_idx.sort()
-    selected = [sents[i] for i in selected_idx]
-
-    kw = [w for (w, c) in top_keywords(text, language, k=12)]
+    return [sents[i] for i in selected_idx]
+
+def _select_sentences_np(sents: list[str], sent_tokens: list[list[str]], k: int,
+                         idf: IdfTable | None = None) -> list[str]:
+    """
+    Same selection as _select_sentences_py, vectorized over a CSR-style
+    sentence x vocabulary matrix (token ids + row offsets).
+    Every float op mirrors the Python path so scores are bit-identical.
+    """
+    n = len(sent_tokens)
+    vocab: dict[str, int] = {}
+    lens = np.fromiter((len(t) for t in sent_tokens), dtype=np.int64, count=n)
+    ids = np.fromiter((vocab.setdefault(w, len(vocab)) for t in sent_tokens for w in t),
+                      dtype=np.int64, count=int(lens.sum()))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lens, out=indptr[1:])
+
+    if not len(ids):
+        scores = np.zeros(n)
+    else:
+        freq = np.bincount(ids)
+        if idf is not None:
+            # same products as IdfTable.weigh, in vocabulary order
+            freq = freq * np.array([idf.idf(w) for w in vocab])
+        maxf = float(freq.max())
+        rows = np.repeat(np.arange(n), lens)
+        totals = np.bincount(rows, weights=freq[ids].astype(np.float64), minlength=n)
+
+        # len ** 0.65 from Python floats (NumPy's pow may differ in the last ulp)
+        max_len = int(lens.max())
+        len_pow = np.array([1.0] + [m ** 0.65 for m in range(1, max_len + 1)])
+        base = (totals / maxf) / len_pow[lens]
+
+        pos_bonus = 1.0 + (0.12 * (1.0 - np.arange(n) / max(1, n - 1)))
+        len_bonus = 1.0 + np.minimum(lens, 35) / 120.0
+        scores = np.where(lens > 0, base * pos_bonus * len_bonus, 0.0)
+
+    # stable sort on negated scores == sorted(..., reverse=True)
+    cand_idx = np.argsort(-scores, kind="stable")
+
+    selected_idx: list[int] = []
+    sel_rows = np.zeros((k, len(vocab) or 1), dtype=np.int8)
+    sel_sizes = np.zeros(k, dtype=np.int64)
+
+    for i in cand_idx.tolist():
+        uniq = np.unique(ids[indptr[i]:indptr[i + 1]])
+        m = len(selected_idx)
+        if m and len(uniq):
+            inter = sel_rows[:m, uniq].sum(axis=1, dtype=np.int64)
+            union = len(uniq) + sel_sizes[:m] - inter
+            nonempty = sel_sizes[:m] > 0
+            # redundancy filter: skip if too similar to already selected
+            if np.any(nonempty & (inter / np.maximum(union, 1) > 0.75)):
+                continue
+        sel_rows[m, uniq] = 1
+        sel_sizes[m] = len(uniq)
+        selected_idx.append(i)
+        if len(selected_idx) >= k:
+            break
 
+    selected_idx.sort()
+    return [sents[i] for i in selected_idx]
+
+@timed("score_sentences")
+def _select_sentences(sents: list[str], sent_tokens: list[list[str]], k: int, engine: str = "auto",
+                      idf: IdfTable | None = None, executor: Executor | None = None) -> list[str]:
+    """
+    engine: "python", "numpy" or "auto" (NumPy when installed and the input is
+    large; with an executor and a huge input, scoring runs in the pool instead).
+    idf: TF-IDF sentence scoring instead of raw counts.
+    """
+    if engine == "numpy" and np is None:
+        raise RuntimeError("engine='numpy' requires numpy to be installed.")
+    if engine == "auto" and executor is not None and len(sents) >= PARALLEL_MIN_SENTENCES:
+        return _select_sentences_py(sents, sent_tokens, k, idf, executor)
+    use_np = engine == "numpy" or (engine == "auto" and np is not None and len(sents) >= NUMPY_MIN_SENTENCES)
+    if use_np and k > 0:
+        return _select_sentences_np(sents, sent_tokens, k, idf)
+    return _select_sentences_py(sents, sent_tokens, k, idf)
+
+def _summary_result(selected: list[str], keywords: list[str]) -> dict:
     return {
     "summary_bullets": selected,     # best for UI
     "summary_text": " ".join(selected),
     "selected_sentences": selected,
-    "keywords": kw
+    "keywords": keywords
     }
 
+@timed("summarize")
+def summarize_extractive(text: str, language: str = "en", k: int = 7, yt_items: list[dict] | None = None,
+                         doc: TranscriptDocument | None = None, engine: str = "auto",
+                         weighting: str = "tf", selected: list[str] | None = None) -> dict:
+    """
+    weighting "tfidf": sentences and keywords scored against corpus IDF.
+    selected: sentences of this document already chosen (a near duplicate's
+    selection); scoring is skipped and only the keywords are computed.
+    """
+    idf = idf_for(weighting)
+    if doc is None:
+        doc = build_document(text, language, yt_items)
+    sents = doc.units
 
-def build_outline(text: str, language: str = "en", yt_items: list[dict] | None = None) -> dict:
-    # if user pasted timestamps, parse them
-    if yt_items is None:
-        parsed = parse_timestamped_transcript(text)
-        if parsed:
-            yt_items = parsed
+    if not sents:
+        return {"summary_text": "", "selected_sentences": [], "keywords": []}
 
-    if yt_items:
-        window = 90.0
-        segments = []
-        cur = {"start": yt_items[0]["start"], "end": yt_items[0]["start"], "text": ""}
+    if selected is None:
+        selected = _select_sentences(sents, doc.unit_tokens, k, engine=engine, idf=idf, executor=doc.executor)
 
-        for it in yt_items:
-            t = it.get("start", 0.0)
-            if t - cur["start"] > window and cur["text"].strip():
-                segments.append(cur)
-                cur = {"start": t, "end": t, "text": ""}
+    kw = [w for (w, c) in doc.top_keywords(12, idf)]
 
-            cur["text"] += (" " if cur["text"] else "") + it.get("text", "")
-            cur["end"] = max(cur["end"], t + it.get("duration", 0.0))
+    return _summary_result(selected, kw)
 
-        if cur["text"].strip():
-            segments.append(cur)
 
-        out = []
-        for seg in segments[:10]:
-            kws = [w for (w, c) in top_keywords(seg["text"], language, k=6)]
-            out.append({
-                "range": f"{fmt_mmss(seg['start'])}–{fmt_mmss(seg['end'])}",
-                "keywords": kws,
-            })
+@timed("build_outline")
+def build_outline(text: str, language: str = "en", yt_items: list[dict] | None = None,
+                  doc: TranscriptDocument | None = None, weighting: str = "tf",
+                  depth: int = 2, granularity: str = "normal") -> dict:
+    """
+    Topic outline: segments where the vocabulary shifts (see segmenter),
+    `depth` levels deep (chapters -> sections -> ...). Caption timings give
+    the segments time ranges; plain text falls back to sentence parts.
+    """
+    idf = idf_for(weighting)
+    if doc is None:
+        doc = build_document(text, language, yt_items)
+    track = doc.items
 
-        return {"mode": "timestamp_windows", "segments": out}
+    if track and any(doc.item_tokens):
+        ends = [s + d for s, d in zip(track.starts, track.durations)]
+        segments = topic_outline(doc.item_counts, list(track.starts), ends, idf, depth, granularity)
+        return {"mode": "timestamp_topics", "segments": segments}
 
-    # fallback: sentence blocks
-    sents = split_sentences(text)
-    if not sents:
-        return {"mode": "empty", "segments": []}
+    return _sentence_outline(doc.sentence_counts, idf, depth, granularity)
 
-    block = max(3, len(sents) // 6)
-    out = []
-    for i in range(0, len(sents), block):
-        chunk = " ".join(sents[i:i + block])
-        kws = [w for (w, c) in top_keywords(chunk, language, k=6)]
-        out.append({"range": f"Part {len(out) + 1}", "keywords": kws})
 
-    return {"mode": "sentence_blocks", "segments": out[:10]}
+def _sentence_outline(sent_counts: list[Counter], idf: IdfTable | None = None, depth: int = 2,
+                      granularity: str = "normal") -> dict:
+    if not any(sent_counts):
+        return {"mode": "empty", "segments": []}
+    return {"mode": "sentence_topics", "segments": topic_outline(sent_counts, idf=idf, depth=depth,
+                                                                 granularity=granularity)}
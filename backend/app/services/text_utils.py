@@ -1,12 +1,16 @@
 import re
 from collections import Counter
-from app.services.stopwords import get_stopwords
+from app.services.captions import CaptionTrack, as_track
+from app.services.corpus import idf_for
+from app.services.languages import get_stopwords
 
 
 # words incl. Cyrillic/Kazakh letters + apostrophes + digits
 _WORD_RE = re.compile(r"[A-Za-zА-Яа-яЁёӘәҒғҚқҢңӨөҰұҮүІі0-9']+")
 _TS_ONLY_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*$")  # mm:ss or hh:mm:ss
 _TS_PREFIX_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s+")   # timestamp + space
+_SENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_NON_SPACE_RE = re.compile(r"\S+")
 
 
 def _ts_to_seconds(h_or_m: int, m: int, s: int | None) -> int:
@@ -17,7 +21,7 @@ def _ts_to_seconds(h_or_m: int, m: int, s: int | None) -> int:
     return h_or_m * 3600 + m * 60 + s
 
 
-def parse_timestamped_transcript(text: str) -> list[dict] | None:
+def parse_timestamped_transcript(text: str) -> CaptionTrack | None:
     """
     Parses transcripts like:
       okay dear students
@@ -25,11 +29,12 @@ def parse_timestamped_transcript(text: str) -> list[dict] | None:
       there is...
       0:06
       ...
-    Returns items: [{text,start,duration}]
+    Returns a CaptionTrack of {text,start,duration} items
     duration is unknown -> 0.0
     """
     lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
-    items: list[dict] = []
+    starts: list[float] = []
+    texts: list[str] = []
     current_start: int | None = None
 
     for line in lines:
@@ -55,9 +60,12 @@ def parse_timestamped_transcript(text: str) -> list[dict] | None:
             raw = _TS_PREFIX_RE.sub("", raw).strip()
 
         if current_start is not None:
-            items.append({"text": raw, "start": float(current_start), "duration": 0.0})
+            starts.append(float(current_start))
+            texts.append(raw)
 
-    return items if len(items) >= 3 else None
+    if len(starts) < 3:
+        return None
+    return CaptionTrack.from_columns(starts, [0.0] * len(starts), texts)
 
 
 def _normalize_transcript(text: str) -> str:
@@ -105,62 +113,87 @@ def clean_text(text: str) -> str:
     return _normalize_transcript(text).strip()
 
 
-def split_sentences(text: str) -> list[str]:
+def sentence_spans(text: str, min_chars: int = 40) -> list[tuple[int, int, str]]:
     """
-    Better sentence splitting for transcripts:
-    - Prefer punctuation boundaries
-    - If punctuation is missing, fall back to word-count chunks
+    Same splitting rules as split_sentences, but on already-cleaned text and
+    keeping (start, end) offsets so callers can map tokens back to sentences.
+    min_chars=0 keeps every part (extractors see the short ones too).
     """
-    text = clean_text(text)
     if not text:
         return []
 
     # primary split by punctuation
-    parts = re.split(r"(?<=[.!?])\s+", text)
-    sents = [p.strip() for p in parts if p and p.strip()]
+    spans = []
+    pos = 0
+    for m in _SENT_SPLIT_RE.finditer(text):
+        if m.start() > pos:
+            spans.append((pos, m.start(), text[pos:m.start()]))
+        pos = m.end()
+    if pos < len(text):
+        spans.append((pos, len(text), text[pos:]))
 
     # fallback: no punctuation -> chunk by ~22 words
-    if len(sents) < 3:
-        words = text.split()
+    if len(spans) < 3:
         target = 22
-        sents = []
+        spans = []
         buf = []
-        for w in words:
-            buf.append(w)
+        for m in _NON_SPACE_RE.finditer(text):
+            buf.append(m)
             if len(buf) >= target:
-                sents.append(" ".join(buf).strip())
+                spans.append((buf[0].start(), buf[-1].end(), " ".join(w.group(0) for w in buf)))
                 buf = []
         if buf:
-            sents.append(" ".join(buf).strip())
+            spans.append((buf[0].start(), buf[-1].end(), " ".join(w.group(0) for w in buf)))
 
     # drop tiny junk
-    return [s for s in sents if len(s) >= 40]
+    return [sp for sp in spans if len(sp[2]) >= min_chars]
+
+
+def split_sentences(text: str) -> list[str]:
+    """
+    Better sentence splitting for transcripts:
+    - Prefer punctuation boundaries
+    - If punctuation is missing, fall back to word-count chunks
+    """
+    return [s for (_, _, s) in sentence_spans(clean_text(text))]
+
+
+def _keep_word(w: str, sw: set[str]) -> bool:
+    return not w.isdigit() and w not in sw and len(w) > 2
 
 
 def tokenize_words(text: str, language: str = "en") -> list[str]:
     sw = get_stopwords(language)
-    words = [w.lower() for w in _WORD_RE.findall(text)]
-    out = []
-    for w in words:
-        if w.isdigit():
-            continue
-        if w in sw:
-            continue
-        if len(w) <= 2:
-            continue
-        out.append(w)
-    return out
+    return [w for w in (m.lower() for m in _WORD_RE.findall(text)) if _keep_word(w, sw)]
 
 
-def top_keywords(text: str, language: str = "en", k: int = 12) -> list[tuple[str, int]]:
-    words = tokenize_words(text, language)
-    return Counter(words).most_common(k)
+def tokenize_with_offsets(text: str, language: str = "en") -> tuple[list[int], list[str]]:
+    """
+    tokenize_words plus the start offset of every kept token.
+    """
+    sw = get_stopwords(language)
+    offsets: list[int] = []
+    words: list[str] = []
+    for m in _WORD_RE.finditer(text):
+        w = m.group(0).lower()
+        if _keep_word(w, sw):
+            offsets.append(m.start())
+            words.append(w)
+    return offsets, words
+
 
+def top_keywords(text: str, language: str = "en", k: int = 12, weighting: str = "tf") -> list[tuple[str, float]]:
+    """weighting "tfidf" scores counts by corpus IDF (see corpus.get_idf_table)."""
+    idf = idf_for(weighting)
+    counts = Counter(tokenize_words(text, language))
+    return counts.most_common(k) if idf is None else idf.rank(counts, k)
 
-def top_bigrams(text: str, language: str = "en", k: int = 10) -> list[tuple[str, int]]:
+
+def top_bigrams(text: str, language: str = "en", k: int = 10, weighting: str = "tf") -> list[tuple[str, float]]:
+    idf = idf_for(weighting)
     words = tokenize_words(text, language)
-    bigrams = [f"{words[i]} {words[i+1]}" for i in range(len(words) - 1)]
-    return Counter(bigrams).most_common(k)
+    counts = Counter(f"{words[i]} {words[i+1]}" for i in range(len(words) - 1))
+    return counts.most_common(k) if idf is None else idf.rank(counts, k, bigrams=True)
 
 
 def fmt_mmss(seconds: float) -> str:
@@ -169,22 +202,23 @@ def fmt_mmss(seconds: float) -> str:
     s = s % 60
     return f"{m:02d}:{s:02d}"
 
-def captions_to_sentences(items: list[dict], max_gap_sec: float = 1.2, max_chars: int = 180) -> list[str]:
+def caption_chunks(items: CaptionTrack | list[dict], max_gap_sec: float = 1.2,
+                   max_chars: int = 180) -> list[tuple[float, float, str]]:
     """
-    Deterministically group caption lines into sentence-like chunks using time gaps.
+    captions_to_sentences with timing: (start of first line, end of last line, chunk).
     """
     if not items:
         return []
+    track = as_track(items)
 
-    sents = []
+    chunks = []
     buf = ""
+    buf_start = 0.0
     prev_end = None
 
-    for it in items:
-        t = float(it.get("start", 0.0))
-        dur = float(it.get("duration", 0.0))
+    for t, dur, line in zip(track.starts, track.durations, track.texts()):
         end = t + dur
-        line = (it.get("text") or "").strip()
+        line = line.strip()
         if not line:
             continue
 
@@ -192,20 +226,29 @@ def captions_to_sentences(items: list[dict], max_gap_sec: float = 1.2, max_chars
         should_break = (gap > max_gap_sec) or (len(buf) >= max_chars)
 
         if should_break and buf.strip():
-            sents.append(buf.strip())
+            chunks.append((buf_start, prev_end, buf.strip()))
             buf = ""
 
+        if not buf:
+            buf_start = t
         buf += (" " if buf else "") + line
         prev_end = end
 
     if buf.strip():
-        sents.append(buf.strip())
+        chunks.append((buf_start, prev_end, buf.strip()))
 
     # cleanup: add period if missing
     cleaned = []
-    for s in sents:
+    for start, end, s in chunks:
         s2 = s.strip()
         if s2 and s2[-1] not in ".!?":
             s2 += "."
-        cleaned.append(s2)
+        cleaned.append((start, end, s2))
     return cleaned
+
+
+def captions_to_sentences(items: CaptionTrack | list[dict], max_gap_sec: float = 1.2, max_chars: int = 180) -> list[str]:
+    """
+    Deterministically group caption lines into sentence-like chunks using time gaps.
+    """
+    return [s for (_, _, s) in caption_chunks(items, max_gap_sec, max_chars)]
@@ -0,0 +1,385 @@
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from app import config
+from app.services.cache import LRUCache
+from app.services.document import TranscriptDocument
+from app.services.summarizer import _select_sentences
+from app.services.text_utils import _TS_ONLY_RE, _ts_to_seconds, fmt_mmss
+
+# File layout (little endian, every section 8-byte aligned):
+#   header   MAGIC, language (8s), window seconds (d), section count (I)
+#   sections name (8s), typecode (1s), offset (Q), length in items (Q)
+#   payload  one flat array per section, read back as memoryview casts of the mmap
+MAGIC = b"VATIDX01"
+_HEADER = struct.Struct("<8s8sdI4x")
+_SECTION = struct.Struct("<8s1s7xQQ")
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_open: LRUCache | None = None
+_open_lock = threading.Lock()
+
+
+def _pad(n: int) -> int:
+    return (-n) % 8
+
+
+def _language_field(language: str) -> bytes:
+    """The header's 8-byte language, cut on a character boundary."""
+    return language.encode()[:8].decode("utf-8", "ignore").encode()
+
+
+def index_id_for(doc: TranscriptDocument, video_id: str | None = None, window: float = 30.0) -> str:
+    """
+    YouTube video id when known, else a content hash of the captions; either
+    way with the language and window, so differently built indexes don't
+    overwrite each other.
+    """
+    settings = f"{doc.language or ''}\0{float(window)!r}".encode()
+    if video_id:
+        return f"{video_id}-{hashlib.sha256(settings).hexdigest()[:8]}"
+    h = hashlib.sha256()
+    h.update(settings)
+    for start, duration, text in zip(doc.items.starts, doc.items.durations, doc.items.texts()):
+        h.update(f"\0{start!r}/{duration!r}/".encode())
+        h.update(text.encode("utf-8", "surrogatepass"))
+    return "t" + h.hexdigest()[:32]
+
+
+def build_sections(doc: TranscriptDocument, window: float) -> dict[str, array]:
+    """
+    Per-window token counts, word / item counts and time bounds, plus every
+    caption sentence with its time span and token ids.
+
+    Only windows holding at least one caption are stored (w_start ascending),
+    so the index size follows the captions, not the video length / window.
+    """
+    track = doc.items
+    if not track:
+        raise ValueError("A time index needs timestamped captions.")
+    window = float(window)
+    if window <= 0:
+        raise ValueError("window must be > 0 seconds.")
+
+    vocab: dict[str, int] = {}
+    slots = sorted({max(0, int(start // window)) for start in track.starts})
+    pos_of = {slot: j for j, slot in enumerate(slots)}
+    n_windows = len(slots)
+    counts = [Counter() for _ in range(n_windows)]
+    words = array("I", [0]) * n_windows
+    items = array("I", [0]) * n_windows
+    w_start = array("d", (slot * window for slot in slots))
+    w_end = array("d", w_start)
+
+    for start, dur, text, toks in zip(track.starts, track.durations, track.texts(), doc.item_tokens):
+        j = pos_of[max(0, int(start // window))]
+        counts[j].update(vocab.setdefault(w, len(vocab)) for w in toks)
+        words[j] += len(text.split())
+        items[j] += 1
+        w_end[j] = max(w_end[j], start + dur)
+
+    pair_ptr = array("Q", [0])
+    pair_ids = array("I")
+    pair_counts = array("I")
+    for c in counts:
+        # Counter order == first occurrence in the window (keeps tie order on merge)
+        pair_ids.extend(c.keys())
+        pair_counts.extend(c.values())
+        pair_ptr.append(len(pair_ids))
+
+    s_start = array("d")
+    s_end = array("d")
+    tok_ptr = array("Q", [0])
+    tokens = array("I")
+    txt_ptr = array("Q", [0])
+    text_parts: list[bytes] = []
+    pos = 0
+    for (start, end, sent), toks in sorted(zip(doc.caption_chunks, doc.caption_sentence_tokens),
+                                           key=lambda x: x[0][0]):
+        s_start.append(start)
+        s_end.append(end)
+        tokens.extend(vocab.setdefault(w, len(vocab)) for w in toks)
+        tok_ptr.append(len(tokens))
+        b = sent.encode("utf-8", "surrogatepass")
+        text_parts.append(b)
+        pos += len(b)
+        txt_ptr.append(pos)
+
+    vocab_ptr = array("Q", [0])
+    vocab_parts: list[bytes] = []
+    vpos = 0
+    for w in vocab:
+        b = w.encode("utf-8")
+        vocab_parts.append(b)
+        vpos += len(b)
+        vocab_ptr.append(vpos)
+
+    return {
+        "w_start": w_start, "w_end": w_end, "w_words": words, "w_items": items,
+        "pair_ptr": pair_ptr, "pair_ids": pair_ids, "pair_cnt": pair_counts,
+        "s_start": s_start, "s_end": s_end, "tok_ptr": tok_ptr, "tokens": tokens,
+        "txt_ptr": txt_ptr, "text": array("B", b"".join(text_parts)),
+        "voc_ptr": vocab_ptr, "vocab": array("B", b"".join(vocab_parts)),
+    }
+
+
+def write_index(path: str, sections: dict[str, array], language: str, window: float) -> None:
+    """Atomic write (temp file + rename), so readers never see a partial index."""
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    table_size = _HEADER.size + _SECTION.size * len(sections)
+    offset = table_size + _pad(table_size)
+    table = []
+    for name, arr in sections.items():
+        table.append((name, arr, offset))
+        nbytes = len(arr) * arr.itemsize
+        offset += nbytes + _pad(nbytes)
+
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, _language_field(language), window, len(sections)))
+            for name, arr, off in table:
+                f.write(_SECTION.pack(name.encode(), arr.typecode.encode(), off, len(arr)))
+            f.write(b"\0" * _pad(table_size))
+            for name, arr, off in table:
+                data = arr.tobytes()
+                f.write(data)
+                f.write(b"\0" * _pad(len(data)))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class TimeIndex:
+    """
+    Read side of one index file, memory-mapped: range queries merge the
+    precomputed window counts and read only the sentences inside the range.
+
+    Readers hold it between acquire() and release() (or in a with block);
+    close() stops new readers and unmaps once the last one has released it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, lang, window, n_sections = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a time index file.")
+        self.language = lang.rstrip(b"\0").decode()
+        self.window = window
+        view = memoryview(self._mm)
+        self._cols: dict[str, memoryview] = {}
+        for i in range(n_sections):
+            name, typecode, off, count = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            tc = typecode.decode()
+            size = array(tc).itemsize
+            self._cols[name.rstrip(b"\0").decode()] = view[off:off + count * size].cast(tc)
+        self._terms: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._readers = 0
+        self._closing = False
+
+    def __getattr__(self, name: str) -> memoryview:
+        try:
+            return self.__dict__["_cols"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def n_windows(self) -> int:
+        return len(self.w_start)
+
+    @property
+    def duration(self) -> float:
+        return max(self.w_end) if len(self.w_end) else 0.0
+
+    def term(self, i: int) -> str:
+        w = self._terms.get(i)
+        if w is None:
+            w = self._terms[i] = bytes(self.vocab[self.voc_ptr[i]:self.voc_ptr[i + 1]]).decode("utf-8")
+        return w
+
+    def sentence(self, i: int) -> str:
+        return bytes(self.text[self.txt_ptr[i]:self.txt_ptr[i + 1]]).decode("utf-8", "surrogatepass")
+
+    def sentence_tokens(self, i: int) -> list[str]:
+        return [self.term(t) for t in self.tokens[self.tok_ptr[i]:self.tok_ptr[i + 1]]]
+
+    def window_range(self, start: float, end: float) -> tuple[int, int]:
+        """[lo, hi) of the stored windows overlapping [start, end]."""
+        lo = bisect_left(self.w_start, max(0, int(start // self.window)) * self.window)
+        hi = bisect_right(self.w_start, int(end // self.window) * self.window)
+        return lo, max(lo, hi)
+
+    def counts(self, start: float, end: float) -> Counter:
+        lo, hi = self.window_range(start, end)
+        merged = Counter()
+        ids, cnt = self.pair_ids, self.pair_cnt
+        for j in range(self.pair_ptr[lo], self.pair_ptr[hi]):
+            merged[ids[j]] += cnt[j]
+        return merged
+
+    def sentence_range(self, start: float, end: float) -> tuple[int, int]:
+        """[lo, hi) of the sentences starting within [start, end]."""
+        return bisect_left(self.s_start, start), bisect_right(self.s_start, end)
+
+    def query(self, start: float, end: float, keywords: int = 12, sentences: int = 5) -> dict:
+        lo, hi = self.window_range(start, end)
+        counts = self.counts(start, end)
+        kws = [{"word": self.term(i), "count": c} for (i, c) in counts.most_common(keywords)]
+
+        s_lo, s_hi = self.sentence_range(start, end)
+        sents = [self.sentence(i) for i in range(s_lo, s_hi)]
+        toks = [self.sentence_tokens(i) for i in range(s_lo, s_hi)]
+        summary = _select_sentences(sents, toks, sentences) if sents and sentences > 0 else []
+
+        covered = (self.w_start[lo], max(self.w_end[lo:hi])) if hi > lo else (start, start)
+        return {
+            "range": f"{fmt_mmss(start)}–{fmt_mmss(end)}",
+            "windows": {"first": max(0, int(start // self.window)), "count": hi - lo, "covered": f"{fmt_mmss(covered[0])}–{fmt_mmss(covered[1])}"},
+            "keywords": kws,
+            "summary_sentences": summary,
+            "stats": {
+                "word_count": sum(self.w_words[lo:hi]),
+                "caption_items": sum(self.w_items[lo:hi]),
+                "sentence_count": s_hi - s_lo,
+            },
+        }
+
+    def info(self) -> dict:
+        return {
+            "language": self.language,
+            "window_sec": self.window,
+            "windows": self.n_windows,
+            "sentences": len(self.s_start),
+            "vocabulary": len(self.voc_ptr) - 1,
+            "duration": round(self.duration, 3),
+        }
+
+    def acquire(self) -> bool:
+        """False once close() has been called; the caller must look the index up again."""
+        with self._lock:
+            if self._closing:
+                return False
+            self._readers += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._readers -= 1
+            last = self._closing and self._readers == 0
+        if last:
+            self._unmap()
+
+    def __enter__(self) -> "TimeIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    @property
+    def closed(self) -> bool:
+        return self._mm.closed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            idle = self._readers == 0
+        if idle:
+            self._unmap()
+
+    def _unmap(self) -> None:
+        for col in self._cols.values():
+            col.release()
+        self._cols.clear()
+        self._mm.close()
+
+
+def parse_time(value: str | float) -> float:
+    """Seconds from "mm:ss", "hh:mm:ss" or a plain number."""
+    if isinstance(value, str):
+        m = _TS_ONLY_RE.match(value)
+        if m:
+            c = int(m.group(3)) if m.group(3) else None
+            return float(_ts_to_seconds(int(m.group(1)), int(m.group(2)), c))
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise ValueError(f"Bad time value: {value!r}") from None
+    if not math.isfinite(seconds):  # "nan" / "inf" parse as floats but are no position
+        raise ValueError(f"Bad time value: {value!r}")
+    return seconds
+
+
+def index_path(index_id: str) -> str:
+    if not _ID_RE.match(index_id):
+        raise ValueError("Invalid index id.")
+    return os.path.join(config.TIME_INDEX_DIR, f"{index_id}.vati")
+
+
+def _opened() -> LRUCache:
+    """Open (mmapped) indexes; one dropped from the cache is closed after its last reader."""
+    global _open
+    if _open is None:
+        _open = LRUCache(64, on_evict=lambda _, idx: idx.close())
+    return _open
+
+
+def build_time_index(doc: TranscriptDocument, video_id: str | None = None,
+                     window: float | None = None) -> tuple[str, TimeIndex]:
+    """
+    Build (or reuse) the index for this transcript; returns (index id, index),
+    the index acquired for the caller (release() it, or use it in a with block).
+    """
+    window = config.TIME_INDEX_WINDOW if window is None else window
+    index_id = index_id_for(doc, video_id, window)
+    path = index_path(index_id)
+    if os.path.exists(path):
+        idx = open_time_index(index_id)
+        if idx is not None:
+            if idx.window == window and idx.language == _language_field(doc.language).decode():
+                return index_id, idx
+            idx.release()
+    # the new file replaces the old one atomically; a mapping of the old file
+    # stays valid until its readers are done with it (see TimeIndex.close)
+    write_index(path, build_sections(doc, window), doc.language, window)
+    idx = TimeIndex(path)
+    idx.acquire()
+    with _open_lock:
+        _opened().set(index_id, idx)
+    return index_id, idx
+
+
+def open_time_index(index_id: str) -> TimeIndex | None:
+    """The open index, acquired for the caller (release() it, or use it in a with block)."""
+    cache = _opened()
+    while True:
+        idx = cache.get(index_id)
+        if idx is None:
+            with _open_lock:
+                idx = cache.get(index_id)
+                if idx is None:
+                    path = index_path(index_id)
+                    if not os.path.exists(path):
+                        return None
+                    idx = TimeIndex(path)
+                    cache.set(index_id, idx)
+        if idx.acquire():
+            return idx
+        # closed after the lookup, so it has left the cache: look again
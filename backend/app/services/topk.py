@@ -0,0 +1,41 @@
+import heapq
+from collections import Counter
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, Mapping, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Partial selection helpers. Every function orders ties the way a stable
+# sorted(..., reverse=True) would (first seen wins), so swapping one in for a
+# full sort never changes output.
+
+
+def top_k(items: Iterable[T], k: int, key: Callable[[T], float]) -> list[T]:
+    """The k largest items by key in O(n log k)."""
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, items, key=key)
+
+
+def most_common(counts: Mapping[str, int], k: int) -> list[tuple[str, int]]:
+    """Counter.most_common(k) for any mapping of counts."""
+    return top_k(counts.items(), k, key=itemgetter(1))
+
+
+def iter_ranked(scores: Sequence[float]) -> Iterator[int]:
+    """
+    Indices by score desc (ties by index), produced lazily:
+    O(n) heapify, then O(log n) per index actually consumed.
+    """
+    heap = [(-s, i) for i, s in enumerate(scores)]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[1]
+
+
+def merge_counts(parts: Iterable[Mapping[str, int]], into: Counter | None = None) -> Counter:
+    """Sum count tables (keys keep first-seen order, like Counter.update over the tokens)."""
+    out = Counter() if into is None else into
+    for part in parts:
+        out.update(part)
+    return out
@@ -1,26 +1,144 @@
+import asyncio
 import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 from youtube_transcript_api import YouTubeTranscriptApi
 
+from app import config
+from app.services.cache import LRUCache, SqliteCache, TieredCache
+from app.services.captions import CaptionTrack
+from app.services.metrics import stage
+
+# (video_id, languages) -> raw caption items
+TranscriptFetcher = Callable[[str, list[str]], list[dict]]
+
+_cache: TieredCache | None = None
+_fetch_pool: ThreadPoolExecutor | None = None
+_fetch_pool_lock = threading.Lock()
+# per event loop: cache key -> the task fetching it
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+
+
 def _extract_video_id(url: str) -> str:
     m = re.search(r"(v=|youtu\.be/)([A-Za-z0-9_-]{11})", url)
     if not m:
         raise ValueError("Could not extract YouTube video id.")
     return m.group(2)
 
-def fetch_youtube_transcript(url: str, languages: list[str] | None = None) -> list[dict]:
+def _youtube_fetcher(video_id: str, languages: list[str]) -> list[dict]:
+    return YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
+
+def _cache_key(video_id: str, languages: list[str]) -> str:
+    return f"{video_id}|{','.join(languages)}"
+
+def get_transcript_cache() -> TieredCache:
+    """Created on first use so importing the module never touches the disk."""
+    global _cache
+    if _cache is None:
+        disk = None
+        if config.TRANSCRIPT_CACHE_PATH:
+            disk = SqliteCache(config.TRANSCRIPT_CACHE_PATH,
+                               max_entries=config.TRANSCRIPT_CACHE_DISK_SIZE,
+                               ttl=config.TRANSCRIPT_CACHE_TTL)
+        _cache = TieredCache(LRUCache(config.TRANSCRIPT_CACHE_SIZE, ttl=config.TRANSCRIPT_CACHE_TTL), disk,
+                             encode=CaptionTrack.to_list, decode=CaptionTrack.from_items)
+    return _cache
+
+def set_transcript_cache(cache: TieredCache | None) -> None:
+    """Caption tracks are stored as item lists on disk; the codec is attached if missing."""
+    global _cache
+    if cache is not None and cache.encode is None:
+        cache.encode, cache.decode = CaptionTrack.to_list, CaptionTrack.from_items
+    _cache = cache
+
+def _sanitize(items: list[dict]) -> CaptionTrack:
+    # sanitize to plain columns (text / float start / float duration)
+    return CaptionTrack.from_items(items)
+
+def fetch_youtube_transcript(url: str, languages: list[str] | None = None,
+                             fetcher: TranscriptFetcher | None = None) -> CaptionTrack:
     """
-    Returns list of items:
+    Returns a CaptionTrack of items (to_list() gives the JSON form):
     [{ "text": str, "start": float, "duration": float }]
+    Cached per (video id, languages); `fetcher` replaces the YouTube call (tests, stubs).
     """
     vid = _extract_video_id(url)
     languages = languages or ["en", "ru", "kk"]
-    items = YouTubeTranscriptApi.get_transcript(vid, languages=languages)
-    # sanitize to plain dicts
-    out = []
-    for it in items:
-        out.append({
-            "text": it.get("text", ""),
-            "start": float(it.get("start", 0.0)),
-            "duration": float(it.get("duration", 0.0)),
-        })
+    cache = get_transcript_cache()
+    key = _cache_key(vid, languages)
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    with stage("youtube_fetch"):
+        out = _sanitize((fetcher or _youtube_fetcher)(vid, languages))
+    cache.set(key, out)
+    return out
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    """
+    The threads that call YouTube: VA_YOUTUBE_FETCH_CONCURRENCY of them. A call
+    that timed out keeps its thread until it returns, so the bound holds for
+    real upstream calls, not just for the requests waiting on them.
+    """
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _fetch_pool_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(max(1, config.YOUTUBE_FETCH_CONCURRENCY),
+                                                 thread_name_prefix="youtube-fetch")
+    return _fetch_pool
+
+def shutdown_fetch_pool() -> None:
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is not None:
+            _fetch_pool.shutdown(wait=False, cancel_futures=True)
+            _fetch_pool = None
+
+async def _load_or_fetch(key: str, vid: str, languages: list[str], fetcher: TranscriptFetcher,
+                         timeout: float | None) -> CaptionTrack:
+    loop = asyncio.get_running_loop()
+    cache = get_transcript_cache()
+    # SQLite reads / writes go to the default executor, not the loop or the fetch threads
+    cached = await loop.run_in_executor(None, cache.get_from_disk, key)
+    if cached is not None:
+        return cached
+    with stage("youtube_fetch"):
+        # the timeout includes waiting for a free fetch thread; a call still queued is dropped
+        items = await asyncio.wait_for(loop.run_in_executor(_get_fetch_pool(), fetcher, vid, languages), timeout)
+    out = _sanitize(items)
+    await loop.run_in_executor(None, cache.set, key, out)
     return out
+
+async def fetch_youtube_transcript_async(url: str, languages: list[str] | None = None,
+                                         fetcher: TranscriptFetcher | None = None,
+                                         timeout: float | None = None) -> CaptionTrack:
+    """
+    Non-blocking fetch_youtube_transcript for the API:
+    - at most VA_YOUTUBE_FETCH_CONCURRENCY upstream calls at once (fetch threads)
+    - each request bounded by `timeout` (asyncio.TimeoutError)
+    - concurrent requests for the same video share one upstream call
+    - only the memory tier is checked on the loop; the disk tier is read in the shared task
+    """
+    vid = _extract_video_id(url)
+    languages = languages or ["en", "ru", "kk"]
+    key = _cache_key(vid, languages)
+
+    cached = get_transcript_cache().memory.get(key)
+    if cached is not None:
+        return cached
+
+    inflight = _inflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        if timeout is None:
+            timeout = config.YOUTUBE_FETCH_TIMEOUT
+        task = asyncio.ensure_future(_load_or_fetch(key, vid, languages, fetcher or _youtube_fetcher, timeout))
+        inflight[key] = task
+        task.add_done_callback(lambda _t: inflight.pop(key, None))
+    # shield: one caller disconnecting must not cancel the fetch for the others
+    return await asyncio.shield(task)
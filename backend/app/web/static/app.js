@@ -37,17 +37,22 @@ function renderChips(words) {
   return `<div class="chips">${words.map(w => `<span class="chip">${esc(w.word || w)}</span>`).join("")}</div>`;
 }
 
-function renderOutline(outline) {
-  const segs = outline?.segments || [];
-  if (!segs.length) return `<p class="muted">No outline segments.</p>`;
+function renderSegments(segs) {
   return segs.map(seg => `
     <div class="seg">
       <strong>${esc(seg.range)}</strong><br/>
       <small>${esc((seg.keywords || []).join(", "))}</small>
+      ${seg.sections?.length ? `<div class="subsegs">${renderSegments(seg.sections)}</div>` : ""}
     </div>
   `).join("");
 }
 
+function renderOutline(outline) {
+  const segs = outline?.segments || [];
+  if (!segs.length) return `<p class="muted">No outline segments.</p>`;
+  return renderSegments(segs);
+}
+
 function buildSummarizeReport(data) {
   const summary = data.summary || {};
   const bullets = summary.summary_bullets || summary.selected_sentences || [];
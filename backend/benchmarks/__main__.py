@@ -0,0 +1,57 @@
+"""
+python -m benchmarks run  [--functions ...] [--languages en ru kk] [--formats ...] [--sizes 1KB 1MB] [--out file]
+python -m benchmarks compare BASE.json HEAD.json [--metric p50_s] [--threshold 0.1]
+"""
+import argparse
+import sys
+
+from benchmarks.compare import compare, load
+from benchmarks.generators import FORMATS, LANGUAGES, parse_size
+from benchmarks.run import TARGETS, run, write_results
+
+DEFAULT_SIZES = ["1KB", "10KB", "100KB", "1MB"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run benchmarks")
+    p_run.add_argument("--functions", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    p_run.add_argument("--languages", nargs="+", default=list(LANGUAGES), choices=list(LANGUAGES))
+    p_run.add_argument("--formats", nargs="+", default=list(FORMATS), choices=list(FORMATS))
+    p_run.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="e.g. 1KB 10KB 1MB 50MB")
+    p_run.add_argument("--repeat", type=int, default=5, help="minimum timed runs per case")
+    p_run.add_argument("--min-time", type=float, default=0.5, help="keep repeating until this many seconds")
+    p_run.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    p_run.add_argument("--seed", type=int, default=0)
+    p_run.add_argument("--out", default="bench_results.json")
+
+    p_cmp = sub.add_parser("compare", help="compare two result files")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("head")
+    p_cmp.add_argument("--metric", default="p50_s")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.1 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        data = run(args.functions, args.languages, args.formats, [parse_size(s) for s in args.sizes],
+                   repeat=args.repeat, min_time=args.min_time, memory=not args.no_memory,
+                   seed=args.seed, log=lambda line: print(line, file=sys.stderr))
+        write_results(data, args.out)
+        print(f"wrote {len(data['results'])} results to {args.out}", file=sys.stderr)
+        return 0
+
+    rows = compare(load(args.base), load(args.head), metric=args.metric, threshold=args.threshold)
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else ""
+        print(f"{r['function']:30s} {r['language']} {r['format']:9s} {r['size']:>10d}B "
+              f"{r['base']:.6f} -> {r['head']:.6f}  x{r['ratio']:.2f} {flag}")
+    regressions = sum(r["regression"] for r in rows)
+    print(f"{len(rows)} cases compared, {regressions} regressions ({args.metric}, >{args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Compares two result files from `python -m benchmarks run` and flags regressions.
+"""
+import json
+
+
+def _key(res: dict) -> tuple:
+    return res["function"], res["language"], res["format"], res["size"]
+
+
+def compare(base: dict, head: dict, metric: str = "p50_s", threshold: float = 0.10) -> list[dict]:
+    """
+    One row per case present in both files; ratio = head / base.
+    Rows with ratio > 1 + threshold are marked as regressions.
+    """
+    base_by_key = {_key(r): r for r in base["results"]}
+    rows = []
+    for res in head["results"]:
+        old = base_by_key.get(_key(res))
+        if old is None or not old.get(metric) or res.get(metric) is None:
+            continue
+        ratio = res[metric] / old[metric]
+        rows.append({
+            "function": res["function"],
+            "language": res["language"],
+            "format": res["format"],
+            "size": res["size"],
+            "base": old[metric],
+            "head": res[metric],
+            "ratio": ratio,
+            "regression": ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,126 @@
+"""
+Deterministic synthetic transcripts for benchmarking.
+
+Same (language, fmt, size, seed) -> same output on every machine and run.
+"""
+import random
+
+LANGUAGES = ("en", "ru", "kk")
+FORMATS = ("plain", "ts_only", "ts_prefix", "items")
+
+_CONTENT = {
+    "en": (
+        "light intensity wave wavelength lambda theta grating slit pattern maximum minimum angle "
+        "order diffraction interference distance screen energy photon electron field charge "
+        "voltage current resistance circuit momentum velocity acceleration force mass equation "
+        "derivative integral function matrix vector gradient probability distribution sample"
+    ).split(),
+    "ru": (
+        "свет интенсивность волна длина лямбда угол решетка щель картина максимум минимум порядок "
+        "дифракция интерференция расстояние экран энергия фотон электрон поле заряд напряжение "
+        "ток сопротивление цепь импульс скорость ускорение сила масса уравнение производная "
+        "интеграл функция матрица вектор градиент вероятность распределение выборка"
+    ).split(),
+    "kk": (
+        "жарық қарқындылық толқын ұзындық бұрыш тор саңылау сурет максимум минимум рет дифракция "
+        "интерференция қашықтық экран энергия фотон электрон өріс заряд кернеу ток кедергі тізбек "
+        "импульс жылдамдық үдеу күш масса теңдеу туынды интеграл функция матрица вектор градиент "
+        "ықтималдық үлестірім таңдама"
+    ).split(),
+}
+
+_FILLER = {
+    "en": "the a of and to in is we this that so okay now you it for with on as".split(),
+    "ru": "и в на это что мы так вот ну как для по с из то".split(),
+    "kk": "және бұл біз енді сонда осы бір үшін мен да де".split(),
+}
+
+_HINTS = {
+    "en": ["we should", "make sure", "remember to", "you need to"],
+    "ru": ["нужно", "давайте", "убедитесь", "помните"],
+    "kk": ["керек", "қажет", "жасайық", "есіңізде"],
+}
+
+_SENTIMENT = {
+    "en": ["good", "great", "clear", "useful", "confusing", "problem", "wrong"],
+    "ru": ["хорошо", "отлично", "понятно", "проблема"],
+    "kk": ["жақсы", "түсінікті", "мәселе"],
+}
+
+
+def _sentence(r: random.Random, lang: str, punctuate: bool) -> str:
+    content, filler = _CONTENT[lang], _FILLER[lang]
+    n = r.randint(5, 24)
+    words = [r.choice(content) if r.random() < 0.55 else r.choice(filler) for _ in range(n)]
+    roll = r.random()
+    if roll < 0.08:
+        words.insert(0, r.choice(_HINTS[lang]))
+    elif roll < 0.14:
+        words.append(r.choice(_SENTIMENT[lang]))
+    elif roll < 0.2:
+        words += ["I0", "=", f"{r.randint(1, 99)}.{r.randint(0, 9)}", "lambda"]
+    s = " ".join(words)
+    if not punctuate:
+        return s
+    s = s[0].upper() + s[1:]
+    return s + ("?" if r.random() < 0.07 else ".")
+
+
+def _fmt_ts(seconds: int) -> str:
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def generate_items(size: int, language: str = "en", seed: int = 0) -> list[dict]:
+    """Caption items ({text,start,duration}) whose texts add up to ~`size` bytes."""
+    r = random.Random(f"items/{language}/{size}/{seed}")
+    items = []
+    t = 0.0
+    total = 0
+    while total < size:
+        text = _sentence(r, language, punctuate=False)
+        dur = round(r.uniform(1.0, 4.5), 2)
+        items.append({"text": text, "start": round(t, 2), "duration": dur})
+        t += dur + r.choice((0.0, 0.0, 0.0, 0.4, 1.6))
+        total += len(text.encode("utf-8")) + 1
+    return items
+
+
+def generate_text(size: int, language: str = "en", fmt: str = "plain", seed: int = 0) -> str:
+    """
+    ~`size` bytes (UTF-8) of transcript text in one of the pasted formats:
+    plain       punctuated sentences with paragraph breaks
+    ts_only     "m:ss" lines followed by caption lines
+    ts_prefix   "m:ss caption line"
+    """
+    if fmt == "items":
+        return "\n".join(it["text"] for it in generate_items(size, language, seed))
+
+    r = random.Random(f"{fmt}/{language}/{size}/{seed}")
+    out: list[str] = []
+    total = 0
+    t = 0
+    while total < size:
+        if fmt == "plain":
+            piece = _sentence(r, language, punctuate=True)
+            piece += "\n\n" if r.random() < 0.05 else " "
+        elif fmt == "ts_only":
+            piece = f"{_fmt_ts(t)}\n{_sentence(r, language, punctuate=False)}\n"
+        elif fmt == "ts_prefix":
+            piece = f"{_fmt_ts(t)} {_sentence(r, language, punctuate=False)}\n"
+        else:
+            raise ValueError(f"Unknown format: {fmt}")
+        t += r.randint(1, 5)
+        out.append(piece)
+        total += len(piece.encode("utf-8"))
+    return "".join(out).strip()
+
+
+def parse_size(value: str) -> int:
+    """'1KB', '10kb', '2.5MB', '512' -> bytes."""
+    v = value.strip().upper()
+    for suffix, mult in (("GB", 1 << 30), ("MB", 1 << 20), ("KB", 1 << 10), ("B", 1)):
+        if v.endswith(suffix):
+            return int(float(v[: -len(suffix)]) * mult)
+    return int(v)
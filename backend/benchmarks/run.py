@@ -0,0 +1,130 @@
+"""
+Runs the services-layer benchmarks and returns / writes machine-readable results.
+"""
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from app.services.analyzer import analyze_transcript, rake_phrases
+from app.services.summarizer import build_outline, summarize_extractive
+from app.services.text_utils import parse_timestamped_transcript
+from benchmarks.generators import generate_items, generate_text
+
+# name -> fn(text, language, items) ; items is None for pasted-text formats
+TARGETS: dict[str, Callable] = {
+    "summarize_extractive": lambda text, lang, items: summarize_extractive(text, lang, yt_items=items),
+    "build_outline": lambda text, lang, items: build_outline(text, lang, yt_items=items),
+    "analyze_transcript": lambda text, lang, items: analyze_transcript(text, lang, yt_items=items),
+    "rake_phrases": lambda text, lang, items: rake_phrases(text, lang),
+    "parse_timestamped_transcript": lambda text, lang, items: parse_timestamped_transcript(text),
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    xs = sorted(values)
+    pos = (len(xs) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+
+
+def _peak_memory(fn: Callable, *args) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_case(name: str, text: str, language: str, items: list[dict] | None,
+               repeat: int, min_time: float, memory: bool) -> dict:
+    fn = TARGETS[name]
+    size = len(text.encode("utf-8"))
+    fn(text, language, items)  # warm-up
+
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat or (time.perf_counter() - started < min_time and len(times) < 10 * repeat):
+        t0 = time.perf_counter()
+        fn(text, language, items)
+        times.append(time.perf_counter() - t0)
+
+    mean = sum(times) / len(times)
+    return {
+        "runs": len(times),
+        "bytes": size,
+        "mean_s": mean,
+        "p50_s": percentile(times, 50),
+        "p90_s": percentile(times, 90),
+        "p99_s": percentile(times, 99),
+        "min_s": min(times),
+        "throughput_mb_s": (size / (1 << 20)) / mean if mean > 0 else None,
+        "peak_mem_bytes": _peak_memory(fn, text, language, items) if memory else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    try:
+        import numpy
+        np_version = numpy.__version__
+    except ImportError:
+        np_version = None
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np_version,
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run(functions: list[str], languages: list[str], formats: list[str], sizes: list[int],
+        repeat: int = 5, min_time: float = 0.5, memory: bool = True, seed: int = 0,
+        log: Callable[[str], None] | None = None) -> dict:
+    results = []
+    for lang in languages:
+        for fmt in formats:
+            for size in sizes:
+                items = generate_items(size, lang, seed) if fmt == "items" else None
+                text = generate_text(size, lang, fmt, seed)
+                for name in functions:
+                    if fmt == "items" and name == "parse_timestamped_transcript":
+                        continue  # nothing to parse: timings come with the items
+                    res = bench_case(name, text, lang, items, repeat, min_time, memory)
+                    res.update({"function": name, "language": lang, "format": fmt, "size": size})
+                    results.append(res)
+                    if log:
+                        mem = res["peak_mem_bytes"]
+                        log(f"{name:30s} {lang} {fmt:9s} {size:>10d}B  p50 {res['p50_s'] * 1000:9.2f} ms"
+                            f"  p99 {res['p99_s'] * 1000:9.2f} ms  {res['throughput_mb_s'] or 0:7.2f} MB/s"
+                            + (f"  peak {mem / (1 << 20):8.2f} MiB" if mem is not None else ""))
+    return {"environment": environment(), "results": results}
+
+
+def write_results(data: dict, path: str) -> None:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
@@ -0,0 +1,54 @@
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app import config
+from app.main import app
+from app.services import result_cache, youtube
+from app.services.cache import LRUCache, SqliteCache, TieredCache
+
+URL = "https://www.youtube.com/watch?v=abcdefghijk"
+VIDEO_ID = "abcdefghijk"
+
+
+class FakeFetcher:
+    """Stands in for the YouTube call: counts calls, returns fixed caption items."""
+
+    def __init__(self, items: list[dict] | None = None):
+        self.items = items if items is not None else [
+            {"text": "hello there", "start": 0.0, "duration": 1.5},
+            {"text": "general kenobi", "start": 1.5, "duration": 2.0},
+        ]
+        self.calls: list[tuple[str, list[str]]] = []
+
+    def __call__(self, video_id: str, languages: list[str]) -> list[dict]:
+        self.calls.append((video_id, languages))
+        return self.items
+
+
+@pytest.fixture(autouse=True)
+def no_disk_state(monkeypatch):
+    """Nothing a test runs writes SQLite files into the working directory."""
+    monkeypatch.setattr(config, "CORPUS_STATS_PATH", "")
+    monkeypatch.setattr(config, "SEARCH_AUTO_INDEX", False)
+
+
+@pytest.fixture
+def fetcher() -> FakeFetcher:
+    return FakeFetcher()
+
+
+@pytest.fixture
+def transcript_cache(tmp_path):
+    """A fresh two-tier transcript cache (1 entry in memory, SQLite under tmp_path)."""
+    cache = TieredCache(LRUCache(1, ttl=60.0), SqliteCache(str(tmp_path / "transcripts.sqlite3"), ttl=60.0))
+    youtube.set_transcript_cache(cache)
+    yield cache
+    youtube.set_transcript_cache(None)
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    """API client with a fresh in-memory result cache."""
+    monkeypatch.setattr(result_cache, "_cache", TieredCache(LRUCache(16)))
+    return TestClient(app)
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from app import config
+from app.services import batch
+from app.services.batch import iter_batch
+from app.services.captions import CaptionTrack
+
+TEXT = "Interference fringes appear when two coherent waves overlap on a screen. " * 4
+
+
+def test_first_result_does_not_wait_for_a_slow_fetch(monkeypatch):
+    release = threading.Event()
+
+    def slow_fetch(url):
+        release.wait(5)
+        return CaptionTrack.from_items([{"text": TEXT, "start": 0.0, "duration": 5.0}])
+
+    monkeypatch.setattr(batch, "fetch_youtube_transcript", slow_fetch)
+    results = iter_batch([{"text": TEXT}, {"youtube_url": "https://youtu.be/abcdefghijk"}],
+                         sections=["summary"], workers=0)
+    t0 = time.perf_counter()
+    first = next(results)
+    assert time.perf_counter() - t0 < 2
+    assert first["index"] == 0 and first["ok"]
+
+    release.set()
+    second = next(results)
+    assert second["index"] == 1 and second["ok"]
+    assert second["data"]["source"] == "youtube_captions"
+
+
+def test_fetches_overlap(monkeypatch):
+    def fetch(url):
+        time.sleep(0.3)
+        return CaptionTrack.from_items([{"text": TEXT, "start": 0.0, "duration": 5.0}])
+
+    monkeypatch.setattr(batch, "fetch_youtube_transcript", fetch)
+    monkeypatch.setattr(config, "YOUTUBE_FETCH_CONCURRENCY", 4)
+    inputs = [{"youtube_url": f"https://youtu.be/video{i:06d}"} for i in range(4)]
+    t0 = time.perf_counter()
+    results = list(iter_batch(inputs, sections=["summary"], workers=0))
+    assert [r["ok"] for r in results] == [True] * 4
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_errors_keep_their_index():
+    results = list(iter_batch([{"text": ""}, {"youtube_url": "nope"}, {"text": TEXT}], sections=["summary"], workers=0))
+    assert [(r["index"], r["ok"]) for r in results] == [(0, False), (1, False), (2, True)]
+    assert results[1]["error"] == "Could not extract YouTube video id."
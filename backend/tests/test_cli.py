@@ -0,0 +1,36 @@
+import io
+import json
+
+from app import cli
+
+import transcripts
+
+
+def test_checkpoint_records_only_successes(tmp_path):
+    good = tmp_path / "good.txt"
+    good.write_text(transcripts.plain(40), encoding="utf-8")
+    empty = tmp_path / "empty.txt"
+    empty.write_text("   ", encoding="utf-8")
+    out_path, ckpt_path = tmp_path / "out.jsonl", tmp_path / "done.txt"
+
+    argv = [str(tmp_path), "--out", str(out_path), "--checkpoint", str(ckpt_path), "--quiet"]
+    assert cli.main(argv) == 1
+    assert ckpt_path.read_text(encoding="utf-8").splitlines() == [str(good)]
+
+    # the rerun skips the good file and retries the failed one
+    assert cli.main(argv) == 1
+    rows = [json.loads(line) for line in out_path.read_text(encoding="utf-8").splitlines()]
+    assert [(r["path"], r["ok"]) for r in rows].count((str(empty), False)) == 2
+    assert [r["path"] for r in rows].count(str(good)) == 1
+
+
+def test_run_writes_one_line_per_file(tmp_path):
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"t{i}.txt"
+        p.write_text(transcripts.plain(30, seed=i), encoding="utf-8")
+        paths.append(str(p))
+    out = io.StringIO()
+    stats = cli.run(paths, out)
+    assert stats["ok"] == 3 and stats["errors"] == 0
+    assert sorted(json.loads(line)["path"] for line in out.getvalue().splitlines()) == paths
@@ -0,0 +1,39 @@
+from app import config
+from app.services import corpus
+from app.services.corpus import CorpusStats, get_idf_table, record_document
+from app.services.document import build_document
+
+
+def test_nothing_is_recorded_without_a_path(monkeypatch):
+    monkeypatch.setattr(corpus, "_stats", None)
+    monkeypatch.setattr(corpus, "_table", None)
+    assert record_document(build_document("light waves bend around the slit")) is False
+    table = get_idf_table()
+    assert table.n_docs == 0
+    assert table.idf("light") == 1.0
+
+
+def test_each_transcript_counts_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CORPUS_STATS_PATH", str(tmp_path / "corpus.sqlite3"))
+    monkeypatch.setattr(corpus, "_stats", None)
+    monkeypatch.setattr(corpus, "_table", None)
+    a = build_document("light waves bend around the slit")
+    b = build_document("light from the laser hits the grating")
+    assert record_document(a) is True
+    assert record_document(a) is False
+    assert record_document(b) is True
+
+    table = get_idf_table()
+    assert table.n_docs == 2
+    assert table.df("light") == 2 and table.df("grating") == 1
+    assert table.idf("grating") > table.idf("light")
+
+
+def test_processes_sharing_a_file_add_up(tmp_path):
+    path = str(tmp_path / "corpus.sqlite3")
+    one, two = CorpusStats(path), CorpusStats(path)
+    one.record("en", "first text", ["light", "slit"])
+    two.record("en", "second text", ["light"])
+    two.record("en", "first text", ["light", "slit"])
+    assert one.snapshot().df("light") == 2
+    assert two.n_docs() == 2
@@ -0,0 +1,201 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app import config
+from app.api import encoding, routes
+from app.api.encoding import coded_etag, dumps, pick_encoding
+from app.services.analyzer import analyze_transcript
+from app.services.captions import CaptionTrack
+
+import transcripts
+
+
+def _request(accept_encoding: str | None) -> Request:
+    headers = [] if accept_encoding is None else [(b"accept-encoding", accept_encoding.encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("GZIP", "gzip"),
+    ("*", "gzip"),
+    ("br", None),
+    ("identity", None),
+    ("gzip;q=bad", None),
+])
+def test_pick_encoding(no_brotli, header, expected):
+    assert pick_encoding(_request(header)) == expected
+
+
+def test_pick_encoding_prefers_brotli(monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", object())
+    assert pick_encoding(_request("gzip, br")) == "br"
+    assert pick_encoding(_request("gzip, br;q=0")) == "gzip"
+
+
+def test_compression_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(config, "COMPRESS_MIN_BYTES", 0)
+    assert pick_encoding(_request("gzip")) is None
+
+
+def test_coded_etag():
+    assert coded_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert coded_etag('"abc"', None) == '"abc"'
+    assert coded_etag('W/"abc"', "br") == 'W/"abc"'
+
+
+@pytest.mark.parametrize("payload", [
+    {"text": "é λ   \u0000 \"quoted\" \\ /", "n": [0, -1, 2**63 - 1], "f": [0.1, 2.5, -0.0]},
+    {1: "int key", "nested": [{"a": None, "b": True}], "empty": {}},
+    [2**70, 1e20, 1e-7],  # beyond 64 bits: orjson hands over to the stdlib encoder
+])
+def test_orjson_and_stdlib_encode_the_same_json(monkeypatch, payload):
+    pytest.importorskip("orjson")
+    fast = dumps(payload)
+    monkeypatch.setattr(encoding, "orjson", None)
+    slow = dumps(payload)
+    assert json.loads(fast) == json.loads(slow)
+
+
+def test_orjson_and_stdlib_bytes_match_on_analysis(monkeypatch):
+    pytest.importorskip("orjson")
+    data = {"ok": True, "data": analyze_transcript(transcripts.plain(80)), "debug_timings": None}
+    fast = dumps(data)
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert dumps(data) == fast
+
+
+def test_non_finite_floats_are_rejected(monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", None)
+    with pytest.raises(ValueError):
+        dumps({"x": float("nan")})
+
+
+def _analyze(client, accept_encoding: str, **headers):
+    return client.post("/api/analyze", json={"text": transcripts.plain(80)},
+                       headers={"Accept-Encoding": accept_encoding, **headers})
+
+
+def test_etag_per_content_coding(client, no_brotli):
+    plain = _analyze(client, "identity")
+    zipped = _analyze(client, "gzip")
+    assert plain.headers["Vary"] == zipped.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["ETag"] == coded_etag(plain.headers["ETag"], "gzip")
+    assert plain.json() == zipped.json()
+
+    for tag in (plain.headers["ETag"], zipped.headers["ETag"], "W/" + zipped.headers["ETag"]):
+        r = _analyze(client, "gzip", **{"If-None-Match": f'"other", {tag}'})
+        assert r.status_code == 304
+        assert r.headers["ETag"] == tag.removeprefix("W/")
+        assert r.headers["Vary"] == "Accept-Encoding"
+    assert _analyze(client, "gzip", **{"If-None-Match": '"other-gzip"'}).status_code == 200
+
+
+def test_small_bodies_are_not_compressed(client, monkeypatch):
+    monkeypatch.setattr(config, "COMPRESS_MIN_BYTES", 10**9)
+    r = _analyze(client, "gzip")
+    assert "Content-Encoding" not in r.headers
+    assert r.headers["Vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip"])
+def test_analyze_ndjson_sections(client, no_brotli, accept_encoding):
+    whole = _analyze(client, "identity").json()["data"]
+    r = client.post("/api/analyze", params={"format": "ndjson"}, json={"text": transcripts.plain(80)},
+                    headers={"Accept-Encoding": accept_encoding, "Accept": "application/x-ndjson"})
+    assert r.headers["content-type"] == "application/x-ndjson"
+    assert r.headers.get("Content-Encoding") == (None if accept_encoding == "identity" else "gzip")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert {row["section"]: row["data"] for row in lines} == whole
+    assert [row["section"] for row in lines] == list(whole)
+
+
+def test_gzip_body_is_a_valid_stream(no_brotli):
+    rows = [{"i": i} for i in range(encoding.NDJSON_GROUP * 2 + 3)]
+    response = encoding.ndjson_response(_request("gzip"), rows)
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    body = gzip.decompress(asyncio.run(collect()))
+    assert [json.loads(line) for line in body.splitlines()] == rows
+
+
+@pytest.fixture
+def captions(monkeypatch):
+    track = CaptionTrack.from_items(transcripts.caption_items(50))
+
+    async def fetch(url):
+        return track
+
+    monkeypatch.setattr(routes, "fetch_youtube_transcript_async", fetch)
+    return track
+
+
+def _captions(client, **params):
+    return client.get("/api/youtube-transcript", params={"url": "https://youtu.be/abcdefghijk", **params})
+
+
+def test_caption_pages_cover_every_item_once(client, captions):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 7} if cursor is None else {"limit": 7, "cursor": cursor}
+        data = _captions(client, **params).json()["data"]
+        assert data["total_items"] == 50
+        assert len(data["items"]) <= 7
+        assert data["text"] == captions.slice(len(seen), len(seen) + len(data["items"])).joined_text()
+        seen.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == captions.to_list()
+
+
+def test_caption_time_range(client, captions):
+    items = captions.to_list()
+    t0, t1 = items[10]["start"], items[20]["start"]
+    data = _captions(client, start=str(t0), end=str(t1), include_text="false").json()["data"]
+    assert data["items"] == [it for it in items if t0 <= it["start"] <= t1]
+    assert data["next_cursor"] is None
+    assert "text" not in data
+
+    page = _captions(client, start=str(t0), end=str(t1), limit=4, cursor="4").json()["data"]
+    assert page["items"] == data["items"][4:8]
+    assert page["next_cursor"] == "8"
+
+
+def test_caption_ndjson_page(client, captions):
+    r = _captions(client, format="ndjson", limit=5, cursor="10")
+    assert [json.loads(line) for line in r.text.splitlines()] == captions.to_list()[10:15]
+    whole = _captions(client, format="ndjson")
+    assert [json.loads(line) for line in whole.text.splitlines()] == captions.to_list()
+
+
+@pytest.mark.parametrize("params", [
+    {"cursor": "x"},
+    {"cursor": "-1"},
+    {"start": "nan"},
+    {"start": "10", "end": "5"},
+])
+def test_bad_caption_page_params(client, captions, params):
+    assert _captions(client, **params).status_code == 400
+
+
+def test_limit_bounds(client, captions):
+    assert _captions(client, limit=0).status_code == 422
+    assert _captions(client, limit=10001).status_code == 422
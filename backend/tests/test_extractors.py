@@ -0,0 +1,68 @@
+import pytest
+
+import transcripts
+from app.services import extractors
+from app.services.analyzer import analyze_transcript, extract_formula_snippets
+from app.services.document import build_document
+from app.services.extractors import Detector, ExtractorSet, FormulaScanner, register_detector
+
+
+class Shouting(Detector):
+    name = "shouting"
+    min_len = 5
+
+    def find(self, part, lower):
+        return (part,) if part.isupper() else ()
+
+
+def test_detector_without_find_cannot_be_created():
+    class Incomplete(Detector):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_registered_detector_runs(monkeypatch):
+    monkeypatch.setattr(extractors, "_REGISTRY", dict(extractors._REGISTRY))
+    register_detector("shouting", lambda p: Shouting())
+    ex = ExtractorSet("en", names=["shouting", "questions"])
+    for part in ["STOP THAT NOW", "quiet please", "NO"]:
+        ex.feed(part)
+    assert ex.hits["shouting"] == ["STOP THAT NOW"]
+
+
+def _scan(pieces, limit=12):
+    sc = FormulaScanner(limit)
+    for p in pieces:
+        sc.feed(p)
+    sc.close()
+    return sc.hits
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 9, 10, 64, 10_000])
+@pytest.mark.parametrize("text", [
+    transcripts.plain(120),
+    "the inten" + "sity grows with the square here. Is this I0 = 3.2 lambda over two",
+    "x I" + "s not a formula but I" + "0 = theta squared divided by four is",
+    "lambda " * 40,
+])
+def test_formula_scanner_matches_whole_text_scan(text, size):
+    pieces = [text[i:i + size] for i in range(0, len(text), size)]
+    assert _scan(pieces) == extract_formula_snippets(text)
+    assert _scan(pieces, limit=3) == extract_formula_snippets(text, limit=3)
+
+
+def test_formula_snippets_from_caption_items():
+    items = transcripts.caption_items()
+    doc = build_document("", "en", items)
+    assert analyze_transcript("", "en", items, doc=doc)["formula_snippets"] == extract_formula_snippets(doc.text)
+
+
+@pytest.mark.parametrize("text", [transcripts.timestamp_lines(), transcripts.timestamp_prefixed()])
+def test_formula_snippets_span_caption_lines(text):
+    doc = build_document(text, "en")
+    snippets = analyze_transcript(text, "en", doc=doc)["formula_snippets"]
+    # scanned over the normalized text, not cut at caption lines or sentence parts
+    assert snippets == extract_formula_snippets(doc.text)
+    assert any(not any(s in line for line in text.splitlines()) for s in snippets)
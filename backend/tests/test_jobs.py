@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import cache as cache_module
+from app.services import jobs
+from app.services.jobs import FAIRNESS, JobQueue, QueueFull, set_job_queue
+
+import transcripts
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+async def _until(predicate, steps: int = 100) -> None:
+    for _ in range(steps):
+        if predicate():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition not reached")
+
+
+def _gated(order: list[str], name: str, gate: asyncio.Event | None = None):
+    async def run():
+        if gate is not None:
+            await gate.wait()
+        order.append(name)
+        return {"name": name}
+    return run
+
+
+@pytest.fixture
+def queue():
+    """The app's job queue for the test (1 worker, 3 queued at most)."""
+    q = JobQueue(workers=1, max_queued=3, ttl=60.0)
+    set_job_queue(q)
+    yield q
+    set_job_queue(None)
+
+
+def test_lanes_run_by_priority_with_fairness(queue):
+    assert FAIRNESS == 5
+    queue.max_queued = 100
+    order: list[str] = []
+
+    async def main():
+        gate = asyncio.Event()
+        blocker = await queue.submit("analyze", "short", _gated(order, "blocker", gate))
+        await _until(lambda: blocker.status == "running")
+        names = ["long1", "url1"] + [f"short{i}" for i in range(1, 7)]
+        for i, name in enumerate(names):
+            job = await queue.submit("analyze", name.rstrip("0123456789"), _gated(order, name))
+            job.created_at = i  # submission order, without relying on clock resolution
+        gate.set()
+        await _until(lambda: len(order) == 9)
+        await queue.shutdown()
+
+    asyncio.run(main())
+    # dispatch 5 takes the oldest queued job (long1) whatever its lane
+    assert order == ["blocker", "short1", "short2", "short3", "long1", "short4", "short5", "short6", "url1"]
+
+
+def test_full_queue_raises_queue_full(queue):
+    async def main():
+        gate = asyncio.Event()
+        blocker = await queue.submit("analyze", "short", _gated([], "blocker", gate))
+        await _until(lambda: blocker.status == "running")
+        for _ in range(3):
+            await queue.submit("analyze", "long", _gated([], "queued"))
+        with pytest.raises(QueueFull) as e:
+            await queue.submit("analyze", "short", _gated([], "rejected"))
+        await queue.shutdown()
+        return e.value
+
+    err = asyncio.run(main())
+    assert 1 <= err.retry_after <= 300
+    assert queue.queued == 3
+
+
+def test_full_queue_is_a_429_with_retry_after(queue):
+    queue.max_queued = 0
+    r = TestClient(app).post("/api/jobs/summarize", json={"text": transcripts.plain(20)})
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+
+
+def test_cancel_only_queued_jobs(queue):
+    order: list[str] = []
+
+    async def main():
+        gate = asyncio.Event()
+        running = await queue.submit("analyze", "short", _gated(order, "running", gate))
+        await _until(lambda: running.status == "running")
+        queued = await queue.submit("analyze", "short", _gated(order, "queued"))
+        assert queue.position(queued) == 0
+        assert queue.cancel(queued)
+        assert not queue.cancel(queued)
+        assert not queue.cancel(running)
+        gate.set()
+        await _until(lambda: running.finished)
+        await queue.shutdown()
+        return running, queued
+
+    running, queued = asyncio.run(main())
+    assert order == ["running"]
+    assert (running.status, queued.status) == ("done", "cancelled")
+    assert queued.finished_at is not None
+    assert queue.get(queued.id) is queued
+    assert queue.queued == 0
+
+
+def test_finished_jobs_expire_ttl_after_finishing(queue, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    monkeypatch.setattr(jobs, "time", clock)
+
+    async def main():
+        gate = asyncio.Event()
+        job = await queue.submit("analyze", "long", _gated([], "slow", gate))
+        await _until(lambda: job.status == "running")
+        clock.now += 600  # far past the TTL while running
+        assert queue.get(job.id) is job
+        gate.set()
+        await _until(lambda: job.finished)
+        await queue.shutdown()
+        return job
+
+    job = asyncio.run(main())
+    assert job.finished_at == 1600.0
+    clock.now += 59
+    assert queue.get(job.id) is job
+    clock.now += 2
+    assert queue.get(job.id) is None
+
+
+def test_job_endpoints(queue):
+    text = transcripts.plain(40)
+    with TestClient(app) as client:
+        r = client.post("/api/jobs/summarize", json={"text": text})
+        assert r.status_code == 202
+        job_id = r.json()["data"]["job_id"]
+        assert r.headers["Location"] == f"/api/jobs/{job_id}"
+
+        lines = [json.loads(line) for line in client.get(f"/api/jobs/{job_id}/stream").iter_lines() if line]
+        statuses = [line["status"] for line in lines]
+        assert statuses[-1] == "done"
+        assert statuses == sorted(statuses, key=["queued", "running", "done"].index)
+        assert all(line["job_id"] == job_id for line in lines)
+
+        expected = client.post("/api/summarize", json={"text": text}).json()["data"]
+        assert lines[-1]["result"] == expected
+        assert client.get(f"/api/jobs/{job_id}").json()["data"]["result"] == expected
+
+        r = client.delete(f"/api/jobs/{job_id}")
+        assert r.status_code == 409
+        assert client.get("/api/jobs/0123456789abcdef").status_code == 404
@@ -0,0 +1,75 @@
+import copy
+
+import pytest
+
+from app.services.keyphrases import MAX_WORDS, MIN_WORDS, RakeScanner, extract_keyphrases
+
+
+def _scan(*pieces: str, close: bool = True) -> RakeScanner:
+    scanner = RakeScanner("en")
+    for p in pieces:
+        scanner.feed(p)
+    if close:
+        scanner.close()
+    return scanner
+
+
+def test_limits():
+    assert (MIN_WORDS, MAX_WORDS) == (2, 6)
+
+
+def test_stopwords_end_runs():
+    s = _scan("diffraction grating and the bright fringe pattern")
+    assert list(s.phrases) == ["diffraction grating", "bright fringe pattern"]
+
+
+@pytest.mark.parametrize("sep", [".", ",", ";", ":", "!", "?", "\n", "(", ")", '"'])
+def test_punctuation_ends_runs(sep):
+    s = _scan(f"diffraction grating{sep} bright fringe pattern")
+    assert list(s.phrases) == ["diffraction grating", "bright fringe pattern"]
+
+
+def test_digits_and_short_tokens_end_runs():
+    s = _scan("diffraction grating 600 lines per millimetre ab slit width")
+    assert "diffraction grating" in s.phrases
+    assert "slit width" in s.phrases
+    assert not any("600" in p or " ab" in p for p in s.phrases)
+
+
+def test_run_lengths_outside_the_limits_are_not_phrases():
+    one = "grating"
+    six = "bright green laser beam hits grating"
+    seven = "bright green laser beam hits grating slowly"
+    s = _scan(f"{one}. {six}. {seven}.")
+    assert list(s.phrases) == [six]
+    # every run still counts towards frequency and degree
+    assert s.freq["grating"] == 3
+    assert s.degree["grating"] == 1 + 6 + 7
+
+
+def test_runs_continue_across_pieces():
+    whole = _scan("the bright fringe pattern moves")
+    split = _scan("the bright ", "fringe pattern ", "moves")
+    assert split.phrases == whole.phrases
+    assert split.freq == whole.freq and split.degree == whole.degree
+
+
+def test_scores_are_degree_over_frequency():
+    s = _scan("laser beam. laser beam splitter. laser.")
+    scores = {t["phrase"]: t["score"] for t in s.top()}
+    # laser: freq 3, degree 2 + 3 + 1 = 6; beam: freq 2, degree 5; splitter: 3 / 1
+    assert scores == {"laser beam splitter": round(6 / 3 + 5 / 2 + 3, 2), "laser beam": round(6 / 3 + 5 / 2, 2)}
+
+
+def test_peek_top_leaves_the_counters_unchanged():
+    s = _scan("diffraction grating splits light. bright fringe pattern", close=False)
+    state = copy.deepcopy((s.freq, s.degree, s.phrases, s._run))
+    peeked = s.peek_top()
+    assert copy.deepcopy((s.freq, s.degree, s.phrases, s._run)) == state
+    s.close()
+    assert s.top() == peeked
+
+
+def test_extract_keyphrases_matches_scanner():
+    text = "Diffraction grating splits light. The diffraction grating spacing sets the angle."
+    assert extract_keyphrases(text) == _scan(text).top()
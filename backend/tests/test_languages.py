@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app import config
+from app.services import languages
+from app.services.languages import available_languages, get_profile, get_stopwords, reset_profiles
+
+
+@pytest.fixture
+def language_dir(tmp_path, monkeypatch):
+    """VA_LANGUAGE_DIR with a German profile and a replacement for the built-in English one."""
+    (tmp_path / "de.json").write_text(json.dumps({
+        "stopwords": ["der", "die", "das", "und"],
+        "positive": ["gut"],
+        "negative": ["schlecht"],
+        "action_hints": ["wir müssen"],
+        "definition_cues": [" heißt "],
+    }), encoding="utf-8")
+    (tmp_path / "EN.json").write_text(json.dumps({"stopwords": ["zzz"]}), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a profile", encoding="utf-8")
+    monkeypatch.setattr(config, "LANGUAGE_DIR", str(tmp_path))
+    reset_profiles()
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def fresh_profiles():
+    """Loaded profiles never leak between tests (or into the rest of the suite)."""
+    reset_profiles()
+    yield
+    reset_profiles()
+
+
+def test_profile_loaded_from_the_directory(language_dir):
+    de = get_profile("de")
+    assert de.code == "de"
+    assert de.stopwords == {"der", "die", "das", "und"}
+    assert de.sentiment_score(["gut", "gut", "schlecht"]) == 1
+    assert de.has_action_hint("morgen wir müssen rechnen")
+    assert de.has_definition_cue("das gitter heißt beugung")
+    assert available_languages() == ["de", "en", "kk", "ru"]
+
+
+def test_data_file_replaces_a_builtin(language_dir):
+    assert get_stopwords("en") == {"zzz"}
+    # keys left out of the file are empty, not inherited
+    assert get_profile("en").positive == frozenset()
+
+
+@pytest.mark.parametrize("code, expected", [
+    ("de-AT", "de"), ("de_CH", "de"), ("DE", "de"),
+    ("ru-RU", "ru"), ("rus", "ru"), ("kz", "kk"), ("kk_KZ", "kk"),
+    ("fr", "en"), ("", "en"), (None, "en"), ("xx-unknown", "en"),
+])
+def test_alias_and_fallback_resolution(language_dir, code, expected):
+    assert get_profile(code).code == expected
+
+
+def test_unknown_language_falls_back_to_english_without_a_directory():
+    assert get_profile("de").code == "en"
+    assert "the" in get_stopwords("pt-BR")
+    assert available_languages() == ["en", "kk", "ru"]
+
+
+def test_profiles_are_shared():
+    assert get_profile("en-GB") is get_profile("en") is get_profile("EN_us")
+
+
+def test_resolution_memo_is_bounded():
+    for i in range(1500):
+        assert get_profile(f"zz-{i}").code == "en"
+    assert len(languages._resolved) == 1024
+    assert get_profile("zz-1499").code == "en"  # past the cap: resolved, just not remembered
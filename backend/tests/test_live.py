@@ -0,0 +1,42 @@
+import pytest
+
+from app.services.document import build_document
+from app.services.live import LiveSession
+from app.services.summarizer import build_outline, summarize_extractive
+
+import transcripts
+
+CASES = {
+    "plain": transcripts.plain(300, seed=21),
+    "timestamp_lines": transcripts.timestamp_lines(300, seed=22),
+    "timestamp_prefixed": transcripts.timestamp_prefixed(300, seed=23),
+    "short_timestamped": "0:01 okay dear students\n0:03 today we look at diffraction gratings",
+}
+
+
+def _lines_in_chunks(text: str, size: int) -> list[str]:
+    lines = text.split("\n")
+    return ["\n".join(lines[i:i + size]) for i in range(0, len(lines), size)]
+
+
+@pytest.mark.parametrize("size", [1, 5, 40])
+@pytest.mark.parametrize("name", CASES)
+def test_report_matches_summarize(name, size):
+    text = CASES[name]
+    session = LiveSession()
+    for chunk in _lines_in_chunks(text, size):
+        session.append(chunk)
+
+    doc = build_document(text)
+    report = session.report(7)
+    assert report["summary"] == summarize_extractive(text, k=7, doc=doc)
+    assert report["outline"] == build_outline(text, doc=doc)
+
+
+def test_timestamped_report_has_time_ranges():
+    session = LiveSession()
+    for chunk in _lines_in_chunks(CASES["timestamp_prefixed"], 10):
+        session.append(chunk)
+    outline = session.report()["outline"]
+    assert outline["mode"] == "timestamp_topics"
+    assert all("start" in seg for seg in outline["segments"])
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app import config
+from app.services import summarizer
+from app.services.analyzer import analyze_transcript
+from app.services.document import build_document
+from app.services.mapreduce import prepare_document, split_chunks
+from app.services.pool import InlineExecutor
+from app.services.summarizer import build_outline, summarize_extractive
+
+import transcripts
+
+TEXTS = {
+    "plain": transcripts.plain(400, seed=41),
+    "timestamp_lines": transcripts.timestamp_lines(400, seed=42),
+    "no_boundaries": " ".join(transcripts.plain(60, seed=43).replace(".", ",").split()),
+}
+
+
+@pytest.fixture(scope="module")
+def process_pool():
+    with ProcessPoolExecutor(2) as pool:
+        yield pool
+
+
+@pytest.fixture(params=["inline", "processes"])
+def executor(request, process_pool):
+    return InlineExecutor() if request.param == "inline" else process_pool
+
+
+def _results(doc) -> dict:
+    return {
+        "tokens": doc._tokens,
+        "freq": list(doc.freq.items()),
+        "bigrams": list(doc.bigram_freq.items()),
+        "rake": doc.rake.top(15),
+        "summary": summarize_extractive(doc.raw, doc.language, k=7, doc=doc),
+        "outline": build_outline(doc.raw, doc.language, doc=doc),
+        "analysis": analyze_transcript(doc.raw, doc.language, doc=doc),
+    }
+
+
+@pytest.mark.parametrize("chunk_chars", [50, 997, 4000])
+@pytest.mark.parametrize("name", TEXTS)
+def test_map_reduce_equals_serial(name, chunk_chars, executor, monkeypatch):
+    monkeypatch.setattr(config, "PARALLEL_MIN_CHARS", 1)
+    monkeypatch.setattr(config, "PARALLEL_CHUNK_CHARS", chunk_chars)
+    monkeypatch.setattr(summarizer, "PARALLEL_MIN_SENTENCES", 1)  # score sentences in the pool too
+    text = TEXTS[name]
+
+    serial = build_document(text)
+    parallel = build_document(text)
+    prepared = prepare_document(parallel, executor)
+    assert prepared == (len(split_chunks(parallel.text, chunk_chars)) > 1)
+    assert _results(parallel) == _results(serial)
+
+
+@pytest.mark.parametrize("target", [1, 40, 500, 10 ** 6])
+def test_chunks_cover_the_text_and_end_at_sentence_boundaries(target):
+    text = build_document(TEXTS["plain"]).text
+    bounds = split_chunks(text, target)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(text)
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+    for _, end in bounds[:-1]:
+        assert text[end - 1].isspace() and text[:end].rstrip()[-1] in ".!?"
@@ -0,0 +1,108 @@
+import re
+
+import pytest
+
+from app import config
+from app.services import metrics
+from app.services.metrics import Registry, collect_timings, stage, timed, timings_ms
+
+import transcripts
+
+TEXT = transcripts.plain(60, seed=61)
+SAMPLE_RE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? -?[0-9.e+-]+$')
+
+
+@pytest.fixture
+def metrics_on(monkeypatch):
+    monkeypatch.setattr(config, "METRICS_ENABLED", True)
+
+
+def _samples(text: str) -> dict[str, float]:
+    out = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        assert SAMPLE_RE.match(line), line
+        name, _, value = line.rpartition(" ")
+        out[name] = float(value)
+    return out
+
+
+def test_exposition_format():
+    reg = Registry()
+    reg.counter("demo_total", "Demo counter.")
+    reg.histogram("demo_seconds", "Demo latency.", (0.1, 1.0))
+    reg.inc("demo_total", {"route": '/a"b'})
+    reg.inc("demo_total", {"route": '/a"b'}, 2)
+    reg.observe("demo_seconds", 0.05)
+    reg.observe("demo_seconds", 0.5)
+    reg.observe("demo_seconds", 5.0)
+    reg.gauge_callback({"demo_entries": "Demo gauge."}, lambda: iter([("demo_entries", {"tier": "memory"}, 3)]))
+    assert reg.exposition().splitlines() == [
+        "# HELP demo_total Demo counter.",
+        "# TYPE demo_total counter",
+        'demo_total{route="/a\\"b"} 3',
+        "# HELP demo_seconds Demo latency.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{le="0.1"} 1',
+        'demo_seconds_bucket{le="1"} 2',
+        'demo_seconds_bucket{le="+Inf"} 3',
+        "demo_seconds_sum 5.55",
+        "demo_seconds_count 3",
+        "# HELP demo_entries Demo gauge.",
+        "# TYPE demo_entries gauge",
+        'demo_entries{tier="memory"} 3',
+    ]
+
+
+def test_stage_and_timed_record_into_the_histogram(metrics_on):
+    @timed("test_fn")
+    def work():
+        with stage("test_inner"):
+            return 42
+
+    def count(name):
+        h = metrics.registry.snapshot("va_stage_seconds", {"stage": name})
+        return (0, 0.0) if h is None else (sum(h[:-1]), h[-1])
+
+    fn_before, inner_before = count("test_fn")[0], count("test_inner")[0]
+    assert work() == 42
+    (fn, fn_sum), (inner, inner_sum) = count("test_fn"), count("test_inner")
+    assert fn - fn_before == inner - inner_before == 1
+    assert fn_sum >= inner_sum >= 0
+
+
+def test_collect_timings_without_metrics(monkeypatch):
+    monkeypatch.setattr(config, "METRICS_ENABLED", False)
+    assert stage("anything") is metrics._NOOP
+    with collect_timings() as timings:
+        with stage("a"):
+            pass
+        with stage("a"):
+            pass
+    assert list(timings) == ["a"]
+    assert timings_ms({"a": 0.0012345}) == {"a": 1.234}
+    with collect_timings(False) as none:
+        assert none is None
+
+
+def test_endpoint_metrics_and_debug_timings(metrics_on, client):
+    before = _samples(client.get("/api/metrics").text)
+    r = client.post("/api/summarize", json={"text": TEXT, "debug_timings": True})
+    assert r.status_code == 200
+    timings = r.json()["debug_timings"]
+    assert {"load_input", "summarize", "build_outline"} <= set(timings)
+    assert all(isinstance(v, float) and v >= 0 for v in timings.values())
+    assert client.post("/api/summarize", json={"text": TEXT}).json()["debug_timings"] is None
+
+    exposition = client.get("/api/metrics")
+    assert exposition.headers["content-type"].startswith("text/plain")
+    samples = _samples(exposition.text)
+
+    def delta(name):
+        return samples[name] - before.get(name, 0)
+
+    assert delta('va_http_requests_total{method="POST",route="/api/summarize",status="200"}') == 2
+    assert delta('va_http_request_seconds_count{route="/api/summarize"}') == 2
+    assert delta('va_stage_seconds_count{stage="summarize"}') == 1  # the second request was a cache hit
+    assert 'va_cache_entries{cache="result",tier="memory"}' in samples
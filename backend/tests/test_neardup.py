@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import config
+from app.main import app
+from app.services import neardup, result_cache
+from app.services.analyzer import analyze_transcript
+from app.services.cache import LRUCache, TieredCache
+from app.services.document import build_document
+from app.services.neardup import NearDuplicateIndex, minhash, signature, similarity
+from app.services.summarizer import build_outline
+
+import transcripts
+
+BASE = transcripts.plain(150, seed=31)
+# the same lecture with a different date and figures appended
+EDITED = BASE + " On 2024-03-05 the screen was 77.7 units away, slides at www.example.org/grating today."
+
+
+@pytest.fixture
+def near_dup(monkeypatch):
+    monkeypatch.setattr(result_cache, "_cache", TieredCache(LRUCache(16)))
+    monkeypatch.setattr(neardup, "_index", NearDuplicateIndex(100, 0.9))
+    yield
+    neardup.set_near_duplicate_index(None)
+
+
+def test_zero_threshold_disables(monkeypatch):
+    monkeypatch.setattr(neardup, "_index", None)
+    monkeypatch.setattr(config, "NEARDUP_THRESHOLD", 0.0)
+    assert neardup.get_near_duplicate_index() is None
+
+
+def test_numpy_and_python_signatures_agree(monkeypatch):
+    words = build_document(BASE).words
+    with_np = minhash(words)
+    monkeypatch.setattr(neardup, "np", None)
+    assert minhash(words) == with_np
+
+
+def test_numbers_and_stopwords_are_shingled():
+    a = build_document("the value was " + " and then ".join(str(i) for i in range(40)))
+    b = build_document("the value was " + " and then ".join(str(i + 100) for i in range(40)))
+    assert a.words == b.words  # the keyword tokens alone cannot tell them apart
+    assert similarity(signature(a), signature(b)) < 0.5
+
+
+def test_near_duplicate_reuses_only_the_selection(near_dup):
+    client = TestClient(app)
+    body = {"sections": ["summary", "outline", "analysis"]}
+    client.post("/api/report", json={**body, "text": BASE})
+    r = client.post("/api/report", json={**body, "text": EDITED})
+    assert "x-near-duplicate-similarity" in r.headers
+    data = r.json()["data"]
+
+    doc = build_document(EDITED)
+    assert data["analysis"] == analyze_transcript(EDITED, doc=doc)
+    assert "www.example.org/grating" in data["analysis"]["urls"]
+    assert "2024-03-05" in data["analysis"]["dates"]
+    assert data["outline"] == build_outline(EDITED, doc=doc)
+    assert data["summary"]["keywords"] == [w for w, _ in doc.top_keywords(12)]
+    assert set(data["summary"]["selected_sentences"]) <= set(doc.units)
+
+
+def test_changed_sentences_are_not_reused(near_dup):
+    client = TestClient(app)
+    first = client.post("/api/summarize", json={"text": BASE}).json()["data"]
+    # every selected sentence gets a different figure: none of them occurs in the new text
+    edited = BASE
+    for s in first["summary"]["selected_sentences"]:
+        edited = edited.replace(s, s[:-1] + " 42.")
+    r = client.post("/api/summarize", json={"text": edited})
+    assert "x-near-duplicate-similarity" not in r.headers
+    units = set(build_document(edited).units)
+    assert set(r.json()["data"]["summary"]["selected_sentences"]) <= units
@@ -0,0 +1,39 @@
+import pytest
+
+from app.services.analyzer import analyze_transcript
+from app.services.document import build_document
+from app.services.summarizer import build_outline, summarize_extractive
+
+import transcripts
+
+TEXT = transcripts.plain(120, seed=51)
+
+
+def test_full_report_matches_the_single_endpoints(client):
+    data = client.post("/api/report", json={"text": TEXT}).json()["data"]
+    assert set(data) == {"summary", "outline", "analysis", "source"}
+    doc = build_document(TEXT)
+    assert data["summary"] == summarize_extractive(TEXT, doc=doc)
+    assert data["outline"] == build_outline(TEXT, doc=doc)
+    assert data["analysis"] == analyze_transcript(TEXT, doc=doc)
+    assert data["source"] == "pasted_text"
+
+
+@pytest.mark.parametrize("sections", [["summary"], ["outline"], ["analysis"], ["analysis", "summary"]])
+def test_only_requested_sections(client, sections):
+    r = client.post("/api/report", json={"text": TEXT, "sections": sections})
+    assert r.status_code == 200
+    assert set(r.json()["data"]) == set(sections) | {"source"}
+
+
+def test_section_subsets_are_cached_separately(client):
+    only_summary = client.post("/api/report", json={"text": TEXT, "sections": ["summary"]})
+    everything = client.post("/api/report", json={"text": TEXT})
+    assert only_summary.headers["etag"] != everything.headers["etag"]
+    assert "analysis" in everything.json()["data"]
+
+
+@pytest.mark.parametrize("sections", [["summary", "keywords"], ["everything"]])
+def test_unknown_sections_are_rejected(client, sections):
+    r = client.post("/api/report", json={"text": TEXT, "sections": sections})
+    assert r.status_code == 422
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import result_cache
+from app.services.cache import LRUCache, TieredCache
+
+TEXT = ("Diffraction gratings split light into orders. Each order appears at a fixed angle. "
+        "Remember that the spacing of the slits sets those angles. ") * 5
+
+
+def _client(monkeypatch) -> TestClient:
+    monkeypatch.setattr(result_cache, "_cache", TieredCache(LRUCache(16)))
+    return TestClient(app)
+
+
+def test_matching_etag_gives_304(monkeypatch):
+    client = _client(monkeypatch)
+    first = client.post("/api/analyze", json={"text": TEXT})
+    etag = first.headers["etag"]
+    again = client.post("/api/analyze", json={"text": TEXT}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+
+def test_wildcard_does_not_match_a_result_never_seen(monkeypatch):
+    client = _client(monkeypatch)
+    r = client.post("/api/analyze", json={"text": TEXT}, headers={"If-None-Match": "*"})
+    assert r.status_code == 200
+    assert r.json()["data"]["stats"]["word_count"] > 0
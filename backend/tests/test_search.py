@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import config
+from app.main import app
+from app.services import search
+from app.services.document import build_document
+from app.services.search import SearchIndex, decode_varint, encode_varint
+
+
+def _doc(text: str):
+    return build_document(text)
+
+
+@pytest.mark.parametrize("n", [0, 1, 127, 128, 300, 2 ** 35])
+def test_varint_round_trip(n):
+    buf = bytearray()
+    encode_varint(n, buf)
+    assert decode_varint(bytes(buf), 0) == (n, len(buf))
+
+
+def test_replacing_the_newest_transcript_keeps_it_searchable(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.sqlite3"))
+    index.add(_doc("gratings split light into orders"), "v1")
+    index.add(_doc("lenses focus light onto a screen"), "v2")
+    index.add(_doc("lenses bend light through glass"), "v2")
+    hits = index.search("glass")["hits"]
+    assert [h["video_id"] for h in hits] == ["v2"]
+    assert index.search("screen")["hits"] == []
+    assert index.stats()["documents"] == 2
+
+
+def test_two_connections_see_each_others_writes(tmp_path):
+    path = str(tmp_path / "search.sqlite3")
+    a, b = SearchIndex(path), SearchIndex(path)
+    a.add(_doc("gratings split light into orders"), "v1")
+    assert [h["video_id"] for h in b.search("gratings")["hits"]] == ["v1"]
+
+    b.add(_doc("prisms split light by wavelength"), "v2")
+    assert {h["video_id"] for h in a.search("split")["hits"]} == {"v1", "v2"}
+
+    # b replaces a transcript a has loaded: a drops the old version
+    b.add(_doc("interference fringes on a screen"), "v1")
+    assert a.search("gratings")["hits"] == []
+    assert [h["video_id"] for h in a.search("fringes")["hits"]] == ["v1"]
+
+    # a adds after b's writes: its catch-up happens under the write lock, nothing is lost
+    a.add(_doc("polarizers block light"), "v3")
+    for index in (a, b):
+        assert index.stats()["documents"] == 3
+        assert {h["video_id"] for h in index.search("light prisms fringes polarizers")["hits"]} == {"v1", "v2", "v3"}
+
+
+def test_search_is_disabled_without_a_path(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_INDEX_PATH", "")
+    monkeypatch.setattr(search, "_index", None)
+    client = TestClient(app)
+    assert client.get("/api/search", params={"q": "light"}).status_code == 503
+    r = client.post("/api/search/index", json={"text": "some words here", "video_id": "v1"})
+    assert r.status_code == 503
+
+
+def test_search_route(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "_index", SearchIndex(str(tmp_path / "search.sqlite3")))
+    client = TestClient(app)
+    r = client.post("/api/search/index", json={"text": "0:01 gratings\n0:05 split light\n0:09 into orders",
+                                               "video_id": "v1"})
+    assert r.status_code == 200
+    hit = client.get("/api/search", params={"q": "light"}).json()["data"]["hits"][0]
+    assert hit["video_id"] == "v1"
+    assert hit["matches"]["light"][0]["start"] == 5.0
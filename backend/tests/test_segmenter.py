@@ -0,0 +1,78 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.segmenter import gap_scores, level_cuts, topic_outline
+from app.services.text_utils import tokenize_words
+
+import transcripts
+
+
+def _counts(sentences: list[str]) -> list[Counter]:
+    return [Counter(tokenize_words(s)) for s in sentences]
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    dot = sum(c * b[t] for t, c in a.items())
+    na, nb = sum(c * c for c in a.values()), sum(c * c for c in b.values())
+    return dot / math.sqrt(na * nb) if na and nb else 0.0
+
+
+@pytest.mark.parametrize("block", [1, 3, 7, 100])
+def test_gap_scores_match_brute_force_cosine(block):
+    r = random.Random(block)
+    vocab = [f"w{i}" for i in range(50)]
+    units = [Counter(r.choices(vocab, k=r.randint(0, 8))) for _ in range(80)]
+    ids: dict[str, int] = {}
+    rows = [[(ids.setdefault(t, len(ids)), c) for t, c in u.items()] for u in units]
+
+    fast = gap_scores(rows, len(ids), block)
+    assert len(fast) == len(units) - 1
+    for g, score in enumerate(fast):
+        left = sum(units[max(0, g + 1 - block):g + 1], Counter())
+        right = sum(units[g + 1:g + 1 + block], Counter())
+        assert score == pytest.approx(_cosine(left, right), abs=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_chapters_are_the_real_topic_shifts(seed):
+    outline = topic_outline(_counts(transcripts.topics([200, 200, 200], seed=seed)), depth=2)
+    assert [seg["sentences"] for seg in outline] == [[0, 200], [200, 400], [400, 600]]
+    assert all(seg.get("sections") for seg in outline)
+    assert [seg["keywords"][0].startswith(f"topic{i}") for i, seg in enumerate(outline)] == [True] * 3
+
+
+def test_uneven_topics():
+    outline = topic_outline(_counts(transcripts.topics([100, 300, 150, 50], seed=1)), depth=2)
+    assert [seg["sentences"][0] for seg in outline] == [0, 100, 400, 550]
+
+
+def _check_nesting(segments: list[dict], lo: int, hi: int) -> None:
+    assert segments[0]["sentences"][0] == lo and segments[-1]["sentences"][1] == hi
+    for a, b in zip(segments, segments[1:]):
+        assert a["sentences"][1] == b["sentences"][0]
+    for seg in segments:
+        assert seg["sentences"][0] < seg["sentences"][1]
+        if "sections" in seg:
+            assert len(seg["sections"]) >= 2
+            _check_nesting(seg["sections"], *seg["sentences"])
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+@pytest.mark.parametrize("granularity", ["coarse", "normal", "fine"])
+@pytest.mark.parametrize("sizes", [[200, 200, 200], [600], [60] * 8])
+def test_levels_nest(sizes, granularity, depth):
+    counts = _counts(transcripts.topics(sizes, seed=7))
+    _check_nesting(topic_outline(counts, depth=depth, granularity=granularity), 0, len(counts))
+
+
+def test_level_cuts_nest_and_respect_the_strong_prefix():
+    order = [50, 10, 90, 30, 70, 20, 60]
+    cuts = level_cuts(order, strong=2, depth=3)
+    assert cuts[-1] == sorted(order)
+    for coarse, fine in zip(cuts, cuts[1:]):
+        assert set(coarse) <= set(fine)
+    assert all(set(c) <= {50, 10} for c in cuts[:-1])
+    assert level_cuts(order, strong=0, depth=2) == [[], sorted(order)]
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.services.analyzer import analyze_transcript
+from app.services.stream import StreamingAnalyzer, analyze_stream, iter_normalized, iter_sentences
+from app.services.text_utils import clean_text, split_sentences
+
+import transcripts
+
+CASES = {
+    "plain": transcripts.plain(),
+    "timestamp_lines": transcripts.timestamp_lines(),
+    "timestamp_prefixed": transcripts.timestamp_prefixed(),
+    "crlf": transcripts.timestamp_prefixed().replace("\n", "\r\n"),
+    "unpunctuated": " ".join(transcripts.plain(50).replace(".", "").replace("?", "").replace("!", "").split()),
+    "short": "Hello there. Short.",
+    "whitespace": "  a\tb   c.  \n\n\n  d e f?\n\nλ theta is 12.5 units here. " * 30,
+}
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 1000, 10 ** 7])
+@pytest.mark.parametrize("name", list(CASES))
+def test_stream_matches_whole_text_analysis(name, size):
+    text = CASES[name]
+    chunks = _chunks(text, size)
+    assert "".join(iter_normalized(chunks)) == clean_text(text)
+    assert list(iter_sentences(chunks)) == split_sentences(text)
+    assert analyze_stream(chunks) == analyze_transcript(text)
+
+
+def test_stream_endpoint_matches_analyze(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services import result_cache
+    from app.services.cache import LRUCache, TieredCache
+
+    monkeypatch.setattr(result_cache, "_cache", TieredCache(LRUCache(16)))
+    client = TestClient(app)
+    text = CASES["plain"]
+    streamed = client.post("/api/analyze/stream", content=text.encode("utf-8"))
+    whole = client.post("/api/analyze", json={"text": text})
+    assert streamed.status_code == whole.status_code == 200
+    assert streamed.json()["data"] == whole.json()["data"]
+
+
+def test_stream_endpoint_feeds_off_the_event_loop(client, monkeypatch):
+    on_loop = []
+    feed = StreamingAnalyzer.feed
+
+    def recording_feed(self, chunk):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(len(chunk))
+        except RuntimeError:
+            pass  # a worker thread: no loop running here
+        return feed(self, chunk)
+
+    monkeypatch.setattr(StreamingAnalyzer, "feed", recording_feed)
+    r = client.post("/api/analyze/stream", content=CASES["plain"].encode("utf-8"))
+    assert r.status_code == 200
+    assert on_loop == []
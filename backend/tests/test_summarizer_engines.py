@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from app.services.summarizer import _select_sentences, summarize_extractive
+from app.services.text_utils import split_sentences, tokenize_words
+
+import transcripts
+
+np = pytest.importorskip("numpy")
+
+
+def _corpus(n: int, seed: int) -> tuple[list[str], list[list[str]]]:
+    sents = split_sentences(transcripts.plain(n, seed))
+    return sents, [tokenize_words(s, "en") for s in sents]
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("k", [1, 3, 7, 15])
+def test_numpy_and_python_engines_select_the_same_sentences(seed, k):
+    sents, toks = _corpus(random.Random(seed).randint(50, 900), seed)
+    assert _select_sentences(sents, toks, k, engine="numpy") == _select_sentences(sents, toks, k, engine="python")
+
+
+def test_empty_and_tokenless_sentences():
+    sents = ["the the the.", "so okay.", "Grating maximum angle order."]
+    toks = [tokenize_words(s, "en") for s in sents]
+    assert _select_sentences(sents, toks, 2, engine="numpy") == _select_sentences(sents, toks, 2, engine="python")
+    assert _select_sentences([], [], 3, engine="numpy") == []
+
+
+def test_auto_engine_keeps_summaries_unchanged(monkeypatch):
+    text = transcripts.plain(600, 11)
+    auto = summarize_extractive(text)
+    from app.services import summarizer
+    monkeypatch.setattr(summarizer, "np", None)
+    assert summarize_extractive(text) == auto
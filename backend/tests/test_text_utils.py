@@ -0,0 +1,77 @@
+import pytest
+
+from app.services.captions import CaptionTrack, as_track
+from app.services.text_utils import caption_chunks, captions_to_sentences, parse_timestamped_transcript
+
+import transcripts
+
+ITEMS = transcripts.caption_items(50, seed=71)
+
+
+@pytest.fixture
+def track() -> CaptionTrack:
+    return CaptionTrack.from_items(ITEMS)
+
+
+def test_to_list_round_trip(track):
+    assert track.to_list() == ITEMS
+    assert CaptionTrack.from_items(track.to_list()) == track
+    assert list(track.texts()) == [it["text"] for it in ITEMS]
+    assert track[-1] == ITEMS[-1]
+    assert as_track(ITEMS) == track and as_track(track) is track and as_track(None) is None
+
+
+@pytest.mark.parametrize("lo, hi", [(0, 50), (0, 0), (10, 20), (45, 100), (-5, 50), (30, 10), (50, 60)])
+def test_slice_matches_list_slicing(track, lo, hi):
+    part = track.slice(lo, hi)
+    assert part.to_list() == ITEMS[lo:hi]
+    assert part == CaptionTrack.from_items(ITEMS[lo:hi])
+
+
+@pytest.mark.parametrize("t0, t1", [(0, 1e9), (10, 40), (ITEMS[5]["start"], ITEMS[9]["start"]), (50, 10), (-5, -1)])
+def test_between_matches_filtering(track, t0, t1):
+    expected = [it for it in ITEMS if t0 <= it["start"] <= t1]
+    assert track.between(t0, t1).to_list() == expected
+
+
+def test_between_on_unsorted_starts():
+    items = [{"text": "b", "start": 5.0, "duration": 1.0}, {"text": "a", "start": 1.0, "duration": 1.0},
+             {"text": "c", "start": 3.0, "duration": 1.0}]
+    track = CaptionTrack.from_items(items)
+    assert not track.monotonic
+    assert track.between(2, 6).to_list() == [items[0], items[2]]
+
+
+def test_empty_track():
+    empty = CaptionTrack.from_items([])
+    assert not empty and len(empty) == 0
+    assert empty.to_list() == [] and empty.joined_text() == ""
+    assert empty.slice(0, 10) == empty
+    assert empty.between(0, 100).to_list() == []
+    with pytest.raises(IndexError):
+        empty[0]
+    assert caption_chunks(empty) == [] and captions_to_sentences([]) == []
+
+
+def test_missing_fields_and_empty_texts():
+    track = CaptionTrack.from_items([{"text": "one"}, {"text": None, "start": 2}, {"start": 3, "duration": 1}])
+    assert track.to_list() == [{"text": "one", "start": 0.0, "duration": 0.0},
+                               {"text": "", "start": 2.0, "duration": 0.0},
+                               {"text": "", "start": 3.0, "duration": 1.0}]
+    assert track.joined_text() == "one"
+
+
+def test_parse_timestamped_transcript():
+    text = "intro line\n0:04\nokay dear students\n0:06 there is a grating\n1:02:03 and a screen"
+    track = parse_timestamped_transcript(text)
+    assert track.to_list() == [{"text": "okay dear students", "start": 4.0, "duration": 0.0},
+                               {"text": "there is a grating", "start": 6.0, "duration": 0.0},
+                               {"text": "and a screen", "start": 3723.0, "duration": 0.0}]
+    assert parse_timestamped_transcript("0:01 only\n0:02 two") is None
+
+
+def test_caption_chunks_break_on_gaps():
+    items = [{"text": "first line", "start": 0.0, "duration": 1.0},
+             {"text": "still first", "start": 1.0, "duration": 1.0},
+             {"text": "after a pause!", "start": 5.0, "duration": 1.0}]
+    assert caption_chunks(items) == [(0.0, 2.0, "first line still first."), (5.0, 6.0, "after a pause!")]
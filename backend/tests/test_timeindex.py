@@ -0,0 +1,118 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import config
+from app.main import app
+from app.services import timeindex
+from app.services.document import build_document
+from app.services.timeindex import build_time_index, open_time_index, parse_time
+
+import transcripts
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    """Indexes under tmp_path and a fresh cache of open ones."""
+    monkeypatch.setattr(config, "TIME_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(timeindex, "_open", None)
+    yield tmp_path
+    timeindex._opened().clear()
+
+
+def _doc(seed: int = 2):
+    return build_document(transcripts.timestamp_lines(120, seed=seed))
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "NaN", float("nan"), float("inf")])
+def test_parse_time_rejects_non_finite(value):
+    with pytest.raises(ValueError):
+        parse_time(value)
+
+
+@pytest.mark.parametrize("value, seconds", [("1:05", 65.0), ("1:00:02", 3602.0), ("12.5", 12.5), (7, 7.0)])
+def test_parse_time(value, seconds):
+    assert parse_time(value) == seconds
+
+
+@pytest.mark.parametrize("params", [{"start": "nan"}, {"end": "inf"}, {"start": "0", "end": "nan"}])
+def test_non_finite_range_is_a_400(index_dir, params):
+    index_id, _ = build_time_index(_doc())
+    r = TestClient(app).get(f"/api/timeline/{index_id}", params=params)
+    assert r.status_code == 400
+
+
+def test_window_and_language_get_their_own_index(index_dir):
+    doc = _doc()
+    id30, idx30 = build_time_index(doc, video_id="abcdefghijk", window=30.0)
+    id10, idx10 = build_time_index(doc, video_id="abcdefghijk", window=10.0)
+    id_de, idx_de = build_time_index(build_document(transcripts.timestamp_lines(120, seed=2), "de"),
+                                     video_id="abcdefghijk", window=30.0)
+    assert len({id30, id10, id_de}) == 3
+    assert all(i.startswith("abcdefghijk-") for i in (id30, id10, id_de))
+    assert (idx30.window, idx10.window, idx_de.language) == (30.0, 10.0, "de")
+    assert not idx30.closed and open_time_index(id30).window == 30.0
+
+
+def test_unchanged_build_reuses_the_open_index(index_dir):
+    doc = build_document(transcripts.timestamp_lines(120, seed=2), "日本語")
+    index_id, first = build_time_index(doc)
+    again_id, again = build_time_index(doc)
+    assert (again_id, again) == (index_id, first)
+    assert first.language == "日本"  # 8-byte header field, cut between characters
+
+
+def test_only_windows_with_captions_are_stored(index_dir):
+    doc = build_document("0:00\nlight intensity at the slit\n0:00:02\nthe pattern on the screen\n"
+                         "99:59:59\nlambda over the grating")
+    _, idx = build_time_index(doc, window=1.0)
+    assert idx.n_windows == 3
+    assert list(idx.w_start) == [0.0, 2.0, 359999.0]
+    assert idx.query(0, 10)["stats"]["caption_items"] == 2
+    assert idx.query(0, 360000)["stats"]["caption_items"] == 3
+    assert idx.query(10, 359998)["windows"]["count"] == 0
+
+
+def test_tiny_window_is_a_422(index_dir):
+    r = TestClient(app).post("/api/timeline", json={"text": transcripts.timestamp_lines(20), "window_sec": 0.001})
+    assert r.status_code == 422
+
+
+def test_rebuild_waits_for_readers_of_the_replaced_index(index_dir):
+    doc = _doc()
+    index_id, old = build_time_index(doc)
+    old.release()
+    reader = open_time_index(index_id)
+    os.remove(timeindex.index_path(index_id))
+    _, new = build_time_index(doc)
+    assert new is not old
+    assert not old.closed  # still being read
+    assert reader.query(0, 60) == new.query(0, 60)
+    reader.release()
+    assert old.closed
+    assert open_time_index(index_id) is new
+
+
+def test_eviction_closes_the_index(index_dir):
+    timeindex._opened().max_entries = 1
+    first_id, first = build_time_index(_doc(2))
+    first_duration = first.duration
+    first.release()
+    _, second = build_time_index(_doc(3))
+    assert first.closed
+    assert not second.closed
+    reopened = open_time_index(first_id)
+    assert reopened is not first
+    assert reopened.duration == first_duration
+
+
+def test_eviction_waits_for_the_last_reader(index_dir):
+    timeindex._opened().max_entries = 1
+    _, first = build_time_index(_doc(2))
+    build_time_index(_doc(3))
+    assert not first.closed
+    assert first.query(0, 60)["stats"]["caption_items"] > 0
+    first.release()
+    assert first.closed
+    assert not first.acquire()
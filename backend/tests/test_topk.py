@@ -0,0 +1,56 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.topk import iter_ranked, merge_counts, most_common, top_k
+
+
+def _tied_counts(seed: int) -> Counter:
+    r = random.Random(seed)
+    return Counter(r.choices([f"w{i}" for i in range(40)], k=200))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [0, 1, 5, 12, 40, 100])
+def test_most_common_matches_counter(seed, k):
+    counts = _tied_counts(seed)
+    assert most_common(counts, k) == counts.most_common(k)
+    assert most_common(dict(counts), k) == counts.most_common(k)
+
+
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_top_k_ties_keep_first_seen_order(k):
+    items = [("a", 1), ("b", 3), ("c", 3), ("d", 2), ("e", 3), ("f", 1)]
+    key = lambda x: x[1]
+    assert top_k(items, k, key) == sorted(items, key=key, reverse=True)[:k]
+    assert top_k(iter(items), k, key) == sorted(items, key=key, reverse=True)[:k]
+
+
+def test_top_k_edge_cases():
+    assert top_k([], 3, key=abs) == []
+    assert top_k([1, 2], 0, key=abs) == []
+    assert top_k([1, 2], -1, key=abs) == []
+
+
+def test_iter_ranked_orders_ties_by_index():
+    scores = [0.5, 1.0, 0.5, 2.0, 1.0]
+    assert list(iter_ranked(scores)) == [3, 1, 4, 0, 2]
+    assert list(iter_ranked([])) == []
+
+
+def test_merge_counts_equals_counting_the_tokens():
+    r = random.Random(3)
+    chunks = [r.choices("abcdefgh", k=r.randint(0, 30)) for _ in range(10)]
+    merged = merge_counts(Counter(c) for c in chunks)
+    whole = Counter(t for c in chunks for t in c)
+    assert merged == whole
+    assert list(merged) == list(whole)  # first-seen key order
+
+
+def test_merge_counts_into_existing():
+    base = Counter({"x": 2})
+    out = merge_counts([{"y": 1}, {"x": 3}], into=base)
+    assert out is base
+    assert out == Counter({"x": 5, "y": 1})
+    assert merge_counts([]) == Counter()
@@ -0,0 +1,54 @@
+from app.services import cache as cache_module
+from app.services.captions import CaptionTrack
+from app.services.youtube import fetch_youtube_transcript
+
+from conftest import URL, VIDEO_ID, FakeFetcher
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def test_miss_then_hit(transcript_cache, fetcher):
+    first = fetch_youtube_transcript(URL, fetcher=fetcher)
+    second = fetch_youtube_transcript(URL, fetcher=fetcher)
+    assert isinstance(first, CaptionTrack)
+    assert first.to_list() == fetcher.items
+    assert second == first
+    assert fetcher.calls == [(VIDEO_ID, ["en", "ru", "kk"])]
+    assert transcript_cache.memory.hits == 1
+
+
+def test_languages_are_part_of_the_key(transcript_cache, fetcher):
+    fetch_youtube_transcript(URL, languages=["en"], fetcher=fetcher)
+    fetch_youtube_transcript(URL, languages=["ru"], fetcher=fetcher)
+    assert [langs for _, langs in fetcher.calls] == [["en"], ["ru"]]
+
+
+def test_ttl_expiry_refetches(transcript_cache, fetcher, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    fetch_youtube_transcript(URL, fetcher=fetcher)
+    clock.now += 30
+    fetch_youtube_transcript(URL, fetcher=fetcher)
+    assert len(fetcher.calls) == 1
+    clock.now += 61  # past the TTL of both tiers
+    fetch_youtube_transcript(URL, fetcher=fetcher)
+    assert len(fetcher.calls) == 2
+
+
+def test_memory_eviction_falls_back_to_sqlite(transcript_cache, fetcher):
+    other = FakeFetcher([{"text": "other video", "start": 0.0, "duration": 1.0}])
+    fetch_youtube_transcript(URL, fetcher=fetcher)
+    fetch_youtube_transcript("https://youtu.be/zyxwvutsrqp", fetcher=other)  # evicts URL from memory
+    assert transcript_cache.memory.evictions == 1
+
+    again = fetch_youtube_transcript(URL, fetcher=fetcher)
+    assert len(fetcher.calls) == 1
+    assert again.to_list() == fetcher.items
+    assert transcript_cache.disk.hits == 1
+
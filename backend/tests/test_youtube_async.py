@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import config
+from app.api import routes
+from app.main import app
+from app.services import youtube
+from app.services.youtube import fetch_youtube_transcript_async
+
+from conftest import URL, FakeFetcher
+
+
+class SlowFetcher(FakeFetcher):
+    """Blocks for `delay` seconds per call and records the most calls running at once."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, video_id, languages):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            return super().__call__(video_id, languages)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def fetch_pool(monkeypatch):
+    """A fresh pool of 2 fetch threads for the test."""
+    monkeypatch.setattr(config, "YOUTUBE_FETCH_CONCURRENCY", 2)
+    youtube.shutdown_fetch_pool()
+    yield
+    youtube.shutdown_fetch_pool()
+
+
+def test_concurrent_callers_share_one_fetch(transcript_cache, fetch_pool):
+    fetcher = SlowFetcher(0.2)
+
+    async def main():
+        return await asyncio.gather(*(fetch_youtube_transcript_async(URL, fetcher=fetcher) for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert len(fetcher.calls) == 1
+    assert all(r == results[0] for r in results)
+    assert results[0].to_list() == fetcher.items
+
+
+def test_timeout_raises_and_is_not_cached(transcript_cache, fetch_pool):
+    fetcher = SlowFetcher(0.5)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(fetch_youtube_transcript_async(URL, fetcher=fetcher, timeout=0.05))
+    assert transcript_cache.get(youtube._cache_key("abcdefghijk", ["en", "ru", "kk"])) is None
+
+
+def test_timed_out_calls_still_count_against_the_limit(transcript_cache, fetch_pool):
+    fetcher = SlowFetcher(0.3)
+    urls = [f"https://youtu.be/video{i:06d}" for i in range(6)]
+
+    async def main():
+        return await asyncio.gather(*(fetch_youtube_transcript_async(u, fetcher=fetcher, timeout=0.05)
+                                      for u in urls), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, asyncio.TimeoutError) for r in results)
+    # a second wave while the first calls are still running in their threads
+    asyncio.run(main())
+    youtube._get_fetch_pool().submit(lambda: None).result()
+    assert fetcher.peak <= 2
+
+
+def test_route_turns_a_timeout_into_504(transcript_cache, fetch_pool, monkeypatch):
+    async def timing_out(url):
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(routes, "fetch_youtube_transcript_async", timing_out)
+    r = TestClient(app).get("/api/youtube-transcript", params={"url": URL})
+    assert r.status_code == 504
+
+
+def test_disk_tier_is_read_off_the_event_loop(transcript_cache, fetch_pool, fetcher, monkeypatch):
+    other = FakeFetcher([{"text": "other video", "start": 0.0, "duration": 1.0}])
+    asyncio.run(fetch_youtube_transcript_async(URL, fetcher=fetcher))
+    asyncio.run(fetch_youtube_transcript_async("https://youtu.be/zyxwvutsrqp", fetcher=other))  # evicts URL
+
+    on_loop = []
+    get_entry, set_entry = transcript_cache.disk.get_entry, transcript_cache.disk.set
+
+    def in_loop_thread():
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def recording_get(key):
+        on_loop.append(in_loop_thread())
+        return get_entry(key)
+
+    def recording_set(key, value):
+        on_loop.append(in_loop_thread())
+        return set_entry(key, value)
+
+    monkeypatch.setattr(transcript_cache.disk, "get_entry", recording_get)
+    monkeypatch.setattr(transcript_cache.disk, "set", recording_set)
+
+    async def main():
+        return await asyncio.gather(*(fetch_youtube_transcript_async(URL, fetcher=fetcher) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(fetcher.calls) == 1  # served from SQLite
+    assert all(r.to_list() == fetcher.items for r in results)
+    assert on_loop == [False]  # one shared disk read, in a worker thread
+
+    asyncio.run(fetch_youtube_transcript_async("https://youtu.be/aaaaaaaaaaa", fetcher=other))
+    assert on_loop[1:] == [False, False]  # disk miss, then the write after the fetch
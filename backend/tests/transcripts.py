@@ -0,0 +1,65 @@
+"""Synthetic, seeded transcripts for the equivalence tests."""
+import random
+
+WORDS = ("the light intensity wave lambda theta grating slit pattern maximum minimum angle order "
+         "diffraction interference we should remember to measure distance screen students okay so "
+         "basically good great problem issue confusing").split()
+
+
+def _sentence(r: random.Random, n: int) -> str:
+    return " ".join(r.choice(WORDS) for _ in range(n))
+
+
+def plain(n: int = 200, seed: int = 1) -> str:
+    """Punctuated prose with numbers, formulas and paragraph breaks."""
+    r = random.Random(seed)
+    out = []
+    for i in range(n):
+        s = _sentence(r, r.randint(4, 25)).capitalize()
+        s += r.choice([".", ".", "?", "!", ". ", " 12.5 units.", " I0 = 3.2 lambda."])
+        out.append(s)
+        if i % 17 == 0:
+            out.append("\n\n")
+    return " ".join(out)
+
+
+def timestamp_lines(n: int = 200, seed: int = 2) -> str:
+    """A timestamp on its own line before every caption line."""
+    r = random.Random(seed)
+    lines = []
+    for i in range(n):
+        lines.append(f"{i * 2 // 60}:{i * 2 % 60:02d}")
+        lines.append(_sentence(r, r.randint(3, 12)))
+    return "\n".join(lines)
+
+
+def timestamp_prefixed(n: int = 200, seed: int = 3) -> str:
+    """"mm:ss text" lines."""
+    r = random.Random(seed)
+    return "\n".join(f"{i * 3 // 60}:{i * 3 % 60:02d} " + _sentence(r, r.randint(3, 12)) for i in range(n))
+
+
+def caption_items(n: int = 300, seed: int = 4) -> list[dict]:
+    """YouTube-style caption items with gaps between some of them."""
+    r = random.Random(seed)
+    t = 0.0
+    out = []
+    for _ in range(n):
+        d = r.choice([1.5, 2.0, 3.0])
+        out.append({"text": _sentence(r, r.randint(3, 10)), "start": t, "duration": d})
+        t += d + r.choice([0, 0, 0.5, 2.0])
+    return out
+
+
+def topics(sizes: list[int], seed: int = 5, vocab: int = 40, shared: int = 3) -> list[str]:
+    """Sentences in blocks of `sizes`, each block drawing from its own vocabulary."""
+    r = random.Random(seed)
+    common = [f"common{i}" for i in range(30)]
+    out = []
+    for b, size in enumerate(sizes):
+        own = [f"topic{b}word{i}" for i in range(vocab)]
+        for _ in range(size):
+            words = r.choices(own, k=8) + r.choices(common, k=shared)
+            r.shuffle(words)
+            out.append(" ".join(words).capitalize() + ".")
+    return out